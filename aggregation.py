@@ -0,0 +1,299 @@
+import numpy as np
+
+
+class QuantileSketch:
+    """
+    Sketch de quantis mergeável para várias colunas (ex.: meses da simulação).
+
+    Histograma de grade fixa sobre [low, high]: como as capacidades simuladas
+    são limitadas fisicamente (clip em 0-15000), uma grade de 1 conta dá
+    quantis com erro menor que bin_width, e o merge de dois sketches é exato
+    (soma das contagens). A memória depende só de n_columns × n_bins, nunca do
+    número de simulações.
+
+    Args:
+        n_columns: Número de colunas acompanhadas
+        low: Limite inferior da grade
+        high: Limite superior da grade (valores iguais a high têm bin próprio)
+        bin_width: Largura de cada bin
+    """
+
+    def __init__(self, n_columns, low=0.0, high=15000.0, bin_width=1.0):
+        self.n_columns = n_columns
+        self.low = float(low)
+        self.high = float(high)
+        self.bin_width = float(bin_width)
+        self.n_bins = int(np.floor((self.high - self.low) / self.bin_width)) + 1
+        self.counts = np.zeros((n_columns, self.n_bins), dtype=np.int64)
+        self.minimum = np.full(n_columns, np.inf)
+        self.maximum = np.full(n_columns, -np.inf)
+
+    @property
+    def count(self):
+        """Número de observações por coluna."""
+        return int(self.counts[0].sum()) if self.n_columns else 0
+
+    def update(self, values):
+        """
+        Acumula um lote de observações.
+
+        Args:
+            values: Array (n, n_columns) ou (n,) quando há uma única coluna
+        """
+        values = np.asarray(values, dtype=float).reshape(-1, self.n_columns)
+        if values.shape[0] == 0:
+            return self
+        bins = np.floor((values - self.low) / self.bin_width).astype(np.int64)
+        np.clip(bins, 0, self.n_bins - 1, out=bins)
+        # Uma contagem por coluna: o temporário tem n_bins, não n_columns × n_bins
+        for column, column_bins in enumerate(bins.T):
+            self.counts[column] += np.bincount(column_bins, minlength=self.n_bins)
+        np.minimum(self.minimum, values.min(axis=0), out=self.minimum)
+        np.maximum(self.maximum, values.max(axis=0), out=self.maximum)
+        return self
+
+    def merge(self, other):
+        """Incorpora (in-place) outro sketch com a mesma grade."""
+        if (other.n_columns, other.low, other.bin_width, other.n_bins) != (
+                self.n_columns, self.low, self.bin_width, self.n_bins):
+            raise ValueError("Sketches com grades diferentes não podem ser combinados")
+        self.counts += other.counts
+        np.minimum(self.minimum, other.minimum, out=self.minimum)
+        np.maximum(self.maximum, other.maximum, out=self.maximum)
+        return self
+
+    def column(self, index):
+        """Retorna um sketch de uma coluna só (cópia)."""
+        sketch = QuantileSketch(1, self.low, self.high, self.bin_width)
+        sketch.counts[0] = self.counts[index]
+        sketch.minimum[0] = self.minimum[index]
+        sketch.maximum[0] = self.maximum[index]
+        return sketch
+
+    def _order_statistic(self, cumulative, k):
+        """Estimativa do k-ésimo menor valor (0-based) de cada coluna."""
+        bins = np.array([np.searchsorted(row, k, side="right") for row in cumulative])
+        bins = np.minimum(bins, self.n_bins - 1)
+        columns = np.arange(self.n_columns)
+        in_bin = self.counts[columns, bins]
+        before = cumulative[columns, bins] - in_bin
+        # Observações distribuídas uniformemente dentro do bin
+        values = self.low + self.bin_width * (bins + (k - before + 0.5) / np.maximum(in_bin, 1))
+        return np.clip(values, self.minimum, self.maximum)
+
+    def percentile(self, q):
+        """
+        Percentil q (0-100) de cada coluna, com a mesma convenção de
+        np.percentile (interpolação linear entre estatísticas de ordem).
+
+        Returns:
+            np.array: Um valor por coluna
+        """
+        n = self.count
+        if n == 0:
+            return np.full(self.n_columns, np.nan)
+        rank = q / 100.0 * (n - 1)
+        lower = int(np.floor(rank))
+        cumulative = np.cumsum(self.counts, axis=1)
+        below = self._order_statistic(cumulative, lower)
+        if rank == lower:
+            return below
+        above = self._order_statistic(cumulative, lower + 1)
+        return below + (rank - lower) * (above - below)
+
+    def fraction_between(self, lower=-np.inf, upper=np.inf):
+        """Fração estimada das observações em [lower, upper], por coluna."""
+        n = self.count
+        if n == 0:
+            return np.full(self.n_columns, np.nan)
+        edges = self.low + self.bin_width * np.arange(self.n_bins + 1)
+        # Fração de cada bin coberta pelo intervalo (massa uniforme no bin)
+        covered = np.clip(
+            (np.minimum(edges[1:], upper) - np.maximum(edges[:-1], lower)) / self.bin_width,
+            0.0, 1.0
+        )
+        # O bin do limite superior concentra valores exatamente iguais a high
+        covered[-1] = float(lower <= self.high <= upper)
+        return (self.counts * covered).sum(axis=1) / n
+
+    def tail_mean(self, upper):
+        """Média estimada das observações <= upper, por coluna."""
+        centers = self.low + self.bin_width * (np.arange(self.n_bins) + 0.5)
+        centers[-1] = self.high
+        mask = centers <= upper
+        counts = self.counts[:, mask]
+        total = counts.sum(axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return (counts * centers[mask]).sum(axis=1) / total
+
+    def tail_variance(self, upper):
+        """Variância estimada das observações <= upper, por coluna (0 se vazia)."""
+        centers = self.low + self.bin_width * (np.arange(self.n_bins) + 0.5)
+        centers[-1] = self.high
+        mask = centers <= upper
+        counts = self.counts[:, mask]
+        total = np.maximum(counts.sum(axis=1), 1)
+        mean = (counts * centers[mask]).sum(axis=1) / total
+        return (counts * (centers[mask] - mean[:, None]) ** 2).sum(axis=1) / total
+
+
+    def to_dict(self):
+        """Estado completo em arrays/escalares (para gravar em disco)."""
+        return {
+            "n_columns": self.n_columns,
+            "grid": [self.low, self.high, self.bin_width],
+            "counts": self.counts,
+            "minimum": self.minimum,
+            "maximum": self.maximum,
+        }
+
+    @classmethod
+    def from_dict(cls, state):
+        """Reconstrói um QuantileSketch gravado com to_dict."""
+        sketch = cls(int(state["n_columns"]), *state["grid"])
+        sketch.counts = np.asarray(state["counts"], dtype=np.int64).reshape(sketch.n_columns, sketch.n_bins)
+        sketch.minimum = np.asarray(state["minimum"], dtype=float)
+        sketch.maximum = np.asarray(state["maximum"], dtype=float)
+        return sketch
+
+
+class RunningMoments:
+    """
+    Média e desvio padrão por coluna, atualizados em lotes (fórmula de Chan
+    para combinar médias e somas de quadrados).
+    """
+
+    def __init__(self, n_columns):
+        self.n_columns = n_columns
+        self.count = 0
+        self.mean = np.zeros(n_columns)
+        self.m2 = np.zeros(n_columns)
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float).reshape(-1, self.n_columns)
+        if values.shape[0] == 0:
+            return self
+        batch = RunningMoments(self.n_columns)
+        batch.count = values.shape[0]
+        batch.mean = values.mean(axis=0)
+        batch.m2 = ((values - batch.mean) ** 2).sum(axis=0)
+        return self.merge(batch)
+
+    def merge(self, other):
+        if other.count == 0:
+            return self
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean = self.mean + delta * (other.count / total)
+        self.m2 = self.m2 + other.m2 + delta ** 2 * (self.count * other.count / total)
+        self.count = total
+        return self
+
+    @property
+    def std(self):
+        """Desvio padrão populacional (mesma convenção de np.std)."""
+        if self.count == 0:
+            return np.full(self.n_columns, np.nan)
+        return np.sqrt(self.m2 / self.count)
+
+
+class StreamingAggregator:
+    """
+    Agregados Monte Carlo atualizados a cada bloco de simulações.
+
+    Mantém apenas sketches e contadores: percentis mensais, média e desvio
+    mensais, estatísticas da capacidade final, distribuição de regimes e DNA
+    médio. A memória fica constante em n_simulations.
+
+    Args:
+        n_months: Horizonte temporal das trajetórias
+        dna_dimensions: Nomes das dimensões do DNA organizacional
+        regime_names: Nomes dos regimes, na ordem dos índices
+        low, high, bin_width: Grade dos sketches de quantis
+    """
+
+    def __init__(self, n_months, dna_dimensions, regime_names, low=0.0, high=15000.0, bin_width=1.0):
+        self.n_months = n_months
+        self.dna_dimensions = tuple(dna_dimensions)
+        self.regime_names = tuple(regime_names)
+        self.trajectories = QuantileSketch(n_months, low, high, bin_width)
+        self.moments = RunningMoments(n_months)
+        self.regime_counts = np.zeros(len(self.regime_names), dtype=np.int64)
+        self.dna_sum = np.zeros(len(self.dna_dimensions))
+
+    @property
+    def count(self):
+        return self.moments.count
+
+    def update(self, trajectories, regimes, dna):
+        """
+        Incorpora um bloco de organizações simuladas.
+
+        Args:
+            trajectories: Array (n, n_months) de capacidades
+            regimes: Regime de cada organização
+            dna: Array (n, n_dimensões) de DNA organizacional
+        """
+        self.trajectories.update(trajectories)
+        self.moments.update(trajectories)
+        self.regime_counts += np.bincount(np.asarray(regimes), minlength=len(self.regime_names))
+        self.dna_sum += np.asarray(dna).sum(axis=0)
+        return self
+
+    def merge(self, other):
+        """Incorpora (in-place) os agregados de outro StreamingAggregator."""
+        self.trajectories.merge(other.trajectories)
+        self.moments.merge(other.moments)
+        self.regime_counts += other.regime_counts
+        self.dna_sum += other.dna_sum
+        return self
+
+    def monthly_percentiles(self, percentiles):
+        return {f"p{p}": self.trajectories.percentile(p) for p in percentiles}
+
+    def final_sketch(self):
+        """Sketch (1 coluna) da capacidade final."""
+        return self.trajectories.column(-1)
+
+    def regime_distribution(self):
+        return {
+            name: self.regime_counts[i] / self.count
+            for i, name in enumerate(self.regime_names)
+        }
+
+    def avg_dna_profile(self):
+        return {
+            name: self.dna_sum[i] / self.count
+            for i, name in enumerate(self.dna_dimensions)
+        }
+
+    def to_dict(self):
+        """Estado completo em arrays/escalares (para gravar em disco)."""
+        sketch = self.trajectories
+        return {
+            "n_months": self.n_months,
+            "dna_dimensions": list(self.dna_dimensions),
+            "regime_names": list(self.regime_names),
+            "grid": [sketch.low, sketch.high, sketch.bin_width],
+            "counts": sketch.counts,
+            "minimum": sketch.minimum,
+            "maximum": sketch.maximum,
+            "moments": [self.moments.count, self.moments.mean, self.moments.m2],
+            "regime_counts": self.regime_counts,
+            "dna_sum": self.dna_sum,
+        }
+
+    @classmethod
+    def from_dict(cls, state):
+        """Reconstrói um StreamingAggregator gravado com to_dict."""
+        aggregator = cls(state["n_months"], state["dna_dimensions"], state["regime_names"], *state["grid"])
+        aggregator.trajectories.counts = np.asarray(state["counts"], dtype=np.int64)
+        aggregator.trajectories.minimum = np.asarray(state["minimum"], dtype=float)
+        aggregator.trajectories.maximum = np.asarray(state["maximum"], dtype=float)
+        count, mean, m2 = state["moments"]
+        aggregator.moments.count = int(count)
+        aggregator.moments.mean = np.asarray(mean, dtype=float)
+        aggregator.moments.m2 = np.asarray(m2, dtype=float)
+        aggregator.regime_counts = np.asarray(state["regime_counts"], dtype=np.int64)
+        aggregator.dna_sum = np.asarray(state["dna_sum"], dtype=float)
+        return aggregator
@@ -1,11 +1,64 @@
 import streamlit as st
-from simulation import run_simulation_with_temporal_learning, run_monte_carlo_analysis, calculate_scenario_probabilities, analyze_risk_metrics
+from simulation import SimulationConfig, run_simulation_with_temporal_learning, scenario_probability_intervals, analyze_risk_metrics
+from background import BackgroundRun, session_executor
+from cache import ResultCache, fingerprint
+from store import DEFAULT_ARCHIVE_DIR, export_run
+from timing import PHASE_LABELS
 from parameters import parameters, states
 from inference import update_prior
 from utils import show_parameter_note, show_state_note
+from causal import analyze_causal_paths, analyze_mediation_effects, generate_causal_recommendations
 import pandas as pd
 import altair as alt
 import numpy as np
+import os
+import time
+
+# Cache em disco dos resultados Monte Carlo (chave = fingerprint da configuração)
+result_cache = ResultCache()
+
+# Organizações simuladas por lote em memória: cada lote é agregado e descartado,
+# então a memória por sessão não cresce com o número de simulações
+MC_CHUNK_SIZE = int(os.environ.get("MC_CHUNK_SIZE", 500))
+# Precisão das trajetórias ("float32" reduz pela metade a memória dos resultados)
+MC_DTYPE = os.environ.get("MC_DTYPE", "float64")
+# Intervalo (s) entre consultas ao progresso de uma simulação em segundo plano
+MC_POLL_SECONDS = 0.5
+
+def get_regime_probs():
+    """Proporções de regimes configuradas na aba de configurações (padrão 25/50/25)."""
+    probs = [
+        st.session_state.get("regime_conservative", 25),
+        st.session_state.get("regime_normal", 50),
+        st.session_state.get("regime_aggressive", 25),
+    ]
+    total = sum(probs)
+    if total <= 0:
+        return [0.25, 0.50, 0.25]
+    return [p / total for p in probs]
+
+def live_fan_chart(snapshot):
+    """Gráfico de leque (P5-P95, P25-P75 e mediana) de um snapshot parcial do Monte Carlo."""
+    percentiles = snapshot["monthly_percentiles"]
+    data = pd.DataFrame({
+        "Mês": range(len(percentiles["p50"])),
+        "P5": percentiles["p5"],
+        "P25": percentiles["p25"],
+        "Mediana": percentiles["p50"],
+        "P75": percentiles["p75"],
+        "P95": percentiles["p95"],
+    })
+    base = alt.Chart(data).encode(x="Mês:Q")
+    return (
+        base.mark_area(opacity=0.2, color="steelblue").encode(
+            y=alt.Y("P5:Q", title="Contas por Gerente"), y2="P95:Q"
+        )
+        + base.mark_area(opacity=0.35, color="steelblue").encode(y="P25:Q", y2="P75:Q")
+        + base.mark_line(color="darkblue").encode(y="Mediana:Q")
+    ).properties(
+        title=f"Parcial: {snapshot['completed']:,} de {snapshot['n_simulations']:,} simulações",
+        height=320
+    )
 
 # ==================== FUNÇÕES DE SUPORTE PARA INFERÊNCIA CAUSAL ====================
 
@@ -222,238 +275,6 @@ def run_standalone_causal_analysis():
     
     return pd.DataFrame(causal_data)
 
-def analyze_causal_paths(causal_data):
-    """
-    Análise causal ROBUSTA sem artificialismo.
-    Aceita o R² que os dados realmente suportam.
-    """
-    try:
-        from sklearn.linear_model import LinearRegression
-        from sklearn.preprocessing import StandardScaler
-        from sklearn.metrics import r2_score
-        import numpy as np
-
-        # Calcula a média prevista de capacidade das organizações simuladas
-        if isinstance(causal_data, pd.DataFrame) and 'final_capacity' in causal_data.columns:
-            mean_predicted_capacity = causal_data['final_capacity'].mean()
-            sample_size = len(causal_data)
-        else:
-            mean_predicted_capacity = None
-            sample_size = 0
-
-        # ...código de regressão e análise realista...
-        # Exemplo de cálculo de R², coeficientes, etc. (substitua por sua lógica real)
-        r2_capacity = 0.72  # Exemplo
-        outliers_removed = 0
-        residual_std = 120.0
-        r2_interpretation = "Modelo explica 72% da variância da capacidade final."
-        coef_tech = 0.34
-        coef_leadership = 0.28
-        coef_resources = 0.22
-        coef_risk = 0.12
-        coef_network = 0.18
-        coef_regime = 0.09
-        total_effect_tech = 0.46
-        total_effect_leadership = 0.36
-
-        return {
-            'mean_predicted_capacity': mean_predicted_capacity,
-            'sample_size': sample_size,
-            'r2_capacity': r2_capacity,
-            'outliers_removed': outliers_removed,
-            'residual_std': residual_std,
-            'r2_interpretation': r2_interpretation,
-            'coef_tech': coef_tech,
-            'coef_leadership': coef_leadership,
-            'coef_resources': coef_resources,
-            'coef_risk': coef_risk,
-            'coef_network': coef_network,
-            'coef_regime': coef_regime,
-            'total_effect_tech': total_effect_tech,
-            'total_effect_leadership': total_effect_leadership
-        }
-    except ImportError:
-        # Fallback robusto sem sklearn
-        import numpy as np
-        # ...código de correlação simples...
-        # Prepara dados sem modificações artificiais
-        X = causal_data[['tech_readiness', 'leadership_vision', 'resource_capacity', 
-                        'risk_culture', 'network_position']].copy()
-        X['regime_aggressive'] = (causal_data['regime'] == 2).astype(int)
-        X['regime_conservative'] = (causal_data['regime'] == 0).astype(int)
-        
-        y = causal_data['final_capacity'].copy()
-        
-        # Remove apenas outliers EXTREMOS (não para inflar R²)
-        # Usa método IQR conservador
-        q1, q3 = np.percentile(y, [5, 95])  # Mais conservador que 25-75
-        iqr = q3 - q1
-        lower_bound = q1 - 3 * iqr  # 3x IQR (muito conservador)
-        upper_bound = q3 + 3 * iqr
-        
-        mask = (y >= lower_bound) & (y <= upper_bound)
-        outliers_removed = len(y) - mask.sum()
-        
-        if outliers_removed > len(y) * 0.1:  # Se remover >10%, use dados originais
-            X_clean, y_clean = X, y
-            outliers_removed = 0
-        else:
-            X_clean, y_clean = X[mask], y[mask]
-        
-        # Padronização apenas para interpretação
-        scaler = StandardScaler()
-        continuous_vars = ['tech_readiness', 'leadership_vision', 'resource_capacity', 
-                          'risk_culture', 'network_position']
-        X_scaled = X_clean.copy()
-        X_scaled[continuous_vars] = scaler.fit_transform(X_clean[continuous_vars])
-        
-        # Regressão linear simples (sem truques)
-        model = LinearRegression()
-        model.fit(X_scaled, y_clean)
-        
-        # R² real dos dados
-        r2 = model.score(X_scaled, y_clean)
-        coefficients = model.coef_
-        
-        # Diagnósticos do modelo
-        y_pred = model.predict(X_scaled)
-        residuals = y_clean - y_pred
-        residual_std = np.std(residuals)
-        
-        # Se R² for muito baixo, reporta isso honestamente
-        interpretation = ""
-        if r2 < 0.15:
-            interpretation = "Baixo R² indica alta complexidade organizacional - esperado em modelos reais"
-        elif r2 < 0.30:
-            interpretation = "R² moderado - típico para modelos organizacionais complexos"
-        else:
-            interpretation = "R² alto - modelo captura bem a variação nos dados"
-        
-        # Cap máximo para efeitos totais: nunca exceder 9x (900%)
-        def cap_effect(raw_effect):
-            return min(max(raw_effect, -9.0), 9.0)
-        
-        return {
-            'r2_capacity': r2,  # R² verdadeiro, sem inflação
-            'r2_interpretation': interpretation,
-            'outliers_removed': outliers_removed,
-            'sample_size': len(y_clean),
-            'residual_std': residual_std,
-            
-            # Coeficientes padronizados
-            'coef_tech': coefficients[0],
-            'coef_leadership': coefficients[1], 
-            'coef_resources': coefficients[2],
-            'coef_risk': coefficients[3],
-            'coef_network': coefficients[4],
-            'coef_regime': coefficients[5] if len(coefficients) > 5 else 0,
-            
-            # Efeitos totais (coeficientes + estimativa de mediação, limitados)
-            'total_effect_tech': cap_effect(coefficients[0] * 1.15),
-            'total_effect_leadership': cap_effect(coefficients[1] * 1.12),
-            'total_effect_regime': cap_effect((coefficients[5] if len(coefficients) > 5 else 0) * 1.08),
-            'total_effect_resources': cap_effect(coefficients[2] * 1.05),
-            'total_effect_network': cap_effect(coefficients[4] * 1.10),
-            'mediation_tech': abs(coefficients[0]) * 0.15  # Conservative mediation
-        }
-        
-    except ImportError:
-        # Fallback robusto sem sklearn
-        import numpy as np
-        
-        # Correlações simples - mais honestas que regressão forçada
-        correlations = {}
-        for var in ['tech_readiness', 'leadership_vision', 'resource_capacity', 
-                   'risk_culture', 'network_position']:
-            corr = np.corrcoef(causal_data[var], causal_data['final_capacity'])[0,1]
-            correlations[var] = corr
-        
-        # Correlação com regime
-        regime_aggressive = (causal_data['regime'] == 2).astype(int)
-        regime_corr = np.corrcoef(regime_aggressive, causal_data['final_capacity'])[0,1]
-        
-        # R² baseado em correlações múltiplas (mais conservador)
-        r2_estimate = sum([corr**2 for corr in correlations.values()]) * 0.7  # Discount for multicollinearity
-        
-        return {
-            'r2_capacity': min(r2_estimate, 0.60),  # Cap realístico
-            'r2_interpretation': "Estimativa baseada em correlações - sem sklearn",
-            'outliers_removed': 0,
-            'sample_size': len(causal_data),
-            'residual_std': np.std(causal_data['final_capacity']) * (1 - r2_estimate)**0.5,
-            
-            'coef_tech': correlations['tech_readiness'] * 0.5,  # Convert to regression-like scale
-            'coef_leadership': correlations['leadership_vision'] * 0.5,
-            'coef_resources': correlations['resource_capacity'] * 0.5,
-            'coef_risk': correlations['risk_culture'] * 0.5,
-            'coef_network': correlations['network_position'] * 0.5,
-            'coef_regime': regime_corr * 0.5,
-            
-            'total_effect_tech': correlations['tech_readiness'] * 0.58,
-            'total_effect_leadership': correlations['leadership_vision'] * 0.56,
-            'total_effect_regime': regime_corr * 0.54,
-            'total_effect_resources': correlations['resource_capacity'] * 0.53,
-            'total_effect_network': correlations['network_position'] * 0.55,
-            'mediation_tech': abs(correlations['tech_readiness']) * 0.08
-        }
-
-def analyze_mediation_effects(causal_data):
-    """
-    Analisa efeitos de mediação.
-    """
-    # Análise de mediação baseada nos dados reais dos regimes
-    tech_mean = causal_data['tech_readiness'].mean()
-    leadership_mean = causal_data['leadership_vision'].mean()
-
-    # Calcula proporção de cada regime
-    regime_counts = causal_data['regime'].value_counts(normalize=True)
-    prop_conservative = regime_counts.get(0, 0)
-    prop_normal = regime_counts.get(1, 0)
-    prop_aggressive = regime_counts.get(2, 0)
-
-    # Calcula mediação por regime (exemplo: pondera valores fixos)
-    tech_conservative = 0.22 * prop_conservative
-    tech_normal = 0.34 * prop_normal
-    tech_aggressive = 0.51 * prop_aggressive
-    regime_moderation = 0.29 * (prop_conservative + prop_normal + prop_aggressive)
-
-    return {
-        'tech_direct': 0.34,
-        'tech_indirect': 0.12,
-        'tech_total': 0.46,
-        'tech_mediation_pct': 26.1,
-        'leadership_direct': 0.28,
-        'leadership_indirect': 0.08,
-        'leadership_total': 0.36,
-        'leadership_mediation_pct': 22.2,
-        'tech_conservative': tech_conservative,
-        'tech_normal': tech_normal,
-        'tech_aggressive': tech_aggressive,
-        'regime_moderation': regime_moderation
-    }
-
-def generate_causal_recommendations(path_results, mediation_results):
-    """
-    Gera recomendações baseadas nos resultados causais.
-    """
-    # Limite defensável para ROI: nunca exceder 900% (9x baseline)
-    def cap_roi(raw_roi):
-        return int(np.clip(raw_roi, -900, 900))
-
-    return {
-        'tech_roi': cap_roi(path_results['total_effect_tech'] * 100),
-        'tech_priority': "Máxima - maior preditor de sucesso",
-        'tech_timeline': "6-12 meses para impacto completo",
-        'tech_mediators': "Velocity de transição, customização de matriz",
-        'leadership_roi': cap_roi(path_results['total_effect_leadership'] * 100),
-        'leadership_priority': "Alta - segundo maior impacto",
-        'leadership_cascade': "Melhora matrix customization (+8%)",
-        'conservative_strategy': "Foco em estabilidade e ROI previsível",
-        'conservative_focus': "Tech readiness com approach conservador",
-        'aggressive_opportunity': "Tech readiness tem 51% mais impacto",
-        'aggressive_risk': "Alta volatilidade requer risk management"
-    }
-
 st.set_page_config(page_title="Simulador Bayesiano de Impacto da IA", layout="wide")
 st.title("📊 Simulador Bayesiano de Adoção de IA com Modelos Causais + Markov")
 
@@ -471,6 +292,29 @@ with tab1:
         help="Mais simulações = maior precisão, mas tempo maior"
     )
     
+    seed = st.sidebar.number_input(
+        "🎲 Semente aleatória",
+        min_value=0,
+        max_value=2**31 - 1,
+        value=42,
+        step=1,
+        help="Mesma semente + mesma configuração = mesmo resultado (reaproveitado do cache)"
+    )
+    
+    adaptive_stop = st.sidebar.checkbox(
+        "⏱️ Parada adaptativa",
+        value=False,
+        help="Para quando P5/P50/P95 e as probabilidades dos cenários atingem a precisão alvo "
+             "ou quando o tempo acaba; o número de simulações acima vira o máximo"
+    )
+    if adaptive_stop:
+        target_rel_error = st.sidebar.slider(
+            "Erro alvo (%)", 0.5, 10.0, 2.0, step=0.5,
+            help="Erro padrão Monte Carlo máximo dos percentis, em % do valor estimado, e meia "
+                 "largura máxima do IC 95% das probabilidades dos cenários, em pontos percentuais"
+        ) / 100
+        time_budget_s = st.sidebar.number_input("Tempo máximo (s)", min_value=5, max_value=600, value=60, step=5)
+    
     # Cenários alvo para análise
     st.sidebar.subheader("📊 Cenários Alvo")
     st.sidebar.markdown("*Defina os targets de capacidade para análise probabilística*")
@@ -603,31 +447,445 @@ with tab1:
     with col4:
         st.metric("🎲 Simulações", f"{n_simulations}")
     
-    # Execução da simulação Monte Carlo
-    if run_simulation:
+    # Resultados: preenchidos após a aba de configurações (ver EXECUÇÃO MONTE CARLO)
+    results_area = st.container()
+
+# ==================== ABA 2: CONFIGURAÇÕES ====================
+with tab2:
+    st.header("⚙️ Configurações Avançadas do Modelo")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.subheader("🎛️ Parâmetros Básicos")
+        n_gerentes = st.slider("👥 Número de gerentes", 1000, 50000, st.session_state.n_gerentes, step=1000)
+        st.session_state.n_gerentes = n_gerentes
+        n_meses = st.slider("📅 Horizonte (meses)", 6, 60, st.session_state.n_meses)
+        st.session_state.n_meses = n_meses
+        learning_enabled = st.checkbox(
+            "🧠 Aprendizado Temporal Bayesiano", 
+            value=st.session_state.learning_enabled,
+            help="Se habilitado, os posteriores de cada mês se tornam priors do próximo mês"
+        )
+        st.session_state.learning_enabled = learning_enabled
+        n_workers = st.slider(
+            "⚡ Processos paralelos", 1, os.cpu_count() or 1, st.session_state.get("n_workers", 1),
+            help="Divide as organizações em blocos entre processos; o resultado é idêntico para qualquer número de processos"
+        )
+        st.session_state.n_workers = n_workers
+        sampling_labels = {
+            "random": "🎲 Pseudoaleatória",
+            "sobol": "🧮 Quasi-aleatória (Sobol)",
+        }
+        sampling = st.selectbox(
+            "🎯 Amostragem das organizações", list(sampling_labels),
+            index=list(sampling_labels).index(st.session_state.get("sampling", "random")),
+            format_func=sampling_labels.get,
+            help="Regime, DNA e parâmetros Beta de uma sequência de Sobol embaralhada: "
+                 "menor variância na média e nos quantis centrais para o mesmo número de simulações"
+        )
+        st.session_state.sampling = sampling
+        antithetic = st.checkbox(
+            "🔁 Pares antitéticos",
+            value=st.session_state.get("antithetic", False),
+            help="Cada organização ganha um par com as entradas espelhadas (u → 1 - u)"
+        )
+        st.session_state.antithetic = antithetic
+
+        # Perfis organizacionais predefinidos (editáveis)
+        if "org_profiles" not in st.session_state:
+            st.session_state.org_profiles = {
+                "Startup": {
+                    'risk_culture': 0.85,
+                    'tech_readiness': 0.92,
+                    'resource_capacity': 0.23,
+                    'leadership_vision': 0.78,
+                    'regulatory_pressure': 0.15,
+                    'network_position': 0.67
+                },
+                "Banco Tradicional": {
+                    'risk_culture': 0.12,
+                    'tech_readiness': 0.34,
+                    'resource_capacity': 0.91,
+                    'leadership_vision': 0.45,
+                    'regulatory_pressure': 0.89,
+                    'network_position': 0.23
+                },
+                "Banco Digital": {
+                    'risk_culture': 0.40,
+                    'tech_readiness': 0.80,
+                    'resource_capacity': 0.65,
+                    'leadership_vision': 0.70,
+                    'regulatory_pressure': 0.40,
+                    'network_position': 0.75
+                },
+                "Big Tech": {
+                    'risk_culture': 0.60,
+                    'tech_readiness': 0.95,
+                    'resource_capacity': 0.95,
+                    'leadership_vision': 0.90,
+                    'regulatory_pressure': 0.30,
+                    'network_position': 0.90
+                }
+            }
+
+        org_profiles = st.session_state.org_profiles
+
+        st.subheader("🏢 Perfis Organizacionais na Simulação")
+        selected_profiles = st.multiselect(
+            "Selecione os perfis que serão incluídos na simulação:",
+            list(org_profiles.keys()),
+            default=list(org_profiles.keys())
+        )
+        st.session_state.selected_org_profiles = selected_profiles
+
+        st.markdown("**Perfis selecionados:** " + ", ".join(selected_profiles))
+
+        # Interface para editar valores de cada perfil
+        st.markdown("### ⚙️ Configuração dos Perfis Organizacionais")
+        for profile in selected_profiles:
+            st.markdown(f"**{profile}**")
+            cols = st.columns(6)
+            keys = ['risk_culture', 'tech_readiness', 'resource_capacity', 'leadership_vision', 'regulatory_pressure', 'network_position']
+            for i, key in enumerate(keys):
+                with cols[i]:
+                    val = st.number_input(
+                        key.replace('_', ' ').capitalize(),
+                        min_value=0.0, max_value=1.0,
+                        value=float(org_profiles[profile][key]), step=0.01,
+                        key=f"{profile}_{key}"
+                    )
+                    org_profiles[profile][key] = val
+        st.session_state.org_profiles = org_profiles
+
+        # Exibe tabela dos perfis selecionados
+        st.dataframe(pd.DataFrame([org_profiles[p] for p in selected_profiles], index=selected_profiles), use_container_width=True)
+        st.subheader("🧪 Atualização Manual dos Priors")
+        prior_name = st.selectbox("Parâmetro", list(parameters.keys()))
+        successes = st.number_input("Sucessos observados", 0, 1000, 20)
+        trials = st.number_input("Total de experimentos", 1, 1000, 30)
+        if st.button("Atualizar Prior"):
+            updated = update_prior(prior_name, successes, trials)
+            parameters[prior_name]["alpha"] = updated["new_alpha"]
+            parameters[prior_name]["beta"] = updated["new_beta"]
+            st.success(f"Prior atualizado: Beta({updated['new_alpha']}, {updated['new_beta']})")
+
+        st.subheader("🔄 Configuração da Distribuição de Regimes Econômicos")
+        st.markdown("**Defina a proporção de organizações em cada regime econômico:**")
+        regime_conservative = st.slider("% Conservative", 0, 100, st.session_state.get('regime_conservative', 25), step=1)
+        regime_normal = st.slider("% Normal", 0, 100, st.session_state.get('regime_normal', 50), step=1)
+        regime_aggressive = st.slider("% Aggressive", 0, 100, st.session_state.get('regime_aggressive', 25), step=1)
+        total_regime = regime_conservative + regime_normal + regime_aggressive
+        if total_regime != 100:
+            st.warning(f"A soma dos regimes deve ser 100%. Atualmente: {total_regime}%")
+        st.session_state.regime_conservative = regime_conservative
+        st.session_state.regime_normal = regime_normal
+        st.session_state.regime_aggressive = regime_aggressive
+        st.markdown(f"**Distribuição configurada:** Conservative: {regime_conservative}%, Normal: {regime_normal}%, Aggressive: {regime_aggressive}%")
+
+        # Visualização da distribuição configurada
+        import altair as alt
+        import pandas as pd
+        regime_df = pd.DataFrame({
+            'Regime': ['Conservative', 'Normal', 'Aggressive'],
+            'Proporção (%)': [regime_conservative, regime_normal, regime_aggressive]
+        })
+        regime_chart = alt.Chart(regime_df).mark_bar().encode(
+            x=alt.X('Regime:N', sort=['Conservative', 'Normal', 'Aggressive']),
+            y=alt.Y('Proporção (%):Q'),
+            color=alt.Color('Regime:N', scale=alt.Scale(range=['#e65100', '#01579b', '#43a047']))
+        ).properties(
+            width=300,
+            height=200,
+            title="Distribuição de Regimes Econômicos"
+        )
+        st.altair_chart(regime_chart, use_container_width=True)
+    
+    with col2:
+        st.subheader("🔄 Matriz de Transição Personalizada")
+        
+        # NOVA MATRIZ: Mais volátil para refletir natureza disruptiva da IA
+        default_matrix = [
+            [0.60, 0.35, 0.05, 0.00, 0.00],  # S0: Possibilidade de "saltos"
+            [0.00, 0.65, 0.30, 0.05, 0.00],  # S1: Mais progressão rápida
+            [0.00, 0.00, 0.70, 0.25, 0.05],  # S2: Aceleração possível  
+            [0.00, 0.00, 0.00, 0.80, 0.20],  # S3: Transformação mais rápida
+            [0.00, 0.00, 0.00, 0.00, 1.00]   # S4: Estado absorvente
+        ]
+        
+        if st.button("🔁 Resetar para benchmark v3.1"):
+            st.session_state.custom_matrix = default_matrix
+            st.success("Matriz resetada para benchmark v3.1!")
+        
+        # Interface para edição da matriz
+        if "custom_matrix" not in st.session_state:
+            st.session_state.custom_matrix = default_matrix
+        
+        st.markdown("**Edite as probabilidades de transição:**")
+        
+        for i, state in enumerate(states):
+            st.markdown(f"**{state['nome']} → ...**")
+            cols = st.columns(5)
+            row_sum = 0
+            new_row = []
+            
+            for j in range(len(states)):
+                with cols[j]:
+                    if i > j:
+                        st.text_input(f"→ {states[j]['nome'][:3]}", "0.00", disabled=True, key=f"disabled_{i}_{j}")
+                        new_row.append(0.0)
+                    else:
+                        val = st.number_input(
+                            f"→ {states[j]['nome'][:3]}", 
+                            0.0, 1.0, 
+                            st.session_state.custom_matrix[i][j],
+                            0.01, 
+                            key=f"matrix_{i}_{j}",
+                            help="Probabilidade mensal de transição"
+                        )
+                        new_row.append(val)
+            
+            # Normaliza a linha
+            row_sum = sum(new_row)
+            if row_sum > 0:
+                new_row = [p / row_sum for p in new_row]
+            
+            st.session_state.custom_matrix[i] = new_row
+        
+        # Mostra matriz atual
+        st.markdown("**Matriz Atual:**")
+        matrix_df = pd.DataFrame(
+            st.session_state.custom_matrix,
+            columns=[f"{s['nome'][:10]}" for s in states],
+            index=[f"{s['nome'][:10]}" for s in states]
+        )
+        st.dataframe(matrix_df.style.format("{:.2f}"), use_container_width=True)
+
+# ==================== EXECUÇÃO MONTE CARLO (RESULTADOS DA ABA 1) ====================
+# Roda depois da aba de configurações, para que o fingerprint use os valores
+# atuais dos widgets. Os resultados ficam em st.session_state junto com o
+# fingerprint que os gerou: qualquer rerun apenas re-renderiza, e só uma
+# mudança em entradas da simulação dispara uma nova execução.
+# O modelo (horizonte, matriz, regimes, choques e priors atuais) é lido da
+# sessão uma única vez; o engine recebe só esta configuração imutável.
+sim_config = SimulationConfig(
+    n_gerentes=st.session_state.n_gerentes,
+    n_months=st.session_state.n_meses,
+    transition_matrix=st.session_state.custom_matrix,
+    learning_enabled=st.session_state.learning_enabled,
+    regime_probs=get_regime_probs(),
+    priors=parameters,
+)
+mc_config = {
+    "config": sim_config,
+    "n_simulations": n_simulations,
+    "engine": "batched",
+    "seed": int(seed),
+    "chunk_size": MC_CHUNK_SIZE,
+    "dtype": MC_DTYPE,
+    "sampling": st.session_state.get("sampling", "random"),
+    "antithetic": st.session_state.get("antithetic", False),
+}
+# Parada adaptativa: fica fora de mc_config (o resultado equivale ao de uma
+# execução comum com o n_simulations atingido), mas entra na chave do cache
+mc_stopping = {}
+if adaptive_stop:
+    mc_stopping = {
+        "target_rel_error": target_rel_error,
+        "time_budget_s": float(time_budget_s),
+        "target_scenarios": target_scenarios,
+    }
+
+def mc_cache_key(config, stopping):
+    """Chave do cache (e da sessão) de uma execução: a mesma na leitura e na gravação."""
+    return fingerprint({**config, **stopping})
+
+mc_fingerprint = mc_cache_key(mc_config, mc_stopping)
+# Mesma configuração exceto o número de simulações: a execução anterior pode ser estendida
+mc_base_fingerprint = fingerprint({**mc_config, "n_simulations": None})
+
+def store_mc_results(results, results_fingerprint, base_fingerprint, from_cache=False, partial=False):
+    """Guarda na sessão um resultado Monte Carlo e as análises derivadas dele."""
+    st.session_state.mc_results = results
+    st.session_state.mc_fingerprint = results_fingerprint
+    st.session_state.mc_base_fingerprint = base_fingerprint
+    st.session_state.mc_from_cache = from_cache
+    st.session_state.mc_partial = partial
+    st.session_state.mc_risk_metrics = analyze_risk_metrics(results, baseline=2000)
+    
+    # NOVA: Coleta automática de dados causais
+    st.session_state.causal_data = extract_causal_data_from_monte_carlo(results)
+    st.session_state.causal_analysis_ready = True
+
+# A simulação roda em uma thread da sessão (BackgroundRun): widgets continuam
+# responsivos, o script só consulta o progresso a cada rerun e um cancelamento
+# preserva as organizações já simuladas.
+if "mc_executor" not in st.session_state:
+    st.session_state.mc_executor = session_executor()
+
+stored_fingerprint = st.session_state.get("mc_fingerprint")
+config_changed = stored_fingerprint is not None and stored_fingerprint != mc_fingerprint
+# Resultado parcial (cancelado): executar de novo continua de onde parou
+rerun_partial = run_simulation and st.session_state.get("mc_partial", False)
+mc_run = st.session_state.get("mc_run")
+run_requested = (run_simulation and stored_fingerprint != mc_fingerprint) or config_changed or rerun_partial
+if run_requested and (mc_run is None or st.session_state.mc_run_fingerprint != mc_fingerprint):
+    if mc_run is not None:
+        # A configuração mudou durante a execução: a anterior é descartada
+        mc_run.cancel()
+        st.session_state.mc_run = mc_run = None
+    monte_carlo_results = result_cache.get(mc_fingerprint)
+    if monte_carlo_results is not None:
+        store_mc_results(monte_carlo_results, mc_fingerprint, mc_base_fingerprint, from_cache=True)
+    else:
+        # Só o número de simulações aumentou: simula apenas as novas organizações
+        previous_results = st.session_state.get("mc_results")
+        resume_from = None
+        if (st.session_state.get("mc_base_fingerprint") == mc_base_fingerprint
+                and previous_results["n_simulations"] < n_simulations):
+            resume_from = previous_results
+        
+        st.session_state.mc_run = mc_run = BackgroundRun(
+            st.session_state.mc_executor,
+            **mc_config,
+            **mc_stopping,
+            n_workers=st.session_state.get("n_workers", 1),
+            resume_from=resume_from,
+            timings=True
+        )
+        st.session_state.mc_run_config = mc_config
+        st.session_state.mc_run_fingerprint = mc_fingerprint
+        st.session_state.mc_run_text = (
+            f'Estendendo de {resume_from["n_simulations"]} para {n_simulations} simulações...'
+            if resume_from is not None else
+            f'Executando {n_simulations} simulações estocásticas com MÁXIMA VOLATILIDADE...'
+        )
+
+if mc_run is not None and mc_run.done():
+    st.session_state.mc_run = None
+    try:
+        final_snapshot = mc_run.result()
+    except Exception as exc:
+        with results_area:
+            st.error(f"❌ Falha na simulação Monte Carlo: {exc}")
+    else:
+        if final_snapshot is not None and final_snapshot["results"]["n_simulations"] > 0:
+            monte_carlo_results = final_snapshot["results"]
+            run_config = st.session_state.mc_run_config
+            if final_snapshot["cancelled"]:
+                # Um resultado cancelado é idêntico ao de uma execução comum menor:
+                # entra no cache com o n_simulations que de fato cobre
+                cache_key = mc_cache_key({**run_config, "n_simulations": monte_carlo_results["n_simulations"]}, {})
+            else:
+                cache_key = st.session_state.mc_run_fingerprint
+            result_cache.put(cache_key, monte_carlo_results)
+            store_mc_results(
+                monte_carlo_results, st.session_state.mc_run_fingerprint,
+                fingerprint({**run_config, "n_simulations": None}),
+                partial=final_snapshot["cancelled"]
+            )
+    mc_run = None
+
+if mc_run is not None:
+    # Execução em andamento: progresso, gráfico de leque parcial e cancelamento
+    with results_area:
+        snapshot = mc_run.snapshot
+        completed = 0 if snapshot is None else snapshot["completed"]
+        total = st.session_state.mc_run_config["n_simulations"]
+        status_text = "⏹️ Cancelando no próximo lote..." if mc_run.status == "cancelling" else st.session_state.mc_run_text
+        st.progress(completed / total, text=f"{status_text} ({completed:,}/{total:,})")
+        if st.button("⏹️ Cancelar simulação", disabled=mc_run.status == "cancelling",
+                     help="Para no próximo lote e mantém as simulações já concluídas"):
+            mc_run.cancel()
+        if snapshot is not None and not snapshot["done"]:
+            st.altair_chart(live_fan_chart(snapshot), use_container_width=True)
+
+with results_area:
+    if "mc_results" in st.session_state:
+        monte_carlo_results = st.session_state.mc_results
         st.markdown("---")
         st.subheader("🎲 Análise Probabilística Monte Carlo v3.1")
-        
-        # Progress bar para simulações
-        with st.spinner(f'Executando {n_simulations} simulações estocásticas com MÁXIMA VOLATILIDADE...'):
-            monte_carlo_results = run_monte_carlo_analysis(
-                n_gerentes=st.session_state.n_gerentes,
-                n_months=st.session_state.n_meses,
-                transition_matrix=st.session_state.custom_matrix,
-                learning_enabled=st.session_state.learning_enabled,
-                n_simulations=n_simulations
+        if st.session_state.get("mc_from_cache"):
+            st.caption("⚡ Resultado recuperado do cache (mesma configuração e semente)")
+        adaptive = monte_carlo_results.get("adaptive")
+        if adaptive is not None:
+            stop_reasons = {
+                "target": "precisão alvo atingida",
+                "time_budget": "tempo máximo esgotado",
+                "max_simulations": "número máximo de simulações",
+                "cancelled": "cancelada",
+            }
+            st.caption(
+                f"⏱️ Parada adaptativa ({stop_reasons[adaptive['stop_reason']]}): "
+                f"{monte_carlo_results['n_simulations']:,} simulações, erro máximo "
+                f"{adaptive['errors']['max_error']:.2%} (alvo {adaptive['target_rel_error']:.2%})"
             )
-            
-            # NOVA: Coleta automática de dados causais
-            st.session_state.causal_data = extract_causal_data_from_monte_carlo(monte_carlo_results)
-            st.session_state.causal_analysis_ready = True
+            excluded = adaptive.get("excluded_scenarios", {}).get("scenarios")
+            if excluded:
+                st.caption(
+                    "Cenários fora da faixa simulada (sem efeito na parada): "
+                    + ", ".join(f"{target:,}" for target in excluded)
+                )
+        if st.session_state.get("mc_partial"):
+            st.warning(
+                f"⏹️ Simulação cancelada: resultados parciais com {monte_carlo_results['n_simulations']:,} "
+                "organizações. Execute novamente para continuar de onde parou."
+            )
+        if st.button("📦 Arquivar execução (Parquet)"):
+            try:
+                run_id = export_run(monte_carlo_results)
+                st.success(f"Execução arquivada em {DEFAULT_ARCHIVE_DIR} (run_id={run_id})")
+            except ImportError as exc:
+                st.warning(str(exc))
+        
+        # Tempo por fase da execução que gerou o resultado (diagnóstico de lentidão)
+        if "timings" in monte_carlo_results:
+            timings = monte_carlo_results["timings"]
+            with st.expander(f"⏱️ Tempo por fase ({timings['wall_s']:.2f} s)", expanded=False):
+                phases = timings["phases"]
+                phase_total = sum(values["total_s"] for values in phases.values())
+                timing_df = pd.DataFrame([
+                    {
+                        "Fase": PHASE_LABELS.get(phase, phase),
+                        "Total (s)": values["total_s"],
+                        "% do tempo": values["total_s"] / phase_total if phase_total else 0.0,
+                        "Chamadas": values["calls"],
+                        "Média (ms)": values["mean_s"] * 1000,
+                    }
+                    for phase, values in phases.items()
+                ])
+                st.dataframe(
+                    timing_df.style.format({"Total (s)": "{:.3f}", "% do tempo": "{:.1%}", "Média (ms)": "{:.3f}"}),
+                    use_container_width=True, hide_index=True
+                )
+                st.caption("Com vários processos, os totais das fases somam o tempo de todos os workers. "
+                           "Resultados estendidos medem só as simulações novas.")
+                
+                selected_phase = st.selectbox(
+                    "Distribuição do tempo por chamada", list(phases),
+                    format_func=lambda phase: PHASE_LABELS.get(phase, phase)
+                )
+                edges = timings["histogram_edges_s"]
+                histogram_df = pd.DataFrame({
+                    "Até (ms)": [f"{edge * 1000:.3g}" for edge in edges] + [f">{edges[-1] * 1000:.3g}"],
+                    "Chamadas": phases[selected_phase]["histogram"],
+                    "ordem": range(len(edges) + 1),
+                })
+                histogram_df = histogram_df[histogram_df["Chamadas"] > 0]
+                st.altair_chart(
+                    alt.Chart(histogram_df).mark_bar().encode(
+                        x=alt.X("Até (ms):N", sort=alt.SortField("ordem")),
+                        y="Chamadas:Q"
+                    ),
+                    use_container_width=True
+                )
         
-        # Análise de riscos
+        # Análise de riscos (calculada junto com a simulação)
         baseline = 2000  # Capacidade sem IA
-        risk_metrics = analyze_risk_metrics(monte_carlo_results, baseline=baseline)
+        risk_metrics = st.session_state.mc_risk_metrics
         
-        # Calcula probabilidades dos cenários
-        scenario_probs = calculate_scenario_probabilities(monte_carlo_results, target_scenarios)
+        # Cenários alvo não afetam a simulação: só as probabilidades são recalculadas
+        scenario_probs = scenario_probability_intervals(monte_carlo_results, target_scenarios)
         
         # === RESULTADOS v3.1 ===
         
@@ -776,10 +1034,58 @@ with tab1:
                 
                 st.metric(
                     f"🎯 {scenario_name} ({target})",
-                    f"{prob_exceed:.1%}",
+                    f"{prob_exceed['value']:.1%}",
                     help=f"Probabilidade de atingir ou superar {target} contas/gerente"
                 )
-                st.write(f"📍 Precisão ±5%: {prob_within:.1%}")
+                st.caption(f"IC 95%: {prob_exceed['ci_low']:.1%} – {prob_exceed['ci_high']:.1%}")
+                st.write(f"📍 Precisão ±5%: {prob_within['value']:.1%}")
+        
+        # 4b. Convergência Monte Carlo (resultados em cache de versões antigas não têm o traço)
+        convergence = monte_carlo_results.get("convergence")
+        if convergence is not None:
+            with st.expander("📉 Convergência Monte Carlo"):
+                st.markdown(
+                    "*Estimativas da capacidade final à medida que os blocos de simulações são "
+                    "incorporados, com intervalos de 95%. Quando as faixas param de estreitar de forma "
+                    "relevante, mais simulações quase não mudam os resultados.*"
+                )
+                trace_rows = []
+                for stat, label in [("mean", "Média"), ("p5", "P5"), ("p50", "Mediana"), ("p95", "P95")]:
+                    for i, n in enumerate(convergence["n"]):
+                        trace_rows.append({
+                            "Simulações": int(n),
+                            "Estatística": label,
+                            "Valor": convergence[stat][i],
+                            "IC inferior": convergence[f"{stat}_ci_low"][i],
+                            "IC superior": convergence[f"{stat}_ci_high"][i],
+                        })
+                trace_df = pd.DataFrame(trace_rows)
+                trace_base = alt.Chart(trace_df).encode(
+                    x=alt.X("Simulações:Q"),
+                    color=alt.Color("Estatística:N")
+                )
+                st.altair_chart(
+                    (trace_base.mark_area(opacity=0.2).encode(y="IC inferior:Q", y2="IC superior:Q")
+                     + trace_base.mark_line(point=True).encode(y=alt.Y("Valor:Q", title="Contas por Gerente")))
+                    .properties(height=350),
+                    use_container_width=True
+                )
+                
+                uncertainty = monte_carlo_results.get("uncertainty", {}).get("final_stats", {})
+                st.dataframe(
+                    pd.DataFrame([
+                        {
+                            "Estatística": stat,
+                            "Estimativa": monte_carlo_results["final_stats"][stat],
+                            "Erro padrão": interval["std_error"],
+                            "IC 95%": f"{interval['ci_low']:,.1f} – {interval['ci_high']:,.1f}",
+                            "Erro relativo": interval["std_error"] / abs(monte_carlo_results["final_stats"][stat])
+                            if monte_carlo_results["final_stats"][stat] else float("nan"),
+                        }
+                        for stat, interval in uncertainty.items()
+                    ]).style.format({"Estimativa": "{:,.2f}", "Erro padrão": "{:,.2f}", "Erro relativo": "{:.2%}"}),
+                    use_container_width=True
+                )
         
         # 5. Distribuição final com FAT TAILS
         st.subheader("📊 Distribuição Final com Fat Tails")
@@ -875,196 +1181,9 @@ with tab1:
         - ✅ Matrix customization per organization
         - ✅ Maximum entropy approach
         
-        **⏱️ Tempo estimado:** {n_simulations // 100} a {n_simulations // 50} segundos
+        **⏱️ Tempo estimado:** menos de 1 segundo (engine vetorizado)
         """)
 
-# ==================== ABA 2: CONFIGURAÇÕES ====================
-with tab2:
-    st.header("⚙️ Configurações Avançadas do Modelo")
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        st.subheader("🎛️ Parâmetros Básicos")
-        n_gerentes = st.slider("👥 Número de gerentes", 1000, 50000, st.session_state.n_gerentes, step=1000)
-        st.session_state.n_gerentes = n_gerentes
-        n_meses = st.slider("📅 Horizonte (meses)", 6, 60, st.session_state.n_meses)
-        st.session_state.n_meses = n_meses
-        learning_enabled = st.checkbox(
-            "🧠 Aprendizado Temporal Bayesiano", 
-            value=st.session_state.learning_enabled,
-            help="Se habilitado, os posteriores de cada mês se tornam priors do próximo mês"
-        )
-        st.session_state.learning_enabled = learning_enabled
-
-        # Perfis organizacionais predefinidos (editáveis)
-        if "org_profiles" not in st.session_state:
-            st.session_state.org_profiles = {
-                "Startup": {
-                    'risk_culture': 0.85,
-                    'tech_readiness': 0.92,
-                    'resource_capacity': 0.23,
-                    'leadership_vision': 0.78,
-                    'regulatory_pressure': 0.15,
-                    'network_position': 0.67
-                },
-                "Banco Tradicional": {
-                    'risk_culture': 0.12,
-                    'tech_readiness': 0.34,
-                    'resource_capacity': 0.91,
-                    'leadership_vision': 0.45,
-                    'regulatory_pressure': 0.89,
-                    'network_position': 0.23
-                },
-                "Banco Digital": {
-                    'risk_culture': 0.40,
-                    'tech_readiness': 0.80,
-                    'resource_capacity': 0.65,
-                    'leadership_vision': 0.70,
-                    'regulatory_pressure': 0.40,
-                    'network_position': 0.75
-                },
-                "Big Tech": {
-                    'risk_culture': 0.60,
-                    'tech_readiness': 0.95,
-                    'resource_capacity': 0.95,
-                    'leadership_vision': 0.90,
-                    'regulatory_pressure': 0.30,
-                    'network_position': 0.90
-                }
-            }
-
-        org_profiles = st.session_state.org_profiles
-
-        st.subheader("🏢 Perfis Organizacionais na Simulação")
-        selected_profiles = st.multiselect(
-            "Selecione os perfis que serão incluídos na simulação:",
-            list(org_profiles.keys()),
-            default=list(org_profiles.keys())
-        )
-        st.session_state.selected_org_profiles = selected_profiles
-
-        st.markdown("**Perfis selecionados:** " + ", ".join(selected_profiles))
-
-        # Interface para editar valores de cada perfil
-        st.markdown("### ⚙️ Configuração dos Perfis Organizacionais")
-        for profile in selected_profiles:
-            st.markdown(f"**{profile}**")
-            cols = st.columns(6)
-            keys = ['risk_culture', 'tech_readiness', 'resource_capacity', 'leadership_vision', 'regulatory_pressure', 'network_position']
-            for i, key in enumerate(keys):
-                with cols[i]:
-                    val = st.number_input(
-                        key.replace('_', ' ').capitalize(),
-                        min_value=0.0, max_value=1.0,
-                        value=float(org_profiles[profile][key]), step=0.01,
-                        key=f"{profile}_{key}"
-                    )
-                    org_profiles[profile][key] = val
-        st.session_state.org_profiles = org_profiles
-
-        # Exibe tabela dos perfis selecionados
-        st.dataframe(pd.DataFrame([org_profiles[p] for p in selected_profiles], index=selected_profiles), use_container_width=True)
-        st.subheader("🧪 Atualização Manual dos Priors")
-        prior_name = st.selectbox("Parâmetro", list(parameters.keys()))
-        successes = st.number_input("Sucessos observados", 0, 1000, 20)
-        trials = st.number_input("Total de experimentos", 1, 1000, 30)
-        if st.button("Atualizar Prior"):
-            updated = update_prior(prior_name, successes, trials)
-            parameters[prior_name]["alpha"] = updated["new_alpha"]
-            parameters[prior_name]["beta"] = updated["new_beta"]
-            st.success(f"Prior atualizado: Beta({updated['new_alpha']}, {updated['new_beta']})")
-
-        st.subheader("🔄 Configuração da Distribuição de Regimes Econômicos")
-        st.markdown("**Defina a proporção de organizações em cada regime econômico:**")
-        regime_conservative = st.slider("% Conservative", 0, 100, st.session_state.get('regime_conservative', 25), step=1)
-        regime_normal = st.slider("% Normal", 0, 100, st.session_state.get('regime_normal', 50), step=1)
-        regime_aggressive = st.slider("% Aggressive", 0, 100, st.session_state.get('regime_aggressive', 25), step=1)
-        total_regime = regime_conservative + regime_normal + regime_aggressive
-        if total_regime != 100:
-            st.warning(f"A soma dos regimes deve ser 100%. Atualmente: {total_regime}%")
-        st.session_state.regime_conservative = regime_conservative
-        st.session_state.regime_normal = regime_normal
-        st.session_state.regime_aggressive = regime_aggressive
-        st.markdown(f"**Distribuição configurada:** Conservative: {regime_conservative}%, Normal: {regime_normal}%, Aggressive: {regime_aggressive}%")
-
-        # Visualização da distribuição configurada
-        import altair as alt
-        import pandas as pd
-        regime_df = pd.DataFrame({
-            'Regime': ['Conservative', 'Normal', 'Aggressive'],
-            'Proporção (%)': [regime_conservative, regime_normal, regime_aggressive]
-        })
-        regime_chart = alt.Chart(regime_df).mark_bar().encode(
-            x=alt.X('Regime:N', sort=['Conservative', 'Normal', 'Aggressive']),
-            y=alt.Y('Proporção (%):Q'),
-            color=alt.Color('Regime:N', scale=alt.Scale(range=['#e65100', '#01579b', '#43a047']))
-        ).properties(
-            width=300,
-            height=200,
-            title="Distribuição de Regimes Econômicos"
-        )
-        st.altair_chart(regime_chart, use_container_width=True)
-    
-    with col2:
-        st.subheader("🔄 Matriz de Transição Personalizada")
-        
-        # NOVA MATRIZ: Mais volátil para refletir natureza disruptiva da IA
-        default_matrix = [
-            [0.60, 0.35, 0.05, 0.00, 0.00],  # S0: Possibilidade de "saltos"
-            [0.00, 0.65, 0.30, 0.05, 0.00],  # S1: Mais progressão rápida
-            [0.00, 0.00, 0.70, 0.25, 0.05],  # S2: Aceleração possível  
-            [0.00, 0.00, 0.00, 0.80, 0.20],  # S3: Transformação mais rápida
-            [0.00, 0.00, 0.00, 0.00, 1.00]   # S4: Estado absorvente
-        ]
-        
-        if st.button("🔁 Resetar para benchmark v3.1"):
-            st.session_state.custom_matrix = default_matrix
-            st.success("Matriz resetada para benchmark v3.1!")
-        
-        # Interface para edição da matriz
-        if "custom_matrix" not in st.session_state:
-            st.session_state.custom_matrix = default_matrix
-        
-        st.markdown("**Edite as probabilidades de transição:**")
-        
-        for i, state in enumerate(states):
-            st.markdown(f"**{state['nome']} → ...**")
-            cols = st.columns(5)
-            row_sum = 0
-            new_row = []
-            
-            for j in range(len(states)):
-                with cols[j]:
-                    if i > j:
-                        st.text_input(f"→ {states[j]['nome'][:3]}", "0.00", disabled=True, key=f"disabled_{i}_{j}")
-                        new_row.append(0.0)
-                    else:
-                        val = st.number_input(
-                            f"→ {states[j]['nome'][:3]}", 
-                            0.0, 1.0, 
-                            st.session_state.custom_matrix[i][j],
-                            0.01, 
-                            key=f"matrix_{i}_{j}",
-                            help="Probabilidade mensal de transição"
-                        )
-                        new_row.append(val)
-            
-            # Normaliza a linha
-            row_sum = sum(new_row)
-            if row_sum > 0:
-                new_row = [p / row_sum for p in new_row]
-            
-            st.session_state.custom_matrix[i] = new_row
-        
-        # Mostra matriz atual
-        st.markdown("**Matriz Atual:**")
-        matrix_df = pd.DataFrame(
-            st.session_state.custom_matrix,
-            columns=[f"{s['nome'][:10]}" for s in states],
-            index=[f"{s['nome'][:10]}" for s in states]
-        )
-        st.dataframe(matrix_df.style.format("{:.2f}"), use_container_width=True)
 
 # ==================== ABA 3: BENCHMARKS & TEORIA ====================
 with tab3:
@@ -1838,3 +1957,9 @@ with tab5:
         st.graphviz_chart(dot)
     else:
         st.info("Execute a simulação Monte Carlo para habilitar a análise causal.")
+
+# ==================== POLLING DA SIMULAÇÃO EM SEGUNDO PLANO ====================
+# Com a página inteira já desenhada, reexecuta o script para atualizar o progresso
+if st.session_state.get("mc_run") is not None:
+    time.sleep(MC_POLL_SECONDS)
+    st.rerun()
@@ -0,0 +1,75 @@
+import threading
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+
+from simulation import iter_monte_carlo
+
+
+def session_executor():
+    """
+    Executor das execuções em segundo plano de uma sessão do app: uma única
+    thread, então uma execução cancelada termina o bloco atual antes de a
+    próxima começar (sem disputar CPU).
+    """
+    return ThreadPoolExecutor(max_workers=1, thread_name_prefix="monte-carlo")
+
+
+class BackgroundRun:
+    """
+    Execução de iter_monte_carlo fora da thread do script Streamlit.
+
+    A UI consulta (polling) o último snapshot e done(); cancel() sinaliza o
+    cancel_event da simulação, que para no próximo bloco concluído e devolve o
+    resultado parcial em vez de descartar o trabalho feito.
+
+    Args:
+        executor: concurrent.futures.Executor de threads (ver session_executor)
+        **kwargs: Argumentos de iter_monte_carlo
+    """
+
+    def __init__(self, executor, **kwargs):
+        self.cancel_event = threading.Event()
+        self.snapshot = None
+        self._future = executor.submit(self._run, kwargs)
+
+    def _run(self, kwargs):
+        for snapshot in iter_monte_carlo(cancel_event=self.cancel_event, **kwargs):
+            # Atribuição atômica: a thread do script lê sempre um snapshot completo
+            self.snapshot = snapshot
+        return snapshot
+
+    def cancel(self):
+        """Pede o cancelamento (a execução para no próximo bloco concluído)."""
+        self.cancel_event.set()
+        self._future.cancel()
+
+    def done(self):
+        return self._future.done()
+
+    @property
+    def status(self):
+        """"queued", "running", "cancelling", "cancelled", "failed" ou "done"."""
+        if not self._future.done():
+            if self.cancel_event.is_set():
+                return "cancelling"
+            return "running" if self._future.running() else "queued"
+        if self._future.cancelled():
+            return "cancelled"
+        if self._future.exception() is not None:
+            return "failed"
+        return "cancelled" if self._future.result()["cancelled"] else "done"
+
+    def result(self, timeout=None):
+        """
+        Item final de iter_monte_carlo (aguarda até timeout segundos).
+
+        Returns:
+            dict: Snapshot final ("results" completo ou parcial, "cancelled"),
+                ou None se a execução foi cancelada antes de começar
+
+        Raises:
+            A exceção da simulação, se ela falhou
+        """
+        try:
+            return self._future.result(timeout)
+        except CancelledError:
+            return None
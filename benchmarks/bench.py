@@ -0,0 +1,285 @@
+"""
+Benchmarks dos caminhos quentes da simulação e das análises.
+
+Mede, para cada caso e ponto da grade (n_simulations, n_gerentes, n_months):
+- tempo de parede por chamada (melhor de --repeat amostras; casos rápidos
+  são repetidos dentro de cada amostra),
+- simulações por segundo,
+- pico de memória alocada (tracemalloc, em uma execução separada).
+
+Os resultados são comparados com um baseline JSON; casos mais lentos ou que
+alocam mais que a tolerância (relativa, com uma folga absoluta para casos
+de microssegundos) são marcados como regressão (exit 1).
+
+Tempos só são comparáveis na mesma máquina: o baseline guarda machine_info()
+e o cpu_count em especial decide o ganho de casos paralelos (n_workers > 1),
+que não se comparam entre máquinas. Um aviso é impresso quando a máquina
+difere da do baseline.
+
+Uso:
+    python benchmarks/bench.py                      # compara com benchmarks/baseline.json
+    python benchmarks/bench.py --save               # grava o baseline
+    python benchmarks/bench.py --profile full --filter monte_carlo
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import time
+import timeit
+import tracemalloc
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import numpy as np  # noqa: E402
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+DEFAULT_TIME_TOLERANCE = 0.25
+DEFAULT_MEMORY_TOLERANCE = 0.10
+# Diferenças abaixo disto nunca são regressão: ruído de alocação e, nos casos
+# de microssegundos a poucos milissegundos, ruído do escalonador/cache
+MEMORY_SLACK_MB = 0.5
+TIME_SLACK_SECONDS = 0.002
+# Casos rápidos são repetidos até cada amostra de tempo durar ao menos isto
+MIN_SAMPLE_SECONDS = 0.2
+SEED = 42
+
+# Ponto base de cada perfil e valores varridos em cada dimensão (uma dimensão
+# por vez, as demais no ponto base). "quick" roda em segundos; "full" cobre
+# os tamanhos usados no app.
+PROFILES = {
+    "quick": {
+        "base": {"n_simulations": 500, "n_gerentes": 27000, "n_months": 36},
+        "sweep": {
+            "n_simulations": [250, 500, 1000],
+            "n_gerentes": [2000, 27000],
+            "n_months": [12, 36, 60],
+        },
+    },
+    "full": {
+        "base": {"n_simulations": 2000, "n_gerentes": 27000, "n_months": 36},
+        "sweep": {
+            "n_simulations": [500, 2000, 10000],
+            "n_gerentes": [2000, 27000, 100000],
+            "n_months": [12, 36, 60, 120],
+        },
+    },
+}
+
+
+# ===== CASOS =====
+# Cada caso recebe o ponto da grade e devolve (função medida, nº de simulações).
+# A preparação (ex.: rodar o Monte Carlo para as análises) fica fora da medição.
+
+def _monte_carlo_results(n_simulations, n_gerentes, n_months):
+    from simulation import run_monte_carlo_analysis
+    return run_monte_carlo_analysis(
+        n_gerentes=n_gerentes, n_months=n_months, n_simulations=n_simulations,
+        engine="batched", seed=SEED
+    )
+
+
+def case_stochastic_simulation(n_simulations, n_gerentes, n_months):
+    """Uma organização (engine "loop"); n_simulations não se aplica."""
+    from simulation import run_stochastic_simulation
+
+    def run():
+        run_stochastic_simulation(n_gerentes=n_gerentes, n_months=n_months, seed=SEED, detail="none")
+    return run, 1
+
+
+def case_monte_carlo(n_simulations, n_gerentes, n_months):
+    def run():
+        _monte_carlo_results(n_simulations, n_gerentes, n_months)
+    return run, n_simulations
+
+
+def case_risk_metrics(n_simulations, n_gerentes, n_months):
+    from simulation import analyze_risk_metrics
+    results = _monte_carlo_results(n_simulations, n_gerentes, n_months)
+
+    def run():
+        analyze_risk_metrics(results)
+    return run, n_simulations
+
+
+def case_scenario_probabilities(n_simulations, n_gerentes, n_months):
+    from simulation import calculate_scenario_probabilities
+    results = _monte_carlo_results(n_simulations, n_gerentes, n_months)
+    targets = [2500, 4000, 6000]
+
+    def run():
+        calculate_scenario_probabilities(results, targets)
+    return run, n_simulations
+
+
+def case_causal_paths(n_simulations, n_gerentes, n_months):
+    import pandas as pd
+    from causal import analyze_causal_paths
+    causal_data = pd.DataFrame(_monte_carlo_results(n_simulations, n_gerentes, n_months)["causal_data"])
+
+    def run():
+        analyze_causal_paths(causal_data)
+    return run, n_simulations
+
+
+# Dimensões da grade relevantes para cada caso (as demais ficam no ponto base)
+CASES = {
+    "run_stochastic_simulation": (case_stochastic_simulation, ("n_gerentes", "n_months")),
+    "run_monte_carlo_analysis": (case_monte_carlo, ("n_simulations", "n_gerentes", "n_months")),
+    "analyze_risk_metrics": (case_risk_metrics, ("n_simulations", "n_months")),
+    "calculate_scenario_probabilities": (case_scenario_probabilities, ("n_simulations",)),
+    "analyze_causal_paths": (case_causal_paths, ("n_simulations",)),
+}
+
+
+def iter_points(profile):
+    """Pontos (caso, parâmetros) do perfil, sem repetições."""
+    grid = PROFILES[profile]
+    for name, (_, dimensions) in CASES.items():
+        seen = set()
+        for dimension in dimensions:
+            for value in grid["sweep"][dimension]:
+                point = {**grid["base"], dimension: value}
+                key = tuple(point[d] for d in dimensions)
+                if key not in seen:
+                    seen.add(key)
+                    yield name, point
+
+
+def case_id(name, point):
+    dimensions = CASES[name][1]
+    return f"{name}[{','.join(f'{d}={point[d]}' for d in dimensions)}]"
+
+
+def measure(name, point, repeat):
+    """
+    Mede um caso em um ponto da grade.
+
+    Returns:
+        dict: seconds (melhor tempo), sims_per_sec e peak_mb
+    """
+    factory = CASES[name][0]
+    run, n_sims = factory(**point)
+
+    # Chamadas por amostra: dobra até a amostra durar MIN_SAMPLE_SECONDS
+    timer = timeit.Timer(run, timer=time.perf_counter)
+    loops, elapsed = 1, timer.timeit(1)
+    while elapsed < MIN_SAMPLE_SECONDS:
+        loops *= 2
+        elapsed = timer.timeit(loops)
+    gc.collect()
+    seconds = min(timer.repeat(repeat=repeat, number=loops)) / loops
+
+    # Pico de memória em execução separada (tracemalloc distorce o tempo)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "seconds": seconds,
+        "sims_per_sec": n_sims / seconds if seconds > 0 else float("inf"),
+        "peak_mb": peak / 1024 ** 2,
+    }
+
+
+def machine_info():
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def compare(results, baseline, time_tolerance, memory_tolerance):
+    """
+    Compara os resultados com o baseline.
+
+    Returns:
+        dict: case_id -> lista de regressões (texto); vazia se dentro da tolerância
+    """
+    report = {}
+    for key, current in results.items():
+        reference = baseline.get(key)
+        if reference is None:
+            continue
+        problems = []
+        if current["seconds"] > max(reference["seconds"] * (1 + time_tolerance),
+                                    reference["seconds"] + TIME_SLACK_SECONDS):
+            problems.append(f"tempo {current['seconds'] / reference['seconds']:.2f}x")
+        if current["peak_mb"] > max(reference["peak_mb"] * (1 + memory_tolerance),
+                                    reference["peak_mb"] + MEMORY_SLACK_MB):
+            problems.append(f"memória {current['peak_mb']:.1f} MB (baseline {reference['peak_mb']:.1f} MB)")
+        report[key] = problems
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="quick")
+    parser.add_argument("--filter", default="", help="Roda só os casos cujo id contém este texto")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save", action="store_true", help="Grava os resultados como novo baseline")
+    parser.add_argument("--time-tolerance", type=float, default=DEFAULT_TIME_TOLERANCE)
+    parser.add_argument("--memory-tolerance", type=float, default=DEFAULT_MEMORY_TOLERANCE)
+    args = parser.parse_args()
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            stored = json.load(f)
+        if stored.get("profile") == args.profile:
+            baseline = stored["results"]
+            machine = machine_info()
+            differences = [
+                f"{key}: {stored.get('machine', {}).get(key)} -> {value}"
+                for key, value in machine.items() if stored.get("machine", {}).get(key) != value
+            ]
+            if differences:
+                print("Aviso: baseline gravado em outra máquina; tempos (sobretudo de casos "
+                      "paralelos) não são comparáveis (" + "; ".join(differences) + ")")
+
+    results = {}
+    print(f"{'caso':<72} {'tempo (s)':>10} {'sims/s':>10} {'pico MB':>9}  vs baseline")
+    for name, point in iter_points(args.profile):
+        key = case_id(name, point)
+        if args.filter not in key:
+            continue
+        results[key] = measure(name, point, args.repeat)
+        current = results[key]
+        reference = baseline.get(key)
+        versus = f"{current['seconds'] / reference['seconds']:.2f}x" if reference else "-"
+        print(f"{key:<72} {current['seconds']:>10.4f} {current['sims_per_sec']:>10.1f} "
+              f"{current['peak_mb']:>9.1f}  {versus}")
+
+    if args.save:
+        with open(args.baseline, "w") as f:
+            json.dump({"profile": args.profile, "machine": machine_info(), "results": results}, f, indent=2)
+            f.write("\n")
+        print(f"Baseline gravado em {args.baseline}")
+        return 0
+
+    if not baseline:
+        print("Sem baseline para este perfil (use --save para gravar)")
+        return 0
+
+    regressions = {k: v for k, v in compare(results, baseline, args.time_tolerance, args.memory_tolerance).items() if v}
+    for key, problems in regressions.items():
+        print(f"REGRESSÃO {key}: {', '.join(problems)}")
+    if not regressions:
+        print("Sem regressões em relação ao baseline")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,79 @@
+"""
+Orçamento de tempo de importação do engine de simulação.
+
+Mede `import simulation` em processos novos (como um worker do
+ProcessPoolExecutor ou um worker frio do Streamlit) com `python -X importtime`
+e falha (exit 1) se:
+- o custo além do próprio NumPy passar do orçamento, ou
+- algum módulo pesado (pandas, scipy, streamlit, pyarrow) for carregado.
+
+Uso:
+    python benchmarks/import_time.py [--runs 7] [--budget-ms 40]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Custo máximo (ms) de `import simulation` além da importação do NumPy
+IMPORT_BUDGET_MS = 40.0
+
+# Módulos que o engine só pode carregar sob demanda
+LAZY_MODULES = ("pandas", "scipy", "streamlit", "pyarrow")
+
+
+def measure_import(module="simulation"):
+    """
+    Importa o módulo em um processo novo.
+
+    Returns:
+        tuple: (ms totais, ms do NumPy, módulos carregados)
+    """
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c",
+         f"import sys, {module}; print(','.join(sorted(sys.modules)))"],
+        cwd=REPO_ROOT, capture_output=True, text=True, check=True
+    )
+    cumulative = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative_us, name = line.split("|")
+        if cumulative_us.strip().isdigit():
+            # Primeira ocorrência de cada módulo (nome sem a indentação)
+            cumulative.setdefault(name.strip(), int(cumulative_us) / 1000)
+    loaded = set(completed.stdout.strip().split(","))
+    return cumulative[module], cumulative.get("numpy", 0.0), loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--budget-ms", type=float, default=IMPORT_BUDGET_MS)
+    args = parser.parse_args()
+
+    totals, overheads, loaded = [], [], set()
+    for _ in range(args.runs):
+        total_ms, numpy_ms, modules = measure_import()
+        totals.append(total_ms)
+        overheads.append(total_ms - numpy_ms)
+        loaded |= modules
+
+    total_ms = statistics.median(totals)
+    overhead_ms = statistics.median(overheads)
+    heavy = sorted(m for m in LAZY_MODULES if m in loaded)
+    print(f"import simulation: {total_ms:.1f} ms (mediana de {args.runs})")
+    print(f"  além do NumPy:   {overhead_ms:.1f} ms (orçamento {args.budget_ms:.0f} ms)")
+    print(f"  módulos pesados: {', '.join(heavy) or 'nenhum'}")
+
+    failed = overhead_ms > args.budget_ms or bool(heavy)
+    if failed:
+        print("FALHOU: orçamento de importação excedido")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,228 @@
+import dataclasses
+import hashlib
+import json
+import os
+import tempfile
+import zipfile
+
+import numpy as np
+
+from aggregation import QuantileSketch, StreamingAggregator
+
+# Versão do formato/modelo: incrementar invalida todas as entradas existentes
+CACHE_VERSION = 4
+
+DEFAULT_CACHE_DIR = os.environ.get("MC_CACHE_DIR", os.path.join(".cache", "monte_carlo"))
+DEFAULT_MAX_BYTES = 512 * 1024 ** 2
+
+
+def _canonical(value):
+    """Converte a configuração em tipos JSON estáveis (dataclasses, arrays, tuplas e escalares NumPy)."""
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return {"@" + type(value).__name__: _canonical(dataclasses.asdict(value))}
+    if isinstance(value, dict):
+        return {str(k): _canonical(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(v) for v in value]
+    if isinstance(value, np.ndarray):
+        return {"dtype": str(value.dtype), "shape": list(value.shape), "data": _canonical(value.tolist())}
+    if isinstance(value, np.generic):
+        return value.item()
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    raise TypeError(f"Tipo não suportado na configuração: {type(value).__name__}")
+
+
+def fingerprint(config):
+    """
+    Impressão digital (sha256) de uma configuração de simulação.
+
+    A configuração é serializada em JSON canônico (chaves ordenadas), então
+    dicts equivalentes geram sempre o mesmo hash.
+
+    Args:
+        config: Dict com todas as entradas que determinam o resultado
+
+    Returns:
+        str: Hash hexadecimal
+    """
+    payload = json.dumps(
+        {"cache_version": CACHE_VERSION, "config": _canonical(config)},
+        sort_keys=True, separators=(",", ":")
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# ===== SERIALIZAÇÃO DOS RESULTADOS (.npz) =====
+# Arrays vão para entradas do .npz; a estrutura (dicts, escalares, listas de
+# registros) vai para um JSON guardado na entrada "__meta__".
+
+def _child(path, key):
+    return f"{path}/{key}" if path else str(key)
+
+
+def _try_array(values):
+    """Array NumPy nativo dos valores, ou None se exigir dtype object (ex.: dicts, ints enormes)."""
+    try:
+        array = np.array(values)
+    except (OverflowError, ValueError):
+        return None
+    return None if array.dtype == object else array
+
+
+def _encode(value, path, arrays):
+    if isinstance(value, StreamingAggregator):
+        # Acumulador de execuções em streaming/lotes (permite estendê-las)
+        return {"@aggregator": _encode(value.to_dict(), path, arrays)}
+    if isinstance(value, QuantileSketch):
+        # Sketch de quantis (ex.: final_capacity_sketch do modo streaming)
+        return {"@sketch": _encode(value.to_dict(), path, arrays)}
+    if isinstance(value, np.ndarray):
+        arrays[path] = value
+        return {"@array": path}
+    if isinstance(value, dict):
+        return {"@dict": {str(k): _encode(v, _child(path, k), arrays) for k, v in value.items()}}
+    if isinstance(value, (list, tuple)):
+        if value and all(isinstance(row, dict) for row in value):
+            # Lista de registros (ex.: causal_data) guardada por colunas
+            columns = list(value[0])
+            if all(list(row) == columns for row in value):
+                column_arrays = {column: _try_array([row[column] for row in value]) for column in columns}
+                if all(array is not None for array in column_arrays.values()):
+                    for column, array in column_arrays.items():
+                        arrays[_child(path, column)] = array
+                    return {"@records": columns, "path": path}
+        if value and all(isinstance(v, (int, float, np.number)) and not isinstance(v, bool) for v in value):
+            arrays[path] = np.asarray(value)
+            return {"@list": path}
+        return {"@items": [_encode(v, _child(path, i), arrays) for i, v in enumerate(value)]}
+    if isinstance(value, np.generic):
+        return value.item()
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    raise TypeError(f"Tipo não suportado nos resultados: {type(value).__name__}")
+
+
+def _decode(node, arrays):
+    if not isinstance(node, dict):
+        return node
+    if "@array" in node:
+        return arrays[node["@array"]]
+    if "@aggregator" in node:
+        return StreamingAggregator.from_dict(_decode(node["@aggregator"], arrays))
+    if "@sketch" in node:
+        return QuantileSketch.from_dict(_decode(node["@sketch"], arrays))
+    if "@dict" in node:
+        return {k: _decode(v, arrays) for k, v in node["@dict"].items()}
+    if "@records" in node:
+        names = node["@records"]
+        columns = [arrays[_child(node["path"], c)].tolist() for c in names]
+        return [dict(zip(names, row)) for row in zip(*columns)]
+    if "@list" in node:
+        return arrays[node["@list"]].tolist()
+    return [_decode(v, arrays) for v in node["@items"]]
+
+
+def save_results(path, results):
+    """Grava os resultados em um .npz comprimido (escrita atômica)."""
+    arrays = {}
+    meta = json.dumps(_encode(results, "", arrays))
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.savez_compressed(f, __meta__=np.array(meta), **arrays)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def load_results(path):
+    """Lê resultados gravados por save_results."""
+    with np.load(path, allow_pickle=False) as data:
+        arrays = {key: data[key] for key in data.files}
+    return _decode(json.loads(str(arrays.pop("__meta__"))), arrays)
+
+
+class ResultCache:
+    """
+    Cache em disco de resultados Monte Carlo, endereçado pelo fingerprint da
+    configuração. Cada entrada é um .npz comprimido; quando o total passa de
+    max_bytes, as entradas usadas há mais tempo são removidas (LRU pela data
+    de modificação, atualizada a cada leitura).
+
+    Args:
+        directory: Diretório do cache (criado se não existir)
+        max_bytes: Tamanho máximo total das entradas
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.npz")
+
+    def _entries(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".npz"):
+                try:
+                    stat = os.stat(os.path.join(self.directory, name))
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, name))
+        return sorted(entries)
+
+    @property
+    def total_bytes(self):
+        return sum(size for _, size, _ in self._entries())
+
+    def __contains__(self, key):
+        return os.path.exists(self._path(key))
+
+    def get(self, key):
+        """Retorna os resultados da entrada (ou None), marcando-a como usada."""
+        path = self._path(key)
+        try:
+            results = load_results(path)
+        except FileNotFoundError:
+            return None
+        except (OSError, EOFError, ValueError, KeyError, zipfile.BadZipFile):
+            # Entrada corrompida/incompleta: descarta
+            self.discard(key)
+            return None
+        os.utime(path)
+        return results
+
+    def put(self, key, results):
+        """Grava os resultados e aplica a política de tamanho máximo."""
+        save_results(self._path(key), results)
+        self._evict(keep=f"{key}.npz")
+
+    def discard(self, key):
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def clear(self):
+        for _, _, name in self._entries():
+            os.remove(os.path.join(self.directory, name))
+
+    def _evict(self, keep=None):
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in entries:
+            if total <= self.max_bytes:
+                break
+            if name == keep:
+                continue
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                pass
+            total -= size
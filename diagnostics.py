@@ -0,0 +1,489 @@
+import numpy as np
+
+from aggregation import QuantileSketch, RunningMoments
+
+# Saídas-chave (parada adaptativa e traço de convergência): percentis da capacidade final
+KEY_PERCENTILES = (5, 50, 95)
+
+# Quantil da normal padrão para intervalos de 95%
+Z_95 = 1.959963984540054
+
+STOP_REASONS = ("target", "time_budget", "max_simulations", "cancelled")
+
+
+class _FinalSample:
+    """Capacidades finais vindas de um array ou de um QuantileSketch de uma coluna."""
+
+    def __init__(self, final_values):
+        if isinstance(final_values, QuantileSketch):
+            self.sketch, self.values = final_values, None
+            self.n = final_values.count
+        else:
+            self.sketch, self.values = None, np.asarray(final_values)
+            self.n = len(self.values)
+            self._sorted = None
+
+    def percentile(self, q):
+        if self.sketch is not None:
+            return float(self.sketch.percentile(q)[0])
+        # Uma ordenação para todos os percentis (mesma interpolação de np.percentile)
+        if self._sorted is None:
+            self._sorted = np.sort(self.values)
+        return float(np.interp(q / 100.0 * (self.n - 1), np.arange(self.n), self._sorted))
+
+    def exceedance(self, x):
+        """P(X >= x)"""
+        if self.sketch is not None:
+            return float(self.sketch.fraction_between(lower=x)[0])
+        return float(np.count_nonzero(self.values >= x) / self.n)
+
+    def tail_variance(self, upper):
+        """Variância das observações <= upper."""
+        if self.sketch is not None:
+            return float(self.sketch.tail_variance(upper)[0])
+        tail = self.values[self.values <= upper]
+        return float(np.var(tail, dtype=np.float64)) if len(tail) else 0.0
+
+    def kurtosis(self):
+        """Curtose (μ4/σ⁴, 3 na normal); nan se a amostra for constante."""
+        if self.sketch is not None:
+            sketch = self.sketch
+            values = sketch.low + sketch.bin_width * (np.arange(sketch.n_bins) + 0.5)
+            values[-1] = sketch.high
+            weights = sketch.counts[0] / max(self.n, 1)
+        else:
+            values = self.values.astype(np.float64)
+            weights = np.full(self.n, 1.0 / max(self.n, 1))
+        deviations = values - weights @ values
+        variance = weights @ deviations ** 2
+        return float(weights @ deviations ** 4 / variance ** 2) if variance > 0 else np.nan
+
+
+def normal_interval(value, std_error):
+    """Intervalo de 95% pela aproximação normal: {std_error, ci_low, ci_high}."""
+    return {"std_error": std_error, "ci_low": value - Z_95 * std_error, "ci_high": value + Z_95 * std_error}
+
+
+def order_statistic_levels(q, n):
+    """
+    Percentis (0-100) cujas estatísticas de ordem limitam o intervalo de 95%
+    do percentil q: ranks n·p ± z·√(n·p·(1-p)), sem supor distribuição.
+    """
+    p = q / 100.0
+    half_width = Z_95 * np.sqrt(p * (1 - p) / n)
+    return 100.0 * max(p - half_width, 0.0), 100.0 * min(p + half_width, 1.0)
+
+
+def percentile_interval(quantile, q, n):
+    """
+    Intervalo de 95% por estatísticas de ordem para o percentil q; o erro
+    padrão é a largura do intervalo dividida por 2z.
+
+    Args:
+        quantile: Função percentil(0-100) -> valor da amostra
+        q: Percentil (0-100)
+        n: Tamanho da amostra
+
+    Returns:
+        dict: {std_error, ci_low, ci_high} (intervalo degenerado se n < 2)
+    """
+    if n < 2:
+        value = quantile(q)
+        return {"std_error": 0.0, "ci_low": value, "ci_high": value}
+    lower, upper = (quantile(level) for level in order_statistic_levels(q, n))
+    return {"std_error": (upper - lower) / (2 * Z_95), "ci_low": lower, "ci_high": upper}
+
+
+def percentile_standard_error(quantile, q, n):
+    """Erro padrão Monte Carlo do percentil q (ver percentile_interval)."""
+    return percentile_interval(quantile, q, n)["std_error"]
+
+
+def proportion_standard_error(p, n):
+    """Erro padrão binomial de uma proporção estimada em n simulações."""
+    return float(np.sqrt(p * (1 - p) / n)) if n else 0.0
+
+
+def proportion_interval(p, n):
+    """
+    Erro padrão binomial e intervalo de Wilson de 95% de uma proporção (não
+    degenera em p = 0 ou 1, comum nos cenários extremos).
+    """
+    if not n:
+        return {"std_error": np.nan, "ci_low": np.nan, "ci_high": np.nan}
+    z2 = Z_95 ** 2
+    center = (p + z2 / (2 * n)) / (1 + z2 / n)
+    half_width = Z_95 * np.sqrt(p * (1 - p) / n + z2 / (4 * n ** 2)) / (1 + z2 / n)
+    return {
+        "std_error": proportion_standard_error(p, n),
+        "ci_low": float(max(center - half_width, 0.0)),
+        "ci_high": float(min(center + half_width, 1.0)),
+    }
+
+
+def mean_standard_error(std, n):
+    """Erro padrão iid da média: s/√n, com s o desvio amostral (correção de Bessel)."""
+    std = np.asarray(std, dtype=float)
+    if n < 2:
+        return np.full(std.shape, np.nan) if std.ndim else np.nan
+    return std * np.sqrt(n / (n - 1)) / np.sqrt(n)
+
+
+def std_standard_error(std, kurtosis, n):
+    """
+    Erro padrão iid do desvio padrão pelo método delta:
+    Var(s) ≈ σ²·(curtose − 1)/(4n). Não supõe normalidade (na normal,
+    curtose 3 dá o conhecido σ/√(2n)); caudas pesadas alargam o erro.
+    """
+    if n < 2:
+        return np.nan
+    if std == 0:
+        return 0.0
+    return float(std * np.sqrt(max(kurtosis - 1.0, 0.0) / (4 * n)))
+
+
+def monte_carlo_errors(final_values, target_scenarios=(), percentiles=KEY_PERCENTILES):
+    """
+    Erros Monte Carlo das saídas-chave da capacidade final: percentis e
+    probabilidades de exceder cada cenário alvo (mesmas chaves de
+    calculate_scenario_probabilities).
+
+    O erro de cada saída ("error", comparado ao alvo da parada adaptativa) é
+    relativo nos percentis (erro padrão / valor) e absoluto nas
+    probabilidades (meia largura do intervalo de Wilson de 95%): o erro
+    relativo de uma probabilidade quase certa (ou quase nula) não converge,
+    embora a probabilidade já esteja determinada com folga.
+
+    Args:
+        final_values: Capacidades finais (array) ou QuantileSketch de uma coluna
+        target_scenarios: Cenários alvo (capacidades)
+        percentiles: Percentis acompanhados
+
+    Returns:
+        dict: "n_simulations", "estimates" {nome: value, std_error, error e
+            rel_error (percentis) ou ci_low/ci_high (probabilidades)} e
+            "max_error" (o maior erro)
+    """
+    sample = _FinalSample(final_values)
+    n = sample.n
+    estimates = {}
+    for q in percentiles:
+        value = sample.percentile(q)
+        std_error = percentile_standard_error(sample.percentile, q, n)
+        rel_error = std_error / abs(value) if value else float("inf")
+        estimates[f"p{q}"] = {"value": value, "std_error": std_error, "rel_error": rel_error, "error": rel_error}
+    for target in target_scenarios:
+        p = sample.exceedance(target)
+        interval = proportion_interval(p, n)
+        estimates[f"P(>= {target})"] = {
+            "value": p,
+            **interval,
+            "error": (interval["ci_high"] - interval["ci_low"]) / 2,
+        }
+    return {
+        "n_simulations": n,
+        "estimates": estimates,
+        "max_error": max((e["error"] for e in estimates.values()), default=0.0),
+    }
+
+
+def results_errors(monte_carlo_results, target_scenarios=(), percentiles=KEY_PERCENTILES):
+    """monte_carlo_errors a partir de um resultado de run_monte_carlo_analysis."""
+    final_values = monte_carlo_results["final_capacities"]
+    if final_values is None:
+        final_values = monte_carlo_results["final_capacity_sketch"]
+    return monte_carlo_errors(final_values, target_scenarios, percentiles)
+
+
+def _ratio_std_error(ratio, terms):
+    """Método delta: erro padrão de um quociente a partir dos erros relativos (valor, erro)."""
+    return abs(ratio) * np.sqrt(sum((std_error / value) ** 2 for value, std_error in terms if value))
+
+
+def final_stats_intervals(final_values, final_stats, mean_std_error, std_std_error, percentiles):
+    """
+    Erros padrão e intervalos de 95% de final_stats: média e desvio com os
+    erros iid recebidos prontos (ConvergenceTrace), percentis por estatísticas de
+    ordem e iqr/tail_ratio pelo método delta. min e max não têm intervalo
+    (extremos amostrais não têm erro padrão estável).
+
+    Args:
+        final_values: Capacidades finais (array) ou QuantileSketch de uma coluna
+        final_stats: final_stats de run_monte_carlo_analysis
+        mean_std_error, std_std_error: Erros padrão da média e do desvio
+        percentiles: Percentis presentes em final_stats
+
+    Returns:
+        dict: {estatística: {std_error, ci_low, ci_high}}
+    """
+    sample = _FinalSample(final_values)
+    intervals = {
+        "mean": normal_interval(final_stats["mean"], mean_std_error),
+        "std": normal_interval(final_stats["std"], std_std_error),
+    }
+    for q in percentiles:
+        intervals[f"p{q}"] = percentile_interval(sample.percentile, q, sample.n)
+    iqr_std_error = np.hypot(intervals["p75"]["std_error"], intervals["p25"]["std_error"])
+    intervals["iqr"] = normal_interval(final_stats["iqr"], iqr_std_error)
+    spread = final_stats["p95"] - final_stats["p5"]
+    tail_ratio_std_error = _ratio_std_error(final_stats["tail_ratio"], [
+        (spread, np.hypot(intervals["p95"]["std_error"], intervals["p5"]["std_error"])),
+        (final_stats["mean"], mean_std_error),
+    ])
+    intervals["tail_ratio"] = normal_interval(final_stats["tail_ratio"], tail_ratio_std_error)
+    return intervals
+
+
+def risk_metric_intervals(final_values, metrics, final_intervals=None):
+    """
+    Erros padrão e intervalos de 95% das métricas de analyze_risk_metrics.
+
+    VaR por estatísticas de ordem, prob_no_gain por Wilson, expected shortfall
+    pela variância assintótica do ES (variância da cauda + (1-α)(ES-VaR)², sobre
+    n·α) e coeficiente de variação pelo método delta. Média e desvio vêm de
+    final_intervals quando disponíveis; senão, erros iid calculados aqui.
+
+    Args:
+        final_values: Capacidades finais (array) ou QuantileSketch de uma coluna
+        metrics: Resultado de analyze_risk_metrics
+        final_intervals: results["uncertainty"]["final_stats"] (opcional)
+
+    Returns:
+        dict: {métrica: {std_error, ci_low, ci_high}}
+    """
+    sample = _FinalSample(final_values)
+    n = sample.n
+    if final_intervals is not None:
+        mean_std_error = final_intervals["mean"]["std_error"]
+        std_std_error = final_intervals["std"]["std_error"]
+    else:
+        mean_std_error = mean_standard_error(metrics["std"], n)
+        std_std_error = std_standard_error(metrics["std"], sample.kurtosis(), n)
+    alpha = 0.05
+    var_95 = metrics["var_95"]
+    es_variance = sample.tail_variance(var_95) + (1 - alpha) * (metrics["expected_shortfall"] - var_95) ** 2
+    return {
+        "var_95": percentile_interval(sample.percentile, 5, n),
+        "var_90": percentile_interval(sample.percentile, 10, n),
+        "expected_shortfall": normal_interval(metrics["expected_shortfall"], np.sqrt(es_variance / (n * alpha))),
+        "prob_no_gain": proportion_interval(metrics["prob_no_gain"], n),
+        "coefficient_variation": normal_interval(
+            metrics["coefficient_variation"],
+            _ratio_std_error(metrics["coefficient_variation"], [
+                (metrics["std"], std_std_error), (metrics["mean"], mean_std_error)
+            ])
+        ),
+        "mean": normal_interval(metrics["mean"], mean_std_error),
+        "std": normal_interval(metrics["std"], std_std_error),
+    }
+
+
+class ConvergenceTrace:
+    """
+    Traço de convergência da simulação: depois de cada bloco, a média e os
+    percentis-chave da capacidade final acumulados até ali, com intervalos de
+    95%. As organizações são iid, então os erros da média e do desvio saem dos
+    momentos acumulados (s/√n e método delta), não da dispersão entre blocos.
+    Guarda os momentos de cada bloco para retomar a execução com exatamente
+    as mesmas combinações. Memória: um sketch da capacidade final mais
+    O(n_blocos × n_months).
+
+    Args:
+        n_months: Horizonte temporal das trajetórias
+        low, high, bin_width: Grade do sketch da capacidade final
+        percentiles: Percentis acompanhados
+    """
+
+    def __init__(self, n_months, low=0.0, high=15000.0, bin_width=1.0, percentiles=KEY_PERCENTILES):
+        self.n_months = n_months
+        self.grid = (low, high, bin_width)
+        self.percentiles = tuple(percentiles)
+        self.final = QuantileSketch(1, low, high, bin_width)
+        self.moments = RunningMoments(n_months)
+        self.block_sizes = []
+        self.block_means = []
+        self.block_m2 = []
+        self.points = {key: [] for key in self._point_keys()}
+
+    def _point_keys(self):
+        keys = ["n", "mean", "mean_ci_low", "mean_ci_high"]
+        for q in self.percentiles:
+            keys += [f"p{q}", f"p{q}_ci_low", f"p{q}_ci_high"]
+        return keys
+
+    def update(self, trajectories):
+        """Incorpora um bloco (array (n, n_months)) e registra um ponto do traço."""
+        trajectories = np.asarray(trajectories)
+        self._add(
+            RunningMoments(self.n_months).update(trajectories),
+            QuantileSketch(1, *self.grid).update(trajectories[:, -1])
+        )
+        return self
+
+    def _merge_block(self, block):
+        self.block_sizes.append(block.count)
+        self.block_means.append(np.asarray(block.mean, dtype=float))
+        self.block_m2.append(np.asarray(block.m2, dtype=float))
+        self.moments.merge(block)
+
+    def _add(self, block, final_sketch):
+        self._merge_block(block)
+        self.final.merge(final_sketch)
+        n = self.final.count
+        mean = float(self.moments.mean[-1])
+        interval = normal_interval(mean, float(self.mean_std_error()[-1]))
+        point = {"n": n, "mean": mean, "mean_ci_low": interval["ci_low"], "mean_ci_high": interval["ci_high"]}
+        sample = _FinalSample(self.final)
+        for q in self.percentiles:
+            interval = percentile_interval(sample.percentile, q, n)
+            point.update({
+                f"p{q}": sample.percentile(q),
+                f"p{q}_ci_low": interval["ci_low"],
+                f"p{q}_ci_high": interval["ci_high"],
+            })
+        for key, value in point.items():
+            self.points[key].append(value)
+
+    def final_std(self):
+        """Desvio padrão (populacional) da capacidade final."""
+        return float(self.moments.std[-1])
+
+    def mean_std_error(self):
+        """Erro padrão iid (s/√n) da média de cada mês."""
+        return mean_standard_error(self.moments.std, self.moments.count)
+
+    def std_std_error(self):
+        """Erro padrão iid do desvio final (método delta, curtose do sketch final)."""
+        return std_standard_error(self.final_std(), _FinalSample(self.final).kurtosis(), self.moments.count)
+
+    def to_dict(self):
+        """
+        Traço serializável (vai em results["convergence"]).
+
+        Returns:
+            dict: Arrays por ponto ("n", "mean", "mean_ci_low/high", "pX",
+                "pX_ci_low/high") e os momentos de cada bloco ("block_sizes",
+                "block_means", "block_m2") usados para retomar a execução
+        """
+        return {
+            **{key: np.array(values) for key, values in self.points.items()},
+            "block_sizes": np.array(self.block_sizes, dtype=np.int64),
+            "block_means": np.array(self.block_means).reshape(-1, self.n_months),
+            "block_m2": np.array(self.block_m2).reshape(-1, self.n_months),
+        }
+
+    @classmethod
+    def from_accumulator(cls, convergence, accumulator, percentiles=KEY_PERCENTILES):
+        """
+        Traço das primeiras accumulator.count organizações de um resultado
+        anterior (retomada): reaproveita os pontos e os momentos por bloco de
+        convergence até ali; sem traço compatível, os blocos anteriores entram
+        como um único bloco com os momentos do acumulador.
+
+        Args:
+            convergence: results["convergence"] do resultado anterior (ou None)
+            accumulator: StreamingAggregator das organizações reaproveitadas
+        """
+        trajectories = accumulator.trajectories
+        trace = cls(accumulator.n_months, trajectories.low, trajectories.high, trajectories.bin_width, percentiles)
+        n_keep = accumulator.count
+        if n_keep == 0:
+            return trace
+        if convergence is not None and "block_m2" in convergence:
+            ends = np.cumsum(convergence["block_sizes"])
+            k = int(np.searchsorted(ends, n_keep, side="right"))
+            if k and ends[k - 1] == n_keep:
+                trace.final = accumulator.final_sketch()
+                for size, mean, m2 in zip(convergence["block_sizes"][:k], convergence["block_means"][:k],
+                                          convergence["block_m2"][:k]):
+                    block = RunningMoments(trace.n_months)
+                    block.count, block.mean, block.m2 = int(size), np.asarray(mean, dtype=float), np.asarray(m2, dtype=float)
+                    trace._merge_block(block)
+                m = int(np.searchsorted(convergence["n"], n_keep, side="right"))
+                trace.points = {key: list(convergence[key][:m]) for key in trace._point_keys()}
+                return trace
+        block = RunningMoments(trace.n_months)
+        block.count, block.mean, block.m2 = n_keep, accumulator.moments.mean.copy(), accumulator.moments.m2.copy()
+        trace._add(block, accumulator.final_sketch())
+        return trace
+
+
+class AdaptiveStop:
+    """
+    Regra de parada da simulação adaptativa, avaliada a cada bloco concluído:
+    para quando o maior erro das saídas-chave (relativo nos percentis,
+    absoluto nas probabilidades; ver monte_carlo_errors) fica abaixo de
+    target_rel_error ou quando time_budget_s se esgota.
+
+    Args:
+        time_budget_s: Tempo máximo (s) desde started; None = sem limite
+        target_rel_error: Erro alvo (ex.: 0.01): relativo nos percentis e
+            meia largura do IC 95% nas probabilidades; None = sem alvo
+        target_scenarios: Cenários cujas probabilidades de excedência entram no critério
+        started: Instante inicial (time.perf_counter)
+        min_simulations: Simulações mínimas antes de avaliar o erro (estimativas
+            de erro com poucas amostras são instáveis)
+        bounds: Limites (low, high) das capacidades simuladas. Cenários com
+            alvo <= low ou > high têm probabilidade 0 ou 1 por construção e não
+            informam nada sobre a precisão; ficam fora do critério (em
+            excluded_scenarios)
+    """
+
+    def __init__(self, time_budget_s, target_rel_error, target_scenarios, started, min_simulations=500,
+                 bounds=None):
+        self.time_budget_s = time_budget_s
+        self.target_rel_error = target_rel_error
+        scenarios = tuple(target_scenarios or ())
+        if bounds is None:
+            self.target_scenarios, self.excluded_scenarios = scenarios, ()
+        else:
+            low, high = bounds
+            self.target_scenarios = tuple(t for t in scenarios if low < t <= high)
+            self.excluded_scenarios = tuple(t for t in scenarios if not low < t <= high)
+        self.started = started
+        self.min_simulations = min_simulations
+        self.reason = None
+
+    def should_stop(self, final_values, now):
+        """
+        Avalia a regra com as capacidades finais acumuladas até agora.
+
+        Args:
+            final_values: Array ou QuantileSketch das capacidades finais
+            now: Instante atual (time.perf_counter)
+
+        Returns:
+            bool: True se a simulação deve parar (motivo em self.reason)
+        """
+        if self.time_budget_s is not None and now - self.started >= self.time_budget_s:
+            self.reason = "time_budget"
+            return True
+        if self.target_rel_error is not None:
+            errors = monte_carlo_errors(final_values, self.target_scenarios)
+            if (errors["n_simulations"] >= self.min_simulations
+                    and errors["max_error"] <= self.target_rel_error):
+                self.reason = "target"
+                return True
+        return False
+
+    def summary(self, monte_carlo_results, cancelled=False):
+        """
+        Relatório da execução adaptativa (vai em results["adaptive"]).
+
+        Returns:
+            dict: stop_reason (ver STOP_REASONS), target_rel_error,
+                time_budget_s, "errors" (monte_carlo_errors do resultado
+                final, cenários do critério) e "excluded_scenarios" (cenários
+                fora dos limites, com seus erros à parte)
+        """
+        reason = "cancelled" if cancelled else self.reason or "max_simulations"
+        return {
+            "stop_reason": reason,
+            "target_rel_error": self.target_rel_error,
+            "time_budget_s": self.time_budget_s,
+            "errors": results_errors(monte_carlo_results, self.target_scenarios),
+            "excluded_scenarios": {
+                "scenarios": list(self.excluded_scenarios),
+                "errors": results_errors(monte_carlo_results, self.excluded_scenarios, percentiles=())["estimates"],
+            },
+        }
@@ -1,76 +1,222 @@
+import json
+import os
+import threading
+import time
+import warnings
 import numpy as np
-import pandas as pd
 from parameters import parameters, states
-from scipy.stats import beta
-import copy
+from dataclasses import asdict, dataclass
+from aggregation import QuantileSketch, StreamingAggregator
+from diagnostics import (AdaptiveStop, ConvergenceTrace, final_stats_intervals, order_statistic_levels,
+                         percentile_interval, proportion_interval, risk_metric_intervals)
+from timing import NULL_TIMINGS, PhaseTimings
 
-def observe_monthly_evidence(state_vector_prev, state_vector_curr, month):
+# Níveis de detalhe por simulação: "none" (sem registros), "summary"
+# (estado e posteriors finais) e "full" (evolução mensal dos parâmetros)
+DETAIL_LEVELS = ("none", "summary", "full")
+
+# Registros por organização produzidos pelos níveis "summary"/"full"
+DETAIL_RECORD_KEYS = ("final_state_distributions", "final_posteriors", "params_evolution", "evidences")
+# Registros com eixo de meses (nível "full")
+MONTHLY_RECORD_KEYS = ("params_evolution", "evidences")
+
+# Organizações por bloco de simulação: cada bloco tem seu próprio stream aleatório
+SIMULATION_BLOCK_SIZE = 250
+
+# Limites físicos das capacidades pós-processadas (contas por gerente)
+CAPACITY_BOUNDS = (0, 15000)
+
+# PERCENTIS EXTREMOS reportados para capturar tail risks
+MONTE_CARLO_PERCENTILES = [1, 5, 10, 25, 50, 75, 90, 95, 99]
+
+# Precisões aceitas para as trajetórias e o pós-processamento de capacidade.
+# Matrizes de transição e parâmetros Beta ficam sempre em float64 (multinomial
+# e beta do NumPy só amostram em float64).
+SIMULATION_DTYPES = ("float64", "float32")
+
+# Amostragem das entradas por organização (regime, DNA e parâmetros Beta):
+# "random" (pseudoaleatória) ou "sobol" (quasi-aleatória embaralhada)
+SAMPLING_MODES = ("random", "sobol")
+
+# Memória máxima de cada fatia de meses lida no cálculo dos percentis
+# mensais de trajetórias em memória
+TRAJECTORY_BLOCK_BYTES = 256 * 1024 ** 2
+
+# Matriz base usada quando nenhuma matriz customizada é informada
+DEFAULT_TRANSITION_MATRIX = [
+    [0.7, 0.3, 0.0, 0.0, 0.0],
+    [0.0, 0.75, 0.25, 0.0, 0.0],
+    [0.0, 0.0, 0.85, 0.15, 0.0],
+    [0.0, 0.0, 0.0, 0.9, 0.1],
+    [0.0, 0.0, 0.0, 0.0, 1.0],
+]
+
+# 3 REGIMES com características econômicas distintas
+REGIMES = {
+    0: {"name": "conservative", "shock_multiplier": 0.6, "adoption_bias": -0.10},
+    1: {"name": "normal", "shock_multiplier": 1.0, "adoption_bias": 0.0},
+    2: {"name": "aggressive", "shock_multiplier": 1.7, "adoption_bias": +0.15}
+}
+
+# Ruído de pós-processamento por regime: (média, desvio padrão)
+REGIME_NOISE = {
+    0: (-0.05, 0.08),  # Conservative: baixa volatilidade, downward bias
+    1: (0.0, 0.15),    # Normal: volatilidade moderada
+    2: (0.10, 0.30),   # Aggressive: alta volatilidade, upward bias
+}
+
+# DNA organizacional: (dimensão, alpha, beta, peso no impacto sobre a matriz)
+ORG_DNA_DIMENSIONS = (
+    ("risk_culture", 1.0, 2.5, 0.20),         # Maioria risk-averse
+    ("tech_readiness", 1.5, 1.5, 0.25),       # Bimodal distribution
+    ("resource_capacity", 1.2, 1.8, 0.20),    # Few resource-rich
+    ("leadership_vision", 2.0, 1.0, 0.20),    # Some visionary leaders
+    ("regulatory_pressure", 1.8, 1.2, 0.0),   # Sector-dependent (não afeta a matriz)
+    ("network_position", 1.3, 1.7, 0.15),     # Network centrality
+)
+
+# Pesos dos parâmetros bayesianos no fator disruptivo
+BAYESIAN_FACTOR_WEIGHTS = {
+    "AI_Investment": 0.4,
+    "Change_Adoption": 0.35,
+    "Training_Quality": 0.25,
+}
+
+# Parâmetros com evidência mensal (ordem das colunas de observe_evidence_arrays)
+EVIDENCE_PARAMETERS = ("AI_Investment", "Change_Adoption", "Training_Quality")
+
+# Catálogo de choques de mercado: (tipo, probabilidade, média, desvio,
+# limite inferior, limite superior) da intensidade; None = sem limite
+MARKET_SHOCK_TYPES = (
+    ("regulatory_negative", 0.20, -0.45, 0.25, -0.80, None),
+    ("breakthrough_positive", 0.20, 0.60, 0.35, None, 1.50),
+    ("competitive_frenzy", 0.20, 0.40, 0.30, None, 1.00),
+    ("backlash_crisis", 0.15, -0.45, 0.25, -0.80, None),
+    ("funding_crash", 0.10, -0.45, 0.25, -0.80, None),
+    ("viral_adoption", 0.10, 0.60, 0.35, None, 1.50),
+    ("talent_shortage", 0.05, 0.0, 0.40, None, None),
+)
+
+# Probabilidade mensal de choque e primeiro mês sujeito a choques (após o setup)
+MARKET_SHOCK_PROBABILITY = 0.25
+MARKET_SHOCK_START_MONTH = 2
+
+# Definição dos regimes na ordem dos índices: (nome, shock_multiplier,
+# adoption_bias, média do ruído, desvio do ruído)
+DEFAULT_REGIME_SPECS = tuple(
+    (REGIMES[r]["name"], REGIMES[r]["shock_multiplier"], REGIMES[r]["adoption_bias"], *REGIME_NOISE[r])
+    for r in sorted(REGIMES)
+)
+
+
+def _regime_values(regime_specs, column):
+    """Coluna ("shock_multiplier", "adoption_bias", "noise_mean", "noise_std") das definições de regime."""
+    index = ("name", "shock_multiplier", "adoption_bias", "noise_mean", "noise_std").index(column)
+    return np.array([spec[index] for spec in regime_specs])
+
+
+@dataclass(frozen=True)
+class SimulationConfig:
     """
-    Observa evidências do mês baseadas na progressão dos gerentes entre estados.
-    Converte progressões em evidências bayesianas para atualizar os priors.
+    Configuração imutável de uma análise Monte Carlo.
     
-    Args:
-        state_vector_prev: Distribuição de estados no mês anterior
-        state_vector_curr: Distribuição de estados no mês atual
-        month: Mês atual da simulação
+    Reúne tudo o que define o modelo simulado: horizonte, matriz base,
+    proporções e definições dos regimes, choques de mercado e priors. É
+    montada uma vez (ex.: pelo app a partir da sessão) e passada ao engine,
+    que não depende de Streamlit nem de estado global.
     
-    Returns:
-        dict: Evidências observadas para cada parâmetro bayesiano
+    Args:
+        n_gerentes: Número de gerentes
+        n_months: Horizonte temporal
+        transition_matrix: Matriz base 5x5 (None = matriz padrão, sem customização por DNA)
+        learning_enabled: Aprendizado temporal ativo
+        regime_probs: Probabilidades dos regimes conservative/normal/aggressive
+        regimes: Definições dos regimes no formato de DEFAULT_REGIME_SPECS
+        shock_probability: Probabilidade mensal de choque de mercado
+        shock_start_month: Primeiro mês sujeito a choques
+        shock_catalogue: Catálogo de choques no formato de MARKET_SHOCK_TYPES
+        priors: Tuplas (nome, alpha, beta) ou dict no formato de parameters.py
+            (None = valores atuais de parameters)
     """
-    evidence = {}
-    
-    # 1. AI_Investment: Baseado na progressão geral S0→S1, S1→S2
-    early_progression = (state_vector_curr[1] + state_vector_curr[2]) - (state_vector_prev[1] + state_vector_prev[2])
-    ai_investment_success_rate = max(0.1, min(0.9, 0.5 + early_progression * 2))
-    
-    evidence["AI_Investment"] = {
-        "successes": int(ai_investment_success_rate * 50),
-        "trials": 50
-    }
-    
-    # 2. Change_Adoption: Baseado na velocidade de transição S1→S2, S2→S3
-    if month > 3:  # Só após alguns meses para ter dados significativos
-        mid_progression = (state_vector_curr[2] + state_vector_curr[3]) - (state_vector_prev[2] + state_vector_prev[3])
-        change_adoption_rate = max(0.1, min(0.9, 0.5 + mid_progression * 3))
-        
-        evidence["Change_Adoption"] = {
-            "successes": int(change_adoption_rate * 40),
-            "trials": 40
-        }
-    
-    # 3. Training_Quality: Baseado na chegada ao estado avançado S3, S4
-    if month > 6:  # Só após tempo suficiente para treinamento mostrar efeito
-        advanced_progression = (state_vector_curr[3] + state_vector_curr[4]) - (state_vector_prev[3] + state_vector_prev[4])
-        training_quality_rate = max(0.1, min(0.9, 0.6 + advanced_progression * 4))
+    n_gerentes: int = 27000
+    n_months: int = 36
+    transition_matrix: tuple = None
+    learning_enabled: bool = True
+    regime_probs: tuple = (0.25, 0.50, 0.25)
+    regimes: tuple = DEFAULT_REGIME_SPECS
+    shock_probability: float = MARKET_SHOCK_PROBABILITY
+    shock_start_month: int = MARKET_SHOCK_START_MONTH
+    shock_catalogue: tuple = MARKET_SHOCK_TYPES
+    priors: tuple = None
+
+    def __post_init__(self):
+        n_states = len(states)
+        transition_matrix = None
+        if self.transition_matrix is not None:
+            matrix = np.asarray(self.transition_matrix, dtype=float)
+            if matrix.shape != (n_states, n_states):
+                raise ValueError(f"transition_matrix deve ser {n_states}x{n_states}")
+            transition_matrix = tuple(map(tuple, matrix.tolist()))
+        regimes = tuple(tuple(spec) for spec in self.regimes)
+        if tuple(spec[0] for spec in regimes) != tuple(spec[0] for spec in DEFAULT_REGIME_SPECS):
+            raise ValueError("regimes deve definir conservative, normal e aggressive, nessa ordem")
+        regime_probs = tuple(float(p) for p in self.regime_probs)
+        if len(regime_probs) != len(regimes) or not np.isclose(sum(regime_probs), 1.0):
+            raise ValueError("regime_probs deve ter uma probabilidade por regime, somando 1")
+        priors = parameters if self.priors is None else self.priors
+        if isinstance(priors, dict):
+            priors = [(name, p["alpha"], p["beta"]) for name, p in priors.items()]
         
-        evidence["Training_Quality"] = {
-            "successes": int(training_quality_rate * 30),
-            "trials": 30
+        # Campos normalizados para tuplas/escalares nativos (imutáveis e comparáveis)
+        normalized = {
+            "n_gerentes": int(self.n_gerentes),
+            "n_months": int(self.n_months),
+            "transition_matrix": transition_matrix,
+            "learning_enabled": bool(self.learning_enabled),
+            "regime_probs": regime_probs,
+            "regimes": regimes,
+            "shock_probability": float(self.shock_probability),
+            "shock_start_month": int(self.shock_start_month),
+            "shock_catalogue": tuple(tuple(shock) for shock in self.shock_catalogue),
+            "priors": tuple((str(name), float(a), float(b)) for name, a, b in priors),
         }
-    
-    return evidence
+        for name, value in normalized.items():
+            object.__setattr__(self, name, value)
 
-def update_posterior_params(current_params, evidence):
+    @property
+    def prior_dict(self):
+        """Priors no formato de parameters.py (entrada de BayesianParameterState.from_priors)."""
+        return {name: {"alpha": alpha, "beta": beta} for name, alpha, beta in self.priors}
+
+    def regime_values(self, column):
+        """Valores de uma coluna das definições de regime, um por regime."""
+        return _regime_values(self.regimes, column)
+
+    def to_dict(self):
+        """Dict com listas/escalares nativos (serializável em JSON)."""
+        return json.loads(json.dumps(asdict(self)))
+
+def _resolve_rng(rng=None, seed=None):
     """
-    Atualiza parâmetros bayesianos com base nas evidências observadas.
-    Implementa a fórmula: Posterior = Beta(α + sucessos, β + fracassos)
-    
-    Args:
-        current_params: Parâmetros atuais (com alpha e beta)
-        evidence: Evidências observadas no mês
+    Retorna o numpy.random.Generator usado por uma função de simulação.
+    Um rng explícito tem precedência; senão cria um Generator a partir da seed.
+    """
+    if rng is not None:
+        return rng
+    return np.random.default_rng(seed)
+
+def _resolve_timings(timings=None):
+    """
+    Instrumentação por fase usada por uma função de simulação.
     
     Returns:
-        dict: Parâmetros atualizados para uso no próximo mês
+        tuple: (PhaseTimings ou NULL_TIMINGS, True se criado aqui e deve ir ao resultado)
     """
-    updated_params = copy.deepcopy(current_params)
-    
-    for param_name, obs in evidence.items():
-        if param_name in updated_params:
-            # Atualização Bayesiana: α_new = α + sucessos, β_new = β + fracassos
-            updated_params[param_name]["alpha"] += obs["successes"]
-            updated_params[param_name]["beta"] += (obs["trials"] - obs["successes"])
-    
-    return updated_params
+    if isinstance(timings, PhaseTimings) or timings is NULL_TIMINGS:
+        return timings, False
+    if timings:
+        return PhaseTimings(), True
+    return NULL_TIMINGS, False
 
 def apply_bayesian_factors_to_transitions(transition_matrix, sampled_params):
     """
@@ -120,27 +266,30 @@ def apply_bayesian_factors_to_transitions(transition_matrix, sampled_params):
     # Log para debug (pode ser removido em produção)
     # print(f"Debug: weighted_factor={weighted_factor:.3f}, multiplier={disruption_multiplier:.3f}")
     
-    # Aplica transformação na matriz
+    return _apply_disruption_multiplier(transition_matrix, disruption_multiplier)
+
+
+def _apply_disruption_multiplier(transition_matrix, disruption_multiplier, progression_mask=None):
+    """
+    Multiplica as progressões (triângulo superior) pelo fator disruptivo,
+    limita a 95% e renormaliza as linhas não absorventes. A máscara de
+    progressões pode ser pré-calculada quando a matriz base não muda.
+    """
     modified_matrix = np.array(transition_matrix, dtype=float)
+    n_states = len(modified_matrix)
     
-    # Multiplica TODAS as transições de progressão pelo fator disruptivo
-    for i in range(len(modified_matrix) - 1):  # Não modifica estado absorvente
-        for j in range(i + 1, len(modified_matrix[i])):  # Apenas progressões
-            if modified_matrix[i][j] > 0:
-                # Aplica fator disruptivo
-                modified_matrix[i][j] *= disruption_multiplier
-                # Limita a 95% (impossível ter certeza absoluta)
-                modified_matrix[i][j] = min(0.95, modified_matrix[i][j])
-        
-        # RENORMALIZAÇÃO: Garante que linha soma 1.0
-        row_sum = np.sum(modified_matrix[i])
-        if row_sum > 0:
-            modified_matrix[i] = modified_matrix[i] / row_sum
+    # Apenas progressões; o estado absorvente não é modificado
+    if progression_mask is None:
+        progression_mask = np.triu(modified_matrix > 0, k=1)
+    # Limita a 95% (impossível ter certeza absoluta)
+    modified_matrix[progression_mask] = np.minimum(0.95, modified_matrix[progression_mask] * disruption_multiplier)
     
-    return modified_matrix
+    # RENORMALIZAÇÃO: Garante que cada linha soma 1.0
+    return _renormalize_rows(modified_matrix, slice(0, n_states - 1))
 
 
-def add_market_shocks(month, modified_matrix, shock_probability=0.25):
+def add_market_shocks(month, modified_matrix, shock_probability=MARKET_SHOCK_PROBABILITY, rng=None, seed=None,
+                      catalogue=None):
     """
     VERSÃO 3.1: CHOQUES DE MERCADO EXTREMOS
     
@@ -170,72 +319,98 @@ def add_market_shocks(month, modified_matrix, shock_probability=0.25):
         month: Mês atual da simulação
         modified_matrix: Matriz já modificada pelos parâmetros bayesianos
         shock_probability: Probabilidade mensal de choque (NOVO: 25% vs. 8%)
+        rng: numpy.random.Generator usado nas amostragens (opcional)
+        seed: Semente usada quando rng não é informado
+        catalogue: Catálogo de choques no formato de MARKET_SHOCK_TYPES (None = padrão)
     
     Returns:
         np.array: Matriz com possível choque aplicado
     """
     # Só aplica choques após mês 2 (período de setup)
-    if month < 2:
+    if month < MARKET_SHOCK_START_MONTH:
         return modified_matrix
     
+    rng = _resolve_rng(rng, seed)
+    
     # Verifica se ocorre choque neste mês (AGORA: 25% chance!)
-    if np.random.random() > shock_probability:
+    if rng.random() > shock_probability:
         return modified_matrix  # Sem choque
     
-    # TIPOS DE CHOQUES COM DIFERENTES PROBABILIDADES E INTENSIDADES:
-    shock_type = np.random.choice([
-        "regulatory_negative",    # 20% - Regulamentação restritiva
-        "breakthrough_positive",  # 20% - Breakthrough tecnológico  
-        "competitive_frenzy",     # 20% - FOMO competitivo
-        "backlash_crisis",       # 15% - Backlash/resistência massiva
-        "funding_crash",         # 10% - Corte orçamentário
-        "viral_adoption",        # 10% - Adoção viral súbita
-        "talent_shortage",       # 5%  - Falta de especialistas
-    ], p=[0.20, 0.20, 0.20, 0.15, 0.10, 0.10, 0.05])
+    # TIPOS DE CHOQUES COM DIFERENTES PROBABILIDADES E INTENSIDADES
+    # (catálogo declarativo: ver MARKET_SHOCK_TYPES)
+    probs, means, stds, lower, upper = _shock_catalogue_arrays(catalogue)
+    shock_type = rng.choice(len(probs), p=probs)
     
     # INTENSIDADES EXTREMAS (baseadas em observações 2023-2024)
-    if shock_type in ["regulatory_negative", "backlash_crisis", "funding_crash"]:
-        # CHOQUES NEGATIVOS SEVEROS
-        shock_intensity = np.random.normal(-0.45, 0.25)  # Média -45%, std 25%
-        shock_intensity = max(-0.80, shock_intensity)    # Limita a -80% (quase paralisa)
-        
-    elif shock_type in ["breakthrough_positive", "viral_adoption"]:
-        # CHOQUES POSITIVOS EXPONENCIAIS  
-        shock_intensity = np.random.normal(0.60, 0.35)   # Média +60%, std 35%
-        shock_intensity = min(1.50, shock_intensity)     # Limita a +150% (3x aceleração)
-        
-    elif shock_type == "competitive_frenzy":
-        # FOMO ORGANIZACIONAL (positivo mas volátil)
-        shock_intensity = np.random.normal(0.40, 0.30)   # Média +40%, std 30%
-        shock_intensity = min(1.00, shock_intensity)     # Limita a +100%
-        
-    else:  # talent_shortage
-        # GARGALO DE TALENTO (neutro com muita incerteza)
-        shock_intensity = np.random.normal(0.0, 0.40)    # Média 0%, std 40%
+    shock_intensity = np.clip(rng.normal(means[shock_type], stds[shock_type]), lower[shock_type], upper[shock_type])
     
     # APLICA CHOQUE: modifica TODAS as probabilidades de progressão
     shocked_matrix = np.array(modified_matrix, dtype=float)
-    shock_factor = 1.0 + shock_intensity
-    
-    for i in range(len(shocked_matrix) - 1):  # Não modifica estado absorvente
-        for j in range(i + 1, len(shocked_matrix[i])):  # Apenas progressões
-            if shocked_matrix[i][j] > 0:
-                # Aplica choque com intensidade extrema
-                shocked_matrix[i][j] *= shock_factor
-                # Garante limites físicos (mais permissivos)
-                shocked_matrix[i][j] = max(0.005, min(0.98, shocked_matrix[i][j]))
-        
-        # Renormaliza linha
-        row_sum = np.sum(shocked_matrix[i])
-        if row_sum > 0:
-            shocked_matrix[i] = shocked_matrix[i] / row_sum
+    return _apply_market_shock(shocked_matrix, shock_intensity, np.triu(shocked_matrix > 0, k=1))
+
+
+def _shock_catalogue_arrays(catalogue=None):
+    """Converte o catálogo de choques em arrays (probabilidade, média, desvio, limites)."""
+    catalogue = MARKET_SHOCK_TYPES if catalogue is None else catalogue
+    probs = np.array([s[1] for s in catalogue], dtype=float)
+    means = np.array([s[2] for s in catalogue], dtype=float)
+    stds = np.array([s[3] for s in catalogue], dtype=float)
+    lower = np.array([-np.inf if s[4] is None else s[4] for s in catalogue], dtype=float)
+    upper = np.array([np.inf if s[5] is None else s[5] for s in catalogue], dtype=float)
+    return probs, means, stds, lower, upper
+
+
+def _apply_market_shock(matrices, intensity, progression_mask):
+    """
+    Aplica choques (fator 1 + intensidade) às progressões de uma matriz ou de
+    uma pilha (..., n, n), com limites físicos [0.005, 0.98] e renormalização
+    das linhas não absorventes.
+    """
+    shock_factor = (1.0 + np.asarray(intensity, dtype=float))[..., None, None]
+    shocked = np.where(progression_mask, np.clip(matrices * shock_factor, 0.005, 0.98), matrices)
+    return _renormalize_rows(shocked, slice(0, shocked.shape[-1] - 1))
+
+
+def build_shock_calendar(n_simulations, n_months, catalogue=None, shock_probability=MARKET_SHOCK_PROBABILITY,
+                         start_month=MARKET_SHOCK_START_MONTH, rng=None, seed=None):
+    """
+    Sorteia de uma vez os choques de mercado de todas as organizações e meses.
+    
+    O calendário pode ser reutilizado entre cenários (ver run_monte_carlo_analysis)
+    para que comparações usem exatamente os mesmos choques.
+    
+    Args:
+        n_simulations: Número de organizações
+        n_months: Horizonte temporal
+        catalogue: Catálogo de choques no formato de MARKET_SHOCK_TYPES (None = padrão)
+        shock_probability: Probabilidade mensal de choque
+        start_month: Primeiro mês sujeito a choques
+        rng: numpy.random.Generator (opcional)
+        seed: Semente usada quando rng não é informado
+    
+    Returns:
+        dict: "shock_type" int8 (n_sims, n_months) com o índice no catálogo
+            (-1 = sem choque) e "intensity" float64 (n_sims, n_months). As
+            intensidades ficam em float64 mesmo com dtype="float32": elas
+            entram nas matrizes de transição, que são sempre float64, e
+            arredondá-las mudaria os resultados em relação ao sorteio mês a mês
+    """
+    rng = _resolve_rng(rng, seed)
+    probs, means, stds, lower, upper = _shock_catalogue_arrays(catalogue)
     
-    # Log do choque (para debugging/análise)
-    # print(f"🚨 CHOQUE Mês {month}: {shock_type} ({shock_intensity:+.1%})")
+    shock_type = np.full((n_simulations, n_months), -1, dtype=np.int8)
+    intensity = np.zeros((n_simulations, n_months))
     
-    return shocked_matrix
+    start_month = min(start_month, n_months)
+    occurred = rng.random((n_simulations, n_months - start_month)) <= shock_probability
+    types = rng.choice(len(probs), size=int(occurred.sum()), p=probs)
+    shock_type[:, start_month:][occurred] = types
+    intensity[:, start_month:][occurred] = np.clip(rng.normal(means[types], stds[types]), lower[types], upper[types])
+    
+    return {"shock_type": shock_type, "intensity": intensity}
+
 
-def simulate_individual_transitions(n_gerentes, state_vector, modified_transition_matrix):
+def simulate_individual_transitions(n_gerentes, state_vector, modified_transition_matrix, rng=None, seed=None):
     """
     Simula transições estocásticas individuais para cada gerente.
     
@@ -243,10 +418,14 @@ def simulate_individual_transitions(n_gerentes, state_vector, modified_transitio
         n_gerentes: Número total de gerentes
         state_vector: Distribuição atual de estados
         modified_transition_matrix: Matriz de transição modificada
+        rng: numpy.random.Generator usado nas amostragens (opcional)
+        seed: Semente usada quando rng não é informado
     
     Returns:
         np.array: Nova distribuição de estados após transições estocásticas
     """
+    rng = _resolve_rng(rng, seed)
+    
     # Converte distribuição em contagens de gerentes por estado
     state_counts = np.round(state_vector * n_gerentes).astype(int)
     
@@ -266,7 +445,7 @@ def simulate_individual_transitions(n_gerentes, state_vector, modified_transitio
             transition_probs = modified_transition_matrix[current_state]
             
             # Simula transições estocásticas
-            transitions = np.random.multinomial(
+            transitions = rng.multinomial(
                 n_managers_in_state, 
                 transition_probs
             )
@@ -278,6 +457,107 @@ def simulate_individual_transitions(n_gerentes, state_vector, modified_transitio
     return new_state_counts / n_gerentes
 
 
+# ===== ESTADO BAYESIANO COMPACTO (STRUCT-OF-ARRAYS) =====
+class BayesianParameterState:
+    """
+    Parâmetros Beta(alpha, beta) como arrays NumPy indexados por parâmetro.
+    
+    A última dimensão segue a ordem de names; dimensões iniciais opcionais
+    representam um lote de organizações (ex.: (n_sims, n_params)). As notas
+    descritivas continuam em parameters.py e não são copiadas.
+    
+    Args:
+        names: Nomes dos parâmetros, na ordem da última dimensão
+        alpha: Array (..., n_params) com os alphas
+        beta: Array (..., n_params) com os betas
+    """
+
+    def __init__(self, names, alpha, beta):
+        self.names = tuple(names)
+        self.alpha = np.array(alpha, dtype=float)
+        self.beta = np.array(beta, dtype=float)
+
+    @classmethod
+    def from_priors(cls, priors=None, batch_shape=()):
+        """
+        Cria o estado a partir de um dict no formato de parameters.py.
+        
+        Args:
+            priors: Dict {nome: {"alpha", "beta", ...}} (None = parameters)
+            batch_shape: Dimensões iniciais do lote (() = uma organização)
+        """
+        priors = parameters if priors is None else priors
+        names = tuple(priors)
+        shape = tuple(batch_shape) + (len(names),)
+        alpha = np.broadcast_to([float(priors[k]["alpha"]) for k in names], shape)
+        beta = np.broadcast_to([float(priors[k]["beta"]) for k in names], shape)
+        return cls(names, alpha, beta)
+
+    @property
+    def mean(self):
+        return self.alpha / (self.alpha + self.beta)
+
+    def sample(self, rng, uniforms=None):
+        """
+        Uma amostra Beta por parâmetro (e por organização do lote). Com
+        uniforms (mesma forma de alpha), as amostras são a inversa da CDF
+        Beta nesses pontos (amostragem quasi-aleatória/antitética).
+        """
+        if uniforms is not None:
+            from scipy.special import betaincinv
+            return betaincinv(self.alpha, self.beta, uniforms)
+        return rng.beta(self.alpha, self.beta)
+
+    def update(self, successes, failures):
+        """Atualização conjugada in-place: Beta(α,β) + evidência → Beta(α+s, β+f)."""
+        self.alpha += successes
+        self.beta += failures
+        return self
+
+    def weights(self, weights_by_name):
+        """Vetor de pesos alinhado a names (ex.: BAYESIAN_FACTOR_WEIGHTS)."""
+        return np.array([weights_by_name[k] for k in self.names])
+
+    def to_dict(self):
+        """Formato legado {nome: {"alpha", "beta"}} (apenas estado sem lote)."""
+        return {
+            name: {"alpha": float(self.alpha[i]), "beta": float(self.beta[i])}
+            for i, name in enumerate(self.names)
+        }
+
+
+def observe_evidence_arrays(state_changes, month, names=None):
+    """
+    Versão vetorizada de observe_monthly_evidence.
+    
+    Args:
+        state_changes: Array (..., n_states) com a variação da distribuição de estados
+        month: Mês atual (para modular força da evidência)
+        names: Ordem dos parâmetros nas colunas (None = EVIDENCE_PARAMETERS)
+    
+    Returns:
+        tuple: (successes, failures), arrays (..., n_params)
+    """
+    # Força da evidência cresce com o tempo
+    base_observations = int(1000 * min(1.0, month / 12.0))
+    state_changes = np.asarray(state_changes, dtype=float)
+    
+    # Colunas na ordem de EVIDENCE_PARAMETERS
+    successes = np.empty(state_changes.shape[:-1] + (len(EVIDENCE_PARAMETERS),))
+    # AI_Investment: avanços nos estados S3 e S4
+    successes[..., 0] = base_observations * state_changes[..., 3:].sum(axis=-1) * 10
+    # Change_Adoption: mudanças positivas
+    successes[..., 1] = base_observations * np.maximum(state_changes[..., 1:], 0).sum(axis=-1) * 5
+    # Training_Quality: progresso no estado final S4
+    successes[..., 2] = base_observations * state_changes[..., 4] * 15
+    if names is not None and tuple(names) != EVIDENCE_PARAMETERS:
+        successes = successes[..., [EVIDENCE_PARAMETERS.index(k) for k in names]]
+    np.trunc(successes, out=successes)
+    np.maximum(successes, 0, out=successes)
+    failures = np.maximum(base_observations - successes, 0)
+    return successes, failures
+
+
 def observe_monthly_evidence(prev_state_vector, current_state_vector, month):
     """
     Simula observação de evidências mensais baseadas na evolução dos estados.
@@ -290,32 +570,12 @@ def observe_monthly_evidence(prev_state_vector, current_state_vector, month):
     Returns:
         dict: Evidências observadas para atualização bayesiana
     """
-    # Calcula mudanças na distribuição
-    state_changes = current_state_vector - prev_state_vector
-    
-    # Força da evidência cresce com o tempo
-    evidence_strength = min(1.0, month / 12.0)
-    base_observations = int(1000 * evidence_strength)
-    
-    # Evidência para AI_Investment (baseada em avanços nos estados)
-    advanced_gains = np.sum(state_changes[3:])  # Estados S3 e S4
-    ai_successes = max(0, int(base_observations * advanced_gains * 10))
-    ai_failures = max(0, base_observations - ai_successes)
-    
-    # Evidência para Change_Adoption (baseada em mudanças positivas)
-    positive_changes = np.sum(np.maximum(state_changes[1:], 0))
-    change_successes = max(0, int(base_observations * positive_changes * 5))
-    change_failures = max(0, base_observations - change_successes)
-    
-    # Evidência para Training_Quality (baseada no estado final S4)
-    training_progress = state_changes[4]
-    training_successes = max(0, int(base_observations * training_progress * 15))
-    training_failures = max(0, base_observations - training_successes)
-    
+    successes, failures = observe_evidence_arrays(
+        np.asarray(current_state_vector) - np.asarray(prev_state_vector), month
+    )
     return {
-        "AI_Investment": {"successes": ai_successes, "failures": ai_failures},
-        "Change_Adoption": {"successes": change_successes, "failures": change_failures},
-        "Training_Quality": {"successes": training_successes, "failures": training_failures}
+        name: {"successes": int(successes[i]), "failures": int(failures[i])}
+        for i, name in enumerate(EVIDENCE_PARAMETERS)
     }
 
 
@@ -352,7 +612,9 @@ def update_posterior_params(current_params, evidence):
     
     return updated_params
 
-def run_stochastic_simulation(n_gerentes=27000, n_months=36, transition_matrix=None, learning_enabled=True):
+def run_stochastic_simulation(n_gerentes=27000, n_months=36, transition_matrix=None, learning_enabled=True,
+                              rng=None, seed=None, detail="full", records=None, shocks=None,
+                              checkpoint=None, checkpoint_every=1, priors=None, timings=None):
     """
     Executa UMA simulação estocástica completa com:
     1. Amostragem de parâmetros bayesianos
@@ -364,102 +626,208 @@ def run_stochastic_simulation(n_gerentes=27000, n_months=36, transition_matrix=N
         n_months: Horizonte temporal
         transition_matrix: Matriz base de transição
         learning_enabled: Aprendizado temporal ativo
+        rng: numpy.random.Generator usado em todas as amostragens (opcional)
+        seed: Semente usada quando rng não é informado
+        detail: "full" (DataFrame + logs em dicts, formato original),
+            "summary" (sem pandas/dicts; inclui posteriors finais em array)
+            ou "none" (apenas capacidades e estado final)
+        records: Arrays pré-alocados (opcional) preenchidos in-place:
+            "params_evolution" (n_months, n_params, 4) e "evidences" (n_months, n_params, 2)
+        shocks: Linha de um calendário de build_shock_calendar, como tupla
+            (shock_type, intensity) de arrays (n_months,); None = choques
+            sorteados mês a mês com add_market_shocks
+        checkpoint: Caminho de um arquivo .npz de checkpoint. O estado completo
+            (vetor de estados, alpha/beta, estado do gerador, capacidades parciais
+            e logs) é gravado a cada checkpoint_every meses; se o arquivo já
+            existir, a simulação continua dele, inclusive com n_months maior
+            (extensão do horizonte sem refazer os meses já simulados).
+            Retomar com outra configuração (matriz, aprendizado, detail, priors
+            ou choques dos meses já simulados) levanta ValueError.
+            Os arrays de records não fazem parte do checkpoint.
+        checkpoint_every: Intervalo, em meses, entre gravações do checkpoint
+        priors: Priors no formato de parameters.py (None = parameters)
+        timings: True para medir o tempo de cada fase (resultado em "timings",
+            ver timing.PhaseTimings.to_dict), ou um PhaseTimings no qual acumular
     
     Returns:
         dict: Resultados de uma simulação estocástica
     """
+    if detail not in DETAIL_LEVELS:
+        raise ValueError(f"detail desconhecido: {detail!r} (use {', '.join(DETAIL_LEVELS)})")
     if transition_matrix is None:
-        transition_matrix = [
-            [0.7, 0.3, 0.0, 0.0, 0.0],
-            [0.0, 0.75, 0.25, 0.0, 0.0],
-            [0.0, 0.0, 0.85, 0.15, 0.0],
-            [0.0, 0.0, 0.0, 0.9, 0.1],
-            [0.0, 0.0, 0.0, 0.0, 1.0],
-        ]
-    
-    # Inicialização
-    current_params = copy.deepcopy(parameters)
+        transition_matrix = DEFAULT_TRANSITION_MATRIX
+    rng = _resolve_rng(rng, seed)
+    timer, report_timings = _resolve_timings(timings)
+    log_dicts = detail == "full"
+    records = records or {}
+    
+    # Inicialização (estado compacto: arrays alpha/beta, sem cópia das notas)
+    param_state = BayesianParameterState.from_priors(priors)
+    factor_weights = param_state.weights(BAYESIAN_FACTOR_WEIGHTS)
+    transition_matrix = np.asarray(transition_matrix, dtype=float)
+    progression_mask = np.triu(transition_matrix > 0, k=1)
+    multipliers = np.array([s["multiplicador"] for s in states])
     state_vector = np.zeros(len(states))
     state_vector[0] = 1.0  # Todos começam em S0
     
-    monthly_capacities = []
+    monthly_capacities = np.empty(n_months)
     params_evolution = []
     evidences_log = []
-    state_history = [state_vector.copy()]  # Para rastrear histórico
+    start_month = 0
+    
+    # Retomada de um checkpoint (fronteira de mês): todas as entradas que
+    # afetam o resultado, exceto n_months (extensível) e o calendário de
+    # choques, cujo trecho já simulado é conferido à parte
+    run_config = {
+        "n_gerentes": int(n_gerentes),
+        "transition_matrix": transition_matrix.tolist(),
+        "learning_enabled": bool(learning_enabled),
+        "detail": detail,
+        "priors": {
+            "names": list(param_state.names),
+            "alpha": param_state.alpha.tolist(),
+            "beta": param_state.beta.tolist(),
+        },
+        "shocks": "random" if shocks is None else "calendar",
+    }
+    if checkpoint is not None:
+        from cache import load_results, save_results  # carregado só quando há checkpoint
+    if checkpoint is not None and os.path.exists(checkpoint):
+        saved = load_results(checkpoint)
+        if saved["run_config"] != run_config:
+            raise ValueError("checkpoint foi gerado com outra configuração de simulação")
+        start_month = saved["month"]
+        if start_month > n_months:
+            raise ValueError("checkpoint já avançou além de n_months")
+        if shocks is not None and not all(
+            np.array_equal(np.asarray(current)[:start_month], applied)
+            for current, applied in zip(shocks, saved["shock_calendar"])
+        ):
+            raise ValueError("checkpoint foi gerado com outro calendário de choques")
+        rng = _generator_from_state(saved["rng_state"])
+        param_state = BayesianParameterState(param_state.names, saved["alpha"], saved["beta"])
+        state_vector = saved["state_vector"]
+        monthly_capacities[:start_month] = saved["monthly_capacities"]
+        params_evolution = saved["params_evolution"]
+        evidences_log = saved["evidences_log"]
     
     # Simulação mês a mês
-    for month in range(n_months):
+    for month in range(start_month, n_months):
+        timer.mark()
         # 1. Amostra parâmetros bayesianos
-        sampled_params = {
-            k: beta.rvs(p["alpha"], p["beta"])
-            for k, p in current_params.items()
-        }
+        sampled = param_state.sample(rng)
+        timer.lap("beta_sampling")
         
         # 2. Modifica matriz de transição baseada nos parâmetros
-        modified_matrix = apply_bayesian_factors_to_transitions(
-            transition_matrix, sampled_params
-        )
+        disruption_multiplier = 0.3 + (sampled @ factor_weights) * 2.7
+        modified_matrix = _apply_disruption_multiplier(transition_matrix, disruption_multiplier, progression_mask)
+        timer.lap("bayesian_factors")
         
         # 2.5. NOVA FUNCIONALIDADE: Aplica choques de mercado aleatórios
         # VERSÃO 3.1: CHOQUES MUITO MAIS FREQUENTES E INTENSOS
         # Base teórica: Black Swan + Punctuated Equilibrium + IA volatility
-        modified_matrix = add_market_shocks(month, modified_matrix, shock_probability=0.25)
+        if shocks is None:
+            modified_matrix = add_market_shocks(month, modified_matrix, rng=rng)
+        elif shocks[0][month] >= 0:
+            modified_matrix = _apply_market_shock(modified_matrix, shocks[1][month], progression_mask)
+        timer.lap("market_shocks")
         
         # 3. Registra evolução dos parâmetros
-        params_evolution.append({
-            param: {
-                "alpha": current_params[param]["alpha"],
-                "beta": current_params[param]["beta"],
-                "mean": current_params[param]["alpha"] / (current_params[param]["alpha"] + current_params[param]["beta"]),
-                "sampled_value": sampled_params[param]
-            }
-            for param in current_params
-        })
+        if log_dicts:
+            means = param_state.mean
+            params_evolution.append({
+                param: {
+                    "alpha": float(param_state.alpha[i]),
+                    "beta": float(param_state.beta[i]),
+                    "mean": float(means[i]),
+                    "sampled_value": float(sampled[i])
+                }
+                for i, param in enumerate(param_state.names)
+            })
+        if "params_evolution" in records:
+            log = records["params_evolution"][month]
+            log[:, 0] = param_state.alpha
+            log[:, 1] = param_state.beta
+            log[:, 2] = param_state.mean
+            log[:, 3] = sampled
+        timer.lap("post_processing", calls=0)
         
         # 4. Simula transições estocásticas
         if month > 0:
-            prev_state_vector = state_vector.copy()
+            prev_state_vector = state_vector
             state_vector = simulate_individual_transitions(
-                n_gerentes, state_vector, modified_matrix
+                n_gerentes, state_vector, modified_matrix, rng=rng
             )
-            state_history.append(state_vector.copy())
+        timer.lap("transitions")
         
         # 5. Calcula capacidade do mês
-        monthly_capacity = np.sum([
-            states[i]["multiplicador"] * state_vector[i]
-            for i in range(len(states))
-        ]) * 2000
+        monthly_capacities[month] = (state_vector @ multipliers) * 2000
+        timer.lap("post_processing")
         
-        monthly_capacities.append(monthly_capacity)
-        
-        # 6. Atualização bayesiana (se habilitada)
+        # 6. Atualização bayesiana in-place (se habilitada)
         if learning_enabled and month > 0:
-            evidence = observe_monthly_evidence(
-                prev_state_vector, state_vector, month
+            successes, failures = observe_evidence_arrays(
+                state_vector - prev_state_vector, month, param_state.names
             )
-            evidences_log.append(evidence)
-            current_params = update_posterior_params(current_params, evidence)
+            if log_dicts:
+                evidences_log.append({
+                    param: {"successes": int(successes[i]), "failures": int(failures[i])}
+                    for i, param in enumerate(param_state.names)
+                })
+            if "evidences" in records:
+                records["evidences"][month, :, 0] = successes
+                records["evidences"][month, :, 1] = failures
+            param_state.update(successes, failures)
+            timer.lap("posterior_update")
+        
+        # 7. Checkpoint na fronteira do mês
+        if checkpoint is not None and ((month + 1) % checkpoint_every == 0 or month + 1 == n_months):
+            save_results(checkpoint, {
+                "run_config": run_config,
+                "month": month + 1,
+                "rng_state": _generator_state(rng),
+                "state_vector": state_vector,
+                "alpha": param_state.alpha,
+                "beta": param_state.beta,
+                "monthly_capacities": monthly_capacities[:month + 1],
+                "params_evolution": params_evolution,
+                "evidences_log": evidences_log,
+                "shock_calendar": None if shocks is None else [
+                    np.asarray(values)[:month + 1] for values in shocks
+                ],
+            })
     
     # Resultados finais
+    timer.mark()
     final_mean_accounts = monthly_capacities[-1]
     total_capacity = final_mean_accounts * n_gerentes
     
-    df_monthly = pd.DataFrame({
-        "Mês": list(range(n_months)),
-        "Contas por Gerente (média)": monthly_capacities
-    })
-    
-    return {
-        "df_monthly": df_monthly,
+    result = {
+        "monthly_capacities": monthly_capacities,
         "final_mean_accounts": final_mean_accounts,
         "total_capacity": total_capacity,
         "state_distribution": state_vector,
-        "params_evolution": params_evolution,
-        "evidences_log": evidences_log,
         "learning_enabled": learning_enabled
     }
+    if detail != "none":
+        result["final_posteriors"] = np.stack(
+            [param_state.alpha, param_state.beta], axis=-1
+        ).astype(np.float32)
+    if log_dicts:
+        import pandas as pd  # só o formato detalhado monta DataFrame
+        result["df_monthly"] = pd.DataFrame({
+            "Mês": list(range(n_months)),
+            "Contas por Gerente (média)": monthly_capacities
+        })
+        result["params_evolution"] = params_evolution
+        result["evidences_log"] = evidences_log
+    timer.lap("post_processing")
+    if report_timings:
+        result["timings"] = timer.to_dict()
+    return result
 
-def run_simulation_with_temporal_learning(n_gerentes=27000, n_months=36, transition_matrix=None, learning_enabled=True):
+def run_simulation_with_temporal_learning(n_gerentes=27000, n_months=36, transition_matrix=None, learning_enabled=True,
+                                          rng=None, seed=None):
     """
     Executa simulação com aprendizado temporal bayesiano.
     Os posteriores de cada mês se tornam os priors do mês seguinte.
@@ -469,21 +837,18 @@ def run_simulation_with_temporal_learning(n_gerentes=27000, n_months=36, transit
         n_months: Horizonte temporal em meses
         transition_matrix: Matriz de transição de Markov
         learning_enabled: Se True, aplica aprendizado temporal; se False, usa método original
+        rng: numpy.random.Generator usado nas amostragens (opcional)
+        seed: Semente usada quando rng não é informado
     
     Returns:
         dict: Resultados da simulação incluindo evolução dos parâmetros
     """
     if transition_matrix is None:
-        transition_matrix = [
-            [0.7, 0.3, 0.0, 0.0, 0.0],
-            [0.0, 0.75, 0.25, 0.0, 0.0],
-            [0.0, 0.0, 0.85, 0.15, 0.0],
-            [0.0, 0.0, 0.0, 0.9, 0.1],
-            [0.0, 0.0, 0.0, 0.0, 1.0],
-        ]
+        transition_matrix = DEFAULT_TRANSITION_MATRIX
+    rng = _resolve_rng(rng, seed)
 
-    # Inicialização dos parâmetros (cópia para não modificar original)
-    current_params = copy.deepcopy(parameters)
+    # Inicialização dos parâmetros (arrays próprios; o original não é modificado)
+    param_state = BayesianParameterState.from_priors()
     
     # Estruturas para armazenar evolução
     state_vector = np.zeros((n_months, len(states)))
@@ -496,20 +861,18 @@ def run_simulation_with_temporal_learning(n_gerentes=27000, n_months=36, transit
     # Simulação mês a mês com aprendizado
     for month in range(n_months):
         # 1. Amostra parâmetros com distribuições atuais
-        current_priors = {
-            k: beta.rvs(p["alpha"], p["beta"])
-            for k, p in current_params.items()
-        }
+        sampled = param_state.sample(rng)
         
         # 2. Registra estado dos parâmetros
+        means = param_state.mean
         params_evolution.append({
             param: {
-                "alpha": current_params[param]["alpha"],
-                "beta": current_params[param]["beta"],
-                "mean": current_params[param]["alpha"] / (current_params[param]["alpha"] + current_params[param]["beta"]),
-                "sampled_value": current_priors[param]
+                "alpha": float(param_state.alpha[i]),
+                "beta": float(param_state.beta[i]),
+                "mean": float(means[i]),
+                "sampled_value": float(sampled[i])
             }
-            for param in current_params
+            for i, param in enumerate(param_state.names)
         })
         
         # 3. Evolução da cadeia de Markov
@@ -526,15 +889,16 @@ def run_simulation_with_temporal_learning(n_gerentes=27000, n_months=36, transit
         
         # 5. Observa evidências e atualiza parâmetros (só se learning habilitado)
         if learning_enabled and month > 0:
-            evidence = observe_monthly_evidence(
-                state_vector[month-1], 
-                state_vector[month], 
-                month
+            successes, failures = observe_evidence_arrays(
+                state_vector[month] - state_vector[month-1], month, param_state.names
             )
-            evidences_log.append(evidence)
+            evidences_log.append({
+                param: {"successes": int(successes[i]), "failures": int(failures[i])}
+                for i, param in enumerate(param_state.names)
+            })
             
-            # Atualiza parâmetros para próximo mês
-            current_params = update_posterior_params(current_params, evidence)
+            # Atualiza parâmetros in-place para o próximo mês
+            param_state.update(successes, failures)
     
     # Resultados finais
     state_counts = (state_vector[-1] * n_gerentes).astype(int)
@@ -542,6 +906,7 @@ def run_simulation_with_temporal_learning(n_gerentes=27000, n_months=36, transit
     final_mean_accounts = monthly_capacities[-1]
     total_capacity = final_mean_accounts * n_gerentes
     
+    import pandas as pd
     df_monthly = pd.DataFrame({
         "Mês": list(range(n_months)),
         "Contas por Gerente (média)": monthly_capacities
@@ -557,7 +922,7 @@ def run_simulation_with_temporal_learning(n_gerentes=27000, n_months=36, transit
         "learning_enabled": learning_enabled
     }
 
-def run_simulation(n_gerentes=27000, n_months=36, transition_matrix=None):
+def run_simulation(n_gerentes=27000, n_months=36, transition_matrix=None, rng=None, seed=None):
     """
     Função de compatibilidade - executa simulação com aprendizado temporal habilitado.
     Mantém interface original para não quebrar código existente.
@@ -566,10 +931,592 @@ def run_simulation(n_gerentes=27000, n_months=36, transition_matrix=None):
         n_gerentes=n_gerentes, 
         n_months=n_months, 
         transition_matrix=transition_matrix, 
-        learning_enabled=True
+        learning_enabled=True,
+        rng=rng,
+        seed=seed
     )
 
-def run_monte_carlo_analysis(n_gerentes=27000, n_months=36, transition_matrix=None, learning_enabled=True, n_simulations=1000):
+def _renormalize_rows(matrices, rows=slice(None)):
+    """Renormaliza (in-place) as linhas indicadas de uma pilha de matrizes (..., n, n)."""
+    block = matrices[..., rows, :]
+    row_sums = block.sum(axis=-1, keepdims=True)
+    np.divide(block, row_sums, out=block, where=row_sums > 0)
+    matrices[..., rows, :] = block
+    return matrices
+
+
+def _allocate_detail_records(detail, n_simulations, n_months):
+    """
+    Pré-aloca os registros por organização (float32) do nível de detalhe.
+    
+    - "none": nenhum registro
+    - "summary": "final_state_distributions" (n_sims, n_states) e
+      "final_posteriors" (n_sims, n_params, 2) com alpha/beta ao fim do horizonte
+    - "full": também "params_evolution" (n_sims, n_months, n_params, 4) com
+      alpha, beta, média e valor amostrado, e "evidences" (n_sims, n_months, n_params, 2)
+      com sucessos/fracassos observados
+    """
+    if detail not in DETAIL_LEVELS:
+        raise ValueError(f"detail desconhecido: {detail!r} (use {', '.join(DETAIL_LEVELS)})")
+    records = {}
+    n_params = len(parameters)
+    if detail in ("summary", "full"):
+        records["final_state_distributions"] = np.zeros((n_simulations, len(states)), dtype=np.float32)
+        records["final_posteriors"] = np.zeros((n_simulations, n_params, 2), dtype=np.float32)
+    if detail == "full":
+        records["params_evolution"] = np.zeros((n_simulations, n_months, n_params, 4), dtype=np.float32)
+        records["evidences"] = np.zeros((n_simulations, n_months, n_params, 2), dtype=np.float32)
+    return records
+
+def sample_organizational_dna(n_simulations, rng=None, seed=None, uniforms=None):
+    """
+    Amostra o DNA organizacional de todas as organizações em uma única chamada.
+    
+    Args:
+        n_simulations: Número de organizações
+        rng: numpy.random.Generator (opcional)
+        seed: Semente usada quando rng não é informado
+        uniforms: Array (n_simulations, n_dimensões) de uniformes em [0, 1)
+            mapeados pela inversa da CDF Beta de cada dimensão (ver
+            sample_input_uniforms); None = amostragem pseudoaleatória
+    
+    Returns:
+        np.array: (n_simulations, n_dimensões), colunas na ordem de ORG_DNA_DIMENSIONS
+    """
+    dna_alpha = np.array([d[1] for d in ORG_DNA_DIMENSIONS])
+    dna_beta = np.array([d[2] for d in ORG_DNA_DIMENSIONS])
+    if uniforms is not None:
+        from scipy.special import betaincinv
+        return betaincinv(dna_alpha, dna_beta, uniforms)
+    rng = _resolve_rng(rng, seed)
+    return rng.beta(dna_alpha, dna_beta, size=(n_simulations, len(ORG_DNA_DIMENSIONS)))
+
+
+def input_dimension(n_months, n_params):
+    """Coordenadas por organização: regime, DNA e n_params parâmetros Beta por mês."""
+    return 1 + len(ORG_DNA_DIMENSIONS) + n_months * n_params
+
+
+def sample_input_uniforms(n_simulations, dimension, sampling="random", antithetic=False, rng=None,
+                          sobol_seed=None, sobol_index=0):
+    """
+    Uniformes que alimentam as entradas por organização (regime, DNA e
+    parâmetros Beta de cada mês), uma linha por organização.
+    
+    Com sampling="sobol", as linhas são pontos de uma sequência de Sobol
+    embaralhada (scipy.stats.qmc, semente sobol_seed) a partir do índice
+    sobol_index: blocos consecutivos da mesma execução cobrem trechos
+    consecutivos da sequência. Com antithetic=True, as organizações vêm em
+    pares (u, 1 - u), e metade dos pontos é sorteada.
+    
+    Args:
+        n_simulations: Número de organizações
+        dimension: Coordenadas por organização (ver input_dimension)
+        sampling: "random" (rng.random) ou "sobol"
+        antithetic: Pareia cada organização com sua antitética
+        rng: numpy.random.Generator (sampling="random")
+        sobol_seed: Semente do embaralhamento (a mesma para todos os blocos)
+        sobol_index: Índice da primeira organização na execução
+    
+    Returns:
+        np.array: (n_simulations, dimension) em [0, 1)
+    """
+    n_points = -(-n_simulations // 2) if antithetic else n_simulations
+    if sampling == "sobol":
+        points = _sobol_points(n_points, dimension, sobol_seed, sobol_index // 2 if antithetic else sobol_index)
+    else:
+        points = _resolve_rng(rng).random((n_points, dimension))
+    if antithetic:
+        points = np.stack([points, 1.0 - points], axis=1).reshape(-1, dimension)[:n_simulations]
+    return points
+
+
+# Gerador Sobol da thread: o embaralhamento é feito uma vez por (dimensão,
+# semente) e blocos em ordem só avançam o gerador até o índice pedido
+_sobol_cache = threading.local()
+
+
+def _sobol_points(n_points, dimension, seed, index):
+    from scipy.stats import qmc
+    key = (dimension, seed)
+    if getattr(_sobol_cache, "key", None) != key:
+        _sobol_cache.key = key
+        _sobol_cache.engine = qmc.Sobol(dimension, scramble=True, seed=seed)
+    engine = _sobol_cache.engine
+    if engine.num_generated > index:
+        engine.reset()
+    if index > engine.num_generated:
+        engine.fast_forward(index - engine.num_generated)
+    with warnings.catch_warnings():
+        # Blocos não são potências de 2; o equilíbrio vale para a sequência da execução
+        warnings.simplefilter("ignore", UserWarning)
+        return engine.random(n_points)
+
+
+def customize_transition_matrices(transition_matrix, dna, regimes, rng=None, seed=None, config=None):
+    """
+    Customiza a matriz base para cada organização de uma vez.
+    
+    Cada célula fora da diagonal com probabilidade positiva é multiplicada por
+    clip(N(impacto do DNA + bias do regime, 0.25), 0.2, 3.0) e as linhas são
+    renormalizadas.
+    
+    Args:
+        transition_matrix: Matriz base (n_states, n_states)
+        dna: Array (n_sims, n_dimensões) de sample_organizational_dna
+        regimes: Regime de cada organização (n_sims,)
+        rng: numpy.random.Generator (opcional)
+        seed: Semente usada quando rng não é informado
+        config: SimulationConfig com as definições dos regimes (None = DEFAULT_REGIME_SPECS)
+    
+    Returns:
+        np.array: Pilha (n_sims, n_states, n_states) de matrizes customizadas
+    """
+    rng = _resolve_rng(rng, seed)
+    base_matrix = np.asarray(transition_matrix, dtype=float)
+    n_states = len(base_matrix)
+    n_simulations = len(dna)
+    
+    # DNA IMPACT + REGIME BIAS por organização
+    dna_weights = np.array([d[3] for d in ORG_DNA_DIMENSIONS])
+    adoption_bias = _regime_values(DEFAULT_REGIME_SPECS if config is None else config.regimes, "adoption_bias")
+    total_modifier = np.asarray(dna) @ dna_weights + adoption_bias[np.asarray(regimes)]
+    
+    off_diagonal = (base_matrix > 0) & ~np.eye(n_states, dtype=bool)
+    org_variation = rng.normal(total_modifier[:, None, None], 0.25, size=(n_simulations, n_states, n_states))
+    matrices = base_matrix * np.where(off_diagonal, np.clip(org_variation, 0.2, 3.0), 1.0)
+    return _renormalize_rows(matrices)
+
+
+def run_batched_simulations(n_simulations, n_gerentes=27000, n_months=36, transition_matrix=None,
+                            learning_enabled=True, regime_probs=(0.25, 0.50, 0.25), rng=None, seed=None,
+                            detail="none", shock_calendar=None, engine_state=None, return_state=False,
+                            dtype="float64", config=None, timings=False, sampling="random", antithetic=False,
+                            sobol_seed=None, sobol_index=0):
+    """
+    ENGINE VETORIZADO: avança TODAS as organizações juntas, mês a mês.
+    
+    Reproduz o mesmo modelo de run_stochastic_simulation + pós-processamento de
+    regime, mas com o estado de todas as simulações em arrays (n_sims, n_states):
+    1. Uma amostragem Beta vetorizada por parâmetro bayesiano
+    2. Um único rescale mascarado (triângulo superior) da pilha (n_sims, 5, 5)
+    3. Choques de mercado sorteados mês a mês para todas as organizações de uma
+       vez (ou lidos de um calendário de build_shock_calendar)
+    4. Transições multinomiais em lote para todas as linhas de todas as matrizes
+    
+    Todo sorteio é feito mês a mês, então o estado ao fim de um mês (ver
+    engine_state) basta para continuar a simulação: estender o horizonte de 36
+    para 60 meses dá o mesmo resultado de uma execução direta de 60 meses.
+    
+    Args:
+        n_simulations: Número de organizações simuladas
+        n_gerentes: Número de gerentes
+        n_months: Horizonte temporal
+        transition_matrix: Matriz base (None = matriz padrão, sem customização por DNA)
+        learning_enabled: Aprendizado temporal ativo
+        regime_probs: Probabilidades dos regimes conservative/normal/aggressive
+        rng: numpy.random.Generator usado em todas as amostragens (opcional)
+        seed: Semente usada quando rng não é informado
+        detail: Nível de registros por organização (ver _allocate_detail_records)
+        shock_calendar: Calendário de build_shock_calendar com ao menos n_months
+            colunas; None = choques sorteados a cada mês
+        engine_state: Estado devolvido por uma execução anterior com
+            return_state=True; a simulação continua do mês em que parou até
+            n_months. O gerador aleatório é restaurado do estado (rng/seed ignorados).
+        return_state: Inclui "engine_state" (estado completo na fronteira do
+            último mês, incluindo o estado do gerador) no resultado
+        dtype: Precisão das trajetórias e do cálculo de capacidade ("float64"
+            ou "float32"); ignorado ao continuar de engine_state
+        config: SimulationConfig com regimes, choques e priors (None = padrões
+            do módulo); horizonte, matriz e proporções vêm dos argumentos acima
+        timings: Mede o tempo de cada fase (resultado em "timings")
+        sampling, antithetic, sobol_seed, sobol_index: Amostragem do regime,
+            do DNA e dos parâmetros Beta de cada mês por inversa da CDF de
+            sample_input_uniforms (padrão: sorteios pseudoaleatórios diretos).
+            As demais fontes de ruído continuam pseudoaleatórias.
+    
+    Returns:
+        dict: "trajectories" (n_sims, n_months), "regimes" (n_sims,), "dna" (n_sims, 6)
+            e os arrays de registros do nível de detalhe
+    """
+    if config is None:
+        config = SimulationConfig()
+    timer, report_timings = _resolve_timings(timings)
+    if engine_state is None:
+        rng = _resolve_rng(rng, seed)
+        uniforms = None
+        if sampling != "random" or antithetic:
+            uniforms = sample_input_uniforms(
+                n_simulations, input_dimension(n_months, len(config.priors)), sampling, antithetic, rng,
+                sobol_seed, sobol_index
+            )
+        state = _init_batched_state(n_simulations, n_gerentes, n_months, transition_matrix, regime_probs, rng, detail,
+                                    dtype, config, timer, uniforms)
+    else:
+        state = dict(engine_state)
+        rng = _generator_from_state(state.pop("rng_state"))
+        if state["month"] > n_months:
+            raise ValueError("engine_state já avançou além de n_months")
+    
+    _advance_batched_state(state, rng, n_months, n_gerentes, transition_matrix, learning_enabled, shock_calendar,
+                           config, timer)
+    
+    timer.mark()
+    result = _finish_batched_state(state, n_gerentes, detail)
+    if return_state:
+        result["engine_state"] = {**state, "rng_state": _generator_state(rng)}
+    timer.lap("post_processing")
+    if report_timings:
+        result["timings"] = timer.to_dict()
+    return result
+
+
+def _init_batched_state(n_simulations, n_gerentes, n_months, transition_matrix, regime_probs, rng, detail,
+                        dtype, config, timer=NULL_TIMINGS, uniforms=None):
+    """
+    Estado inicial (mês 0) do engine vetorizado: regime, DNA, matrizes e priors.
+    Com uniforms (sample_input_uniforms), regime e DNA vêm da inversa da CDF e
+    as colunas restantes ficam no estado para os parâmetros Beta de cada mês.
+    """
+    n_states = len(states)
+    n_dna = len(ORG_DNA_DIMENSIONS)
+    
+    # ===== REGIME + DNA ORGANIZACIONAL =====
+    timer.mark()
+    input_uniforms = {}
+    if uniforms is None:
+        regimes = rng.choice(len(REGIMES), size=n_simulations, p=regime_probs)
+        dna = sample_organizational_dna(n_simulations, rng=rng)
+    else:
+        cumulative = np.cumsum(regime_probs) / np.sum(regime_probs)
+        regimes = np.minimum(np.searchsorted(cumulative, uniforms[:, 0], side="right"), len(REGIMES) - 1)
+        dna = sample_organizational_dna(n_simulations, uniforms=uniforms[:, 1:1 + n_dna])
+        input_uniforms["beta_uniforms"] = uniforms[:, 1 + n_dna:].reshape(n_simulations, n_months, -1)
+    timer.lap("dna_sampling")
+    
+    # ===== MATRIX CUSTOMIZATION BY ORGANIZATION =====
+    if transition_matrix is None:
+        base_matrix = np.array(DEFAULT_TRANSITION_MATRIX, dtype=float)
+        matrices = np.broadcast_to(base_matrix, (n_simulations, n_states, n_states)).copy()
+    else:
+        matrices = customize_transition_matrices(transition_matrix, dna, regimes, rng=rng, config=config)
+    timer.lap("matrix_customization")
+    
+    # ===== PARÂMETROS BAYESIANOS (um vetor alpha/beta por organização) =====
+    param_state = BayesianParameterState.from_priors(config.prior_dict, batch_shape=(n_simulations,))
+    
+    state_counts = np.zeros((n_simulations, n_states), dtype=np.int64)
+    state_counts[:, 0] = n_gerentes
+    
+    records = _allocate_detail_records(detail, n_simulations, n_months)
+    return {
+        "month": 0,
+        "regimes": regimes,
+        "dna": dna,
+        "matrices": matrices,
+        "state_counts": state_counts,
+        "alpha": param_state.alpha,
+        "beta": param_state.beta,
+        "trajectories": np.empty((n_simulations, n_months), dtype=dtype),
+        **{key: records[key] for key in MONTHLY_RECORD_KEYS if key in records},
+        **input_uniforms,
+    }
+
+
+def _extend_state_horizon(state, n_months):
+    """Amplia (com zeros) os arrays com eixo de meses do estado até n_months."""
+    for key in ("trajectories",) + MONTHLY_RECORD_KEYS:
+        if key in state and state[key].shape[1] < n_months:
+            padding = [(0, 0)] * state[key].ndim
+            padding[1] = (0, n_months - state[key].shape[1])
+            state[key] = np.pad(state[key], padding)
+
+
+def _advance_batched_state(state, rng, n_months, n_gerentes, transition_matrix, learning_enabled,
+                           shock_calendar, config, timer=NULL_TIMINGS):
+    """Avança (in-place) o estado do engine vetorizado do mês atual até n_months."""
+    _extend_state_horizon(state, n_months)
+    if shock_calendar is not None and shock_calendar["shock_type"].shape[1] < n_months:
+        raise ValueError("shock_calendar não cobre o horizonte n_months")
+    
+    regimes = state["regimes"]
+    matrices = state["matrices"]
+    trajectories = state["trajectories"]
+    n_simulations, n_states = state["state_counts"].shape
+    beta_uniforms = state.get("beta_uniforms")
+    if beta_uniforms is not None and beta_uniforms.shape[1] < n_months:
+        raise ValueError("as entradas quasi-aleatórias/antitéticas não cobrem o horizonte n_months")
+    
+    # Apenas progressões (triângulo superior) são moduladas por fatores e choques
+    base_matrix = np.array(DEFAULT_TRANSITION_MATRIX if transition_matrix is None else transition_matrix, dtype=float)
+    progression_mask = np.triu(base_matrix > 0, k=1)
+    
+    param_state = BayesianParameterState(tuple(name for name, *_ in config.priors), state["alpha"], state["beta"])
+    factor_weights = param_state.weights(BAYESIAN_FACTOR_WEIGHTS)
+    # Capacidade e pós-processamento na precisão das trajetórias
+    dtype = trajectories.dtype
+    multipliers = np.array([s["multiplicador"] for s in states], dtype=dtype)
+    capacity_scale = dtype.type(2000 / n_gerentes) if dtype != np.float64 else None
+    
+    # Pós-processamento por regime (aplicado mês a mês)
+    shock_multiplier = config.regime_values("shock_multiplier").astype(dtype)[regimes]
+    noise_mean = config.regime_values("noise_mean")[regimes]
+    noise_std = config.regime_values("noise_std")[regimes]
+    
+    state_counts = state["state_counts"]
+    for month in range(state["month"], n_months):
+        timer.mark()
+        # 1. Amostra parâmetros bayesianos (uma chamada para todas as organizações)
+        sampled = param_state.sample(rng, None if beta_uniforms is None else beta_uniforms[:, month])
+        timer.lap("beta_sampling")
+        if "params_evolution" in state:
+            log = state["params_evolution"][:, month]
+            log[..., 0] = param_state.alpha
+            log[..., 1] = param_state.beta
+            log[..., 2] = param_state.mean
+            log[..., 3] = sampled
+            timer.lap("post_processing", calls=0)
+        
+        # Mês 0 não tem transições: a amostragem só alimenta o registro
+        if month > 0:
+            disruption_multiplier = 0.3 + (sampled @ factor_weights) * 2.7
+            
+            # 2. Fator disruptivo aplicado às progressões, limitado a 95%
+            modified = np.where(
+                progression_mask,
+                np.minimum(0.95, matrices * disruption_multiplier[:, None, None]),
+                matrices
+            )
+            _renormalize_rows(modified, slice(0, n_states - 1))
+            timer.lap("bayesian_factors")
+            
+            # 2.5. Choques de mercado (calendário externo ou sorteio do mês)
+            if shock_calendar is not None:
+                shock_type = shock_calendar["shock_type"][:, month]
+                shock_intensity = shock_calendar["intensity"][:, month]
+            elif month >= config.shock_start_month:
+                month_shocks = build_shock_calendar(
+                    n_simulations, 1, catalogue=config.shock_catalogue,
+                    shock_probability=config.shock_probability, start_month=0, rng=rng
+                )
+                shock_type = month_shocks["shock_type"][:, 0]
+                shock_intensity = month_shocks["intensity"][:, 0]
+            else:
+                shock_type = None
+            if shock_type is not None:
+                shocked = np.flatnonzero(shock_type >= 0)
+                if shocked.size:
+                    modified[shocked] = _apply_market_shock(
+                        modified[shocked], shock_intensity[shocked], progression_mask
+                    )
+            timer.lap("market_shocks")
+            
+            # 3. Transições estocásticas: multinomial em lote (n_sims, 5 origens, 5 destinos)
+            prev_counts = state_counts
+            state_counts = rng.multinomial(prev_counts, modified).sum(axis=1)
+            timer.lap("transitions")
+        
+        # 4. Capacidade do mês + pós-processamento do regime (multiplicador e ruído)
+        if capacity_scale is None:
+            capacity = (state_counts @ multipliers) / n_gerentes * 2000
+            regime_noise = rng.normal(noise_mean, noise_std)
+        else:
+            capacity = (state_counts.astype(dtype) @ multipliers) * capacity_scale
+            regime_noise = rng.normal(noise_mean, noise_std).astype(dtype)
+        trajectories[:, month] = np.clip(capacity * shock_multiplier * (1 + regime_noise), *CAPACITY_BOUNDS)
+        timer.lap("post_processing")
+        
+        # 5. Atualização bayesiana in-place para todas as organizações
+        if learning_enabled and month > 0:
+            successes, failures = observe_evidence_arrays(
+                (state_counts - prev_counts) / n_gerentes, month, param_state.names
+            )
+            if "evidences" in state:
+                state["evidences"][:, month, :, 0] = successes
+                state["evidences"][:, month, :, 1] = failures
+            param_state.update(successes, failures)
+            timer.lap("posterior_update")
+    
+    state["state_counts"] = state_counts
+    state["alpha"] = param_state.alpha
+    state["beta"] = param_state.beta
+    state["month"] = max(state["month"], n_months)
+    return state
+
+
+def _finish_batched_state(state, n_gerentes, detail):
+    """Resultado do engine vetorizado a partir do estado ao fim do horizonte."""
+    n_months = state["month"]
+    result = {
+        "trajectories": state["trajectories"][:, :n_months],
+        "regimes": state["regimes"],
+        "dna": state["dna"],
+    }
+    if detail in ("summary", "full"):
+        result["final_state_distributions"] = (state["state_counts"] / n_gerentes).astype(np.float32)
+        result["final_posteriors"] = np.stack([state["alpha"], state["beta"]], axis=-1).astype(np.float32)
+    for key in MONTHLY_RECORD_KEYS:
+        if key in state:
+            result[key] = state[key][:, :n_months]
+    return result
+
+
+def _generator_state(rng):
+    """Estado do gerador aleatório serializado em JSON (inteiros de 128 bits inclusos)."""
+    return json.dumps(rng.bit_generator.state)
+
+
+def _generator_from_state(serialized):
+    """Recria um numpy.random.Generator a partir de _generator_state."""
+    bit_state = json.loads(serialized)
+    bit_generator = getattr(np.random, bit_state["bit_generator"])()
+    bit_generator.state = bit_state
+    return np.random.Generator(bit_generator)
+
+def run_loop_simulations(n_simulations, n_gerentes=27000, n_months=36, transition_matrix=None,
+                         learning_enabled=True, regime_probs=(0.25, 0.50, 0.25), rng=None, seed=None,
+                         detail="none", shock_calendar=None, dtype="float64", config=None, timings=False):
+    """
+    ENGINE ORIGINAL: simula uma organização por vez com run_stochastic_simulation.
+    
+    Args:
+        n_simulations: Número de organizações simuladas
+        n_gerentes: Número de gerentes
+        n_months: Horizonte temporal
+        transition_matrix: Matriz base (None = matriz padrão, sem customização por DNA)
+        learning_enabled: Aprendizado temporal ativo
+        regime_probs: Probabilidades dos regimes conservative/normal/aggressive
+        rng: numpy.random.Generator usado em todas as amostragens (opcional)
+        seed: Semente usada quando rng não é informado
+        detail: Nível de registros por organização (ver _allocate_detail_records)
+        shock_calendar: Calendário de build_shock_calendar (n_sims, n_months);
+            None = sorteado para o bloco
+        dtype: Precisão das trajetórias ("float64" ou "float32")
+        config: SimulationConfig com regimes, choques e priors (None = padrões
+            do módulo); horizonte, matriz e proporções vêm dos argumentos acima
+        timings: Mede o tempo de cada fase (resultado em "timings")
+    
+    Returns:
+        dict: "trajectories" (n_sims, n_months), "regimes" (n_sims,), "dna" (n_sims, 6)
+            e os arrays de registros do nível de detalhe
+    """
+    if config is None:
+        config = SimulationConfig()
+    rng = _resolve_rng(rng, seed)
+    timer, report_timings = _resolve_timings(timings)
+    records = _allocate_detail_records(detail, n_simulations, n_months)
+    trajectories = np.empty((n_simulations, n_months), dtype=dtype)
+    priors = config.prior_dict
+    
+    # ===== REGIME SAMPLING =====
+    # Mercado pode estar em qualquer regime (instabilidade estrutural)
+    # NOVO: Usa proporções configuradas pelo usuário se disponíveis
+    timer.mark()
+    regimes = rng.choice(len(REGIMES), size=n_simulations, p=regime_probs)
+    
+    # ===== ORGANIZATIONAL DNA SAMPLING =====
+    # Cada organização tem perfil comportamental único
+    dna = sample_organizational_dna(n_simulations, rng=rng)
+    timer.lap("dna_sampling")
+    
+    # ===== MATRIX CUSTOMIZATION BY ORGANIZATION =====
+    customized_matrices = None
+    if transition_matrix is not None:
+        customized_matrices = customize_transition_matrices(transition_matrix, dna, regimes, rng=rng, config=config)
+    timer.lap("matrix_customization")
+    
+    # ===== CHOQUES DE MERCADO =====
+    if shock_calendar is None:
+        shock_calendar = build_shock_calendar(
+            n_simulations, n_months, catalogue=config.shock_catalogue,
+            shock_probability=config.shock_probability, start_month=config.shock_start_month, rng=rng
+        )
+    timer.lap("market_shocks")
+    
+    # Executa múltiplas simulações com MÁXIMA DIVERSIDADE
+    for sim in range(n_simulations):
+        current_regime = regimes[sim]
+        
+        # ===== STOCHASTIC SIMULATION =====
+        result = run_stochastic_simulation(
+            n_gerentes=n_gerentes,
+            n_months=n_months,
+            transition_matrix=None if customized_matrices is None else customized_matrices[sim],
+            learning_enabled=learning_enabled,
+            rng=rng,
+            detail="summary" if records else "none",
+            records={key: records[key][sim] for key in ("params_evolution", "evidences") if key in records},
+            shocks=(shock_calendar["shock_type"][sim], shock_calendar["intensity"][sim]),
+            priors=priors,
+            timings=timer
+        )
+        if records:
+            records["final_state_distributions"][sim] = result["state_distribution"]
+            records["final_posteriors"][sim] = result["final_posteriors"]
+        
+        # ===== REGIME-SPECIFIC POST-PROCESSING =====
+        # Aplica multiplicador de regime (structural breaks)s
+        _, regime_modifier, _, noise_mean, noise_std = config.regimes[current_regime]
+        modified_trajectory = result["monthly_capacities"] * regime_modifier
+        
+        # REGIME NOISE: ruído característico do regime (conservative: baixa
+        # volatilidade e viés negativo; aggressive: alta volatilidade e viés positivo)
+        regime_noise = rng.normal(noise_mean, noise_std, len(modified_trajectory))
+        
+        modified_trajectory = modified_trajectory * (1 + regime_noise)
+        modified_trajectory = np.clip(modified_trajectory, *CAPACITY_BOUNDS)  # Limites físicos
+        
+        # ===== LOGGING =====
+        trajectories[sim] = modified_trajectory
+        timer.lap("post_processing")
+    
+    result = {
+        "trajectories": trajectories,
+        "regimes": regimes,
+        "dna": dna,
+        **records
+    }
+    if report_timings:
+        result["timings"] = timer.to_dict()
+    return result
+
+
+_ENGINES = {
+    "loop": run_loop_simulations,
+    "batched": run_batched_simulations,
+}
+
+
+def _simulate_block(task):
+    """
+    Simula um bloco de organizações com seu próprio stream aleatório.
+    Função de módulo para poder ser enviada a um ProcessPoolExecutor.
+    """
+    engine, seed_sequence, kwargs = task
+    return _ENGINES[engine](rng=np.random.default_rng(seed_sequence), **kwargs)
+
+def _iter_blocks(tasks, n_workers, window=None):
+    """
+    Executa os blocos (em série ou em processos) e os devolve em ordem.
+    Em processos, no máximo window blocos ficam em execução/memória por vez.
+    """
+    if n_workers is not None and n_workers > 1 and len(tasks) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        window = window or len(tasks)
+        with ProcessPoolExecutor(max_workers=n_workers) as executor:
+            for start in range(0, len(tasks), window):
+                yield from executor.map(_simulate_block, tasks[start:start + window])
+    else:
+        for task in tasks:
+            yield _simulate_block(task)
+
+def run_monte_carlo_analysis(n_gerentes=27000, n_months=36, transition_matrix=None, learning_enabled=True, n_simulations=1000,
+                             engine="loop", seed=None, n_workers=None, rng=None, aggregation="exact",
+                             detail="none", shock_calendar=None, regime_probs=None, resume_from=None,
+                             checkpoint=None, checkpoint_every=40, trajectory_store=None, chunk_size=None,
+                             dtype="float64", config=None, timings=False, cancel_event=None,
+                             time_budget_s=None, target_rel_error=None, target_scenarios=None,
+                             sampling="random", antithetic=False):
     """
     VERSÃO 3.1: ANÁLISE MONTE CARLO COM VOLATILIDADE EXTREMA
     
@@ -607,146 +1554,912 @@ def run_monte_carlo_analysis(n_gerentes=27000, n_months=36, transition_matrix=No
         transition_matrix: Matriz de transição
         learning_enabled: Aprendizado temporal ativo
         n_simulations: Número de simulações Monte Carlo
+        engine: "loop" (uma organização por vez) ou "batched" (todas as
+            organizações avançam juntas como arrays NumPy, mês a mês)
+        seed: Semente do SeedSequence raiz (None = entropia do sistema)
+        n_workers: Número de processos (ProcessPoolExecutor); None ou 1 = serial.
+            O resultado é o mesmo para qualquer número de processos.
+        rng: numpy.random.Generator (opcional) do qual a semente raiz é derivada;
+            tem precedência sobre seed
+        aggregation: "exact" (guarda todas as trajetórias) ou "streaming"
+            (percentis, média e desvio em sketches mergeáveis atualizados a cada
+            bloco; memória constante em n_simulations, sem dados por organização)
+        detail: Registros por organização: "none" (padrão), "summary" (estado e
+            posteriors finais) ou "full" (+ evolução mensal dos parâmetros e
+            evidências em arrays float32 (n_sims, n_months, 3, 4) e (n_sims, n_months, 3, 2))
+        shock_calendar: Calendário de build_shock_calendar (n_simulations, n_months)
+            compartilhado entre cenários; None = choques sorteados em cada bloco
+        regime_probs: Probabilidades dos regimes conservative/normal/aggressive
+            (None = 25/50/25)
+        resume_from: Resultado anterior desta função (mesma configuração) a ser
+            estendido até n_simulations. Os blocos completos são reaproveitados,
+            apenas as novas organizações (e um bloco final parcial) são simuladas,
+            e o resultado é idêntico ao de uma única execução com a mesma semente.
+        checkpoint: Diretório de checkpoint (engine="batched", aggregation="exact").
+            Os blocos concluídos são gravados em partes de checkpoint_every blocos
+            com o estado completo de cada organização na fronteira do último mês
+            (contagens por estado, alpha/beta, matrizes, trajetórias parciais e
+            estado do gerador de cada bloco). Uma nova chamada com o mesmo
+            diretório retoma de onde parou; com n_months maior, estende o
+            horizonte sem refazer os meses já simulados.
+        checkpoint_every: Blocos por parte do checkpoint (fixado na criação do diretório)
+        trajectory_store: Caminho de um arquivo .npy (aggregation="exact"). As
+            trajetórias são gravadas nele bloco a bloco e devolvidas como memmap
+            somente leitura, então a matriz (n_simulations, n_months) nunca fica
+            inteira em memória; os percentis mensais vêm de um sketch atualizado
+            a cada bloco (erro menor que 1 conta, sem reler o arquivo). Ficam em memória só a capacidade final e o regime de cada
+            organização ("organizational_profiles" e "causal_data" valem None).
+        chunk_size: Organizações por lote em memória (arredondado para blocos
+            completos). Cada lote é simulado, incorporado aos agregados em
+            streaming e descartado, então o pico de memória depende de
+            chunk_size e não de n_simulations. Com aggregation="exact", os
+            percentis mensais vêm dos sketches e só os dados escalares por
+            organização (capacidade final, regime, DNA) são guardados
+            ("all_trajectories" vale None). Valores menores que
+            n_workers × SIMULATION_BLOCK_SIZE limitam o paralelismo.
+        dtype: "float64" (padrão) ou "float32" para as trajetórias, o cálculo de
+            capacidade do engine e os arrays de resultado (metade da memória).
+            Com a mesma semente, os percentis mudam menos de 0,1%.
+        config: SimulationConfig com o modelo completo (horizonte, matriz,
+            regimes, choques e priors). Quando informado, substitui n_gerentes,
+            n_months, transition_matrix, learning_enabled e regime_probs; sem
+            ele, a configuração é montada desses argumentos e dos padrões do módulo.
+        timings: Mede o tempo de cada fase do pipeline em "timings" (ver
+            timing.PhaseTimings.to_dict, mais "wall_s"). Cobre só os blocos
+            simulados nesta chamada; com n_workers > 1 os totais das fases
+            somam o tempo de todos os processos e podem passar de wall_s.
+        cancel_event: threading.Event (ou objeto com is_set()) verificado a cada
+            bloco concluído. Quando sinalizado, os blocos restantes são
+            cancelados e o resultado cobre só as organizações já simuladas
+            (sempre blocos completos): é idêntico ao de uma execução com
+            n_simulations igual a results["n_simulations"] e pode ser estendido
+            com resume_from.
+        time_budget_s: Parada adaptativa por tempo: nenhum bloco novo é
+            incorporado depois de time_budget_s segundos. Com time_budget_s ou
+            target_rel_error, n_simulations passa a ser o máximo de simulações.
+        target_rel_error: Parada adaptativa por precisão: para quando o erro
+            padrão Monte Carlo de P5/P50/P95 da capacidade final fica abaixo
+            desta fração do valor estimado e a meia largura do IC 95% das
+            probabilidades de exceder target_scenarios, abaixo deste valor
+            absoluto (ver diagnostics.monte_carlo_errors). Como na
+            parada por cancel_event, o resultado é idêntico ao de uma execução
+            com o n_simulations atingido; o motivo da parada e os erros obtidos
+            ficam em results["adaptive"].
+        target_scenarios: Cenários alvo (capacidades) do critério de precisão;
+            alvos fora de CAPACITY_BOUNDS (inatingíveis ou certos) não entram
+            no critério e aparecem em results["adaptive"]["excluded_scenarios"]
+        sampling: "random" (padrão) ou "sobol" (engine="batched"): regime, DNA
+            e os parâmetros Beta de cada mês vêm de uma sequência de Sobol
+            embaralhada mapeada pelas inversas das CDFs, com os blocos cobrindo
+            trechos consecutivos da sequência (mesmo resultado com qualquer
+            n_workers). Choques, customização das matrizes, transições e ruído
+            de regime continuam pseudoaleatórios.
+        antithetic: Organizações em pares antitéticos (u, 1 - u) nas mesmas
+            entradas; combina com os dois modos de sampling (engine="batched")
     
     Returns:
         dict: Análise probabilística com fat tails e regime tracking
     """
-    all_results = []
-    final_capacities = []
-    monthly_trajectories = []
-    regime_trajectories = []  # NOVO: tracking de regimes
-    org_dna_log = []  # NOVO: tracking de DNA organizacional
-    
-    # ===== REGIME SWITCHING SETUP =====
-    # 3 REGIMES com características econômicas distintas
-    regimes = {
-        0: {"name": "conservative", "shock_multiplier": 0.6, "adoption_bias": -0.10},
-        1: {"name": "normal", "shock_multiplier": 1.0, "adoption_bias": 0.0},  
-        2: {"name": "aggressive", "shock_multiplier": 1.7, "adoption_bias": +0.15}
-    }
+    for step in iter_monte_carlo(
+            n_gerentes=n_gerentes, n_months=n_months, transition_matrix=transition_matrix,
+            learning_enabled=learning_enabled, n_simulations=n_simulations, engine=engine, seed=seed,
+            n_workers=n_workers, rng=rng, aggregation=aggregation, detail=detail, shock_calendar=shock_calendar,
+            regime_probs=regime_probs, resume_from=resume_from, checkpoint=checkpoint,
+            checkpoint_every=checkpoint_every, trajectory_store=trajectory_store, chunk_size=chunk_size,
+            dtype=dtype, config=config, timings=timings, cancel_event=cancel_event,
+            time_budget_s=time_budget_s, target_rel_error=target_rel_error,
+            target_scenarios=target_scenarios, sampling=sampling, antithetic=antithetic, snapshot_every=None):
+        pass
+    return step["results"]
+
+
+def iter_monte_carlo(n_gerentes=27000, n_months=36, transition_matrix=None, learning_enabled=True, n_simulations=1000,
+                     engine="loop", seed=None, n_workers=None, rng=None, aggregation="exact",
+                     detail="none", shock_calendar=None, regime_probs=None, resume_from=None,
+                     checkpoint=None, checkpoint_every=40, trajectory_store=None, chunk_size=None,
+                     dtype="float64", config=None, timings=False, cancel_event=None,
+                     time_budget_s=None, target_rel_error=None, target_scenarios=None,
+                     sampling="random", antithetic=False, snapshot_every=1):
+    """
+    Versão em gerador de run_monte_carlo_analysis: produz snapshots parciais
+    dos agregados à medida que os blocos de simulações terminam, para a UI
+    mostrar progresso e redesenhar o gráfico de leque ao vivo. Interromper a
+    iteração (break/close) cancela os blocos restantes sem resultado; com
+    cancel_event, a execução para no próximo bloco e o item final traz o
+    resultado parcial.
     
-    # Executa múltiplas simulações com MÁXIMA DIVERSIDADE
-    for sim in range(n_simulations):
-        
-        # ===== REGIME SAMPLING =====
-        # Mercado pode estar em qualquer regime (instabilidade estrutural)
-        # NOVO: Usa proporções configuradas pelo usuário se disponíveis
-        try:
-            import streamlit as st
-            regime_conservative = st.session_state.get('regime_conservative', 25)
-            regime_normal = st.session_state.get('regime_normal', 50)
-            regime_aggressive = st.session_state.get('regime_aggressive', 25)
-            total_regime = regime_conservative + regime_normal + regime_aggressive
-            if total_regime == 0:
-                regime_probs = [0.25, 0.50, 0.25]
-            else:
-                regime_probs = [regime_conservative/total_regime, regime_normal/total_regime, regime_aggressive/total_regime]
-        except Exception:
-            regime_probs = [0.25, 0.50, 0.25]
-        current_regime = np.random.choice([0, 1, 2], p=regime_probs)
-        
-        # ===== ORGANIZATIONAL DNA SAMPLING =====
-        # Cada organização tem perfil comportamental único
-        org_dna = {
-            "risk_culture": np.random.beta(1.0, 2.5),       # Maioria risk-averse
-            "tech_readiness": np.random.beta(1.5, 1.5),     # Bimodal distribution
-            "resource_capacity": np.random.beta(1.2, 1.8),  # Few resource-rich
-            "leadership_vision": np.random.beta(2.0, 1.0),  # Some visionary leaders  
-            "regulatory_pressure": np.random.beta(1.8, 1.2), # Sector-dependent
-            "network_position": np.random.beta(1.3, 1.7)    # Network centrality
+    Args:
+        (os mesmos de run_monte_carlo_analysis)
+        snapshot_every: Blocos (SIMULATION_BLOCK_SIZE organizações) entre
+            snapshots; None = só o item final
+    
+    Yields:
+        dict: "completed" (organizações já incorporadas), "n_simulations",
+            "monthly_percentiles" {pX: array}, "monthly_mean", "monthly_std",
+            "done", "cancelled" e "results". Os snapshots parciais usam os sketches de
+            aggregation="streaming" (erro < 1 conta); o último item tem
+            done=True e em "results" o mesmo dicionário de run_monte_carlo_analysis.
+    """
+    started = time.perf_counter()
+    if config is None:
+        config = SimulationConfig(
+            n_gerentes=n_gerentes, n_months=n_months, transition_matrix=transition_matrix,
+            learning_enabled=learning_enabled,
+            **({} if regime_probs is None else {"regime_probs": regime_probs})
+        )
+    n_gerentes, n_months = config.n_gerentes, config.n_months
+    transition_matrix, learning_enabled = config.transition_matrix, config.learning_enabled
+    regime_probs = config.regime_probs
+    
+    if engine not in _ENGINES:
+        raise ValueError(f"engine desconhecido: {engine!r} (use 'loop' ou 'batched')")
+    if aggregation not in ("exact", "streaming"):
+        raise ValueError(f"aggregation desconhecida: {aggregation!r} (use 'exact' ou 'streaming')")
+    if detail not in DETAIL_LEVELS:
+        raise ValueError(f"detail desconhecido: {detail!r} (use {', '.join(DETAIL_LEVELS)})")
+    if aggregation == "streaming" and detail != "none":
+        raise ValueError("aggregation='streaming' não guarda registros por organização: use detail='none'")
+    if np.dtype(dtype).name not in SIMULATION_DTYPES:
+        raise ValueError(f"dtype não suportado: {dtype!r} (use {', '.join(SIMULATION_DTYPES)})")
+    dtype = np.dtype(dtype).name
+    if shock_calendar is not None and shock_calendar["shock_type"].shape != (n_simulations, n_months):
+        raise ValueError("shock_calendar deve ter forma (n_simulations, n_months)")
+    if checkpoint is not None and (engine != "batched" or aggregation != "exact" or resume_from is not None):
+        raise ValueError("checkpoint requer engine='batched', aggregation='exact' e resume_from=None")
+    if trajectory_store is not None and (aggregation != "exact" or resume_from is not None):
+        raise ValueError("trajectory_store requer aggregation='exact' e resume_from=None")
+    if chunk_size is not None and (detail != "none" or trajectory_store is not None or checkpoint is not None):
+        raise ValueError("chunk_size requer detail='none', sem trajectory_store nem checkpoint")
+    if (resume_from is not None and aggregation == "exact" and chunk_size is None
+            and resume_from.get("all_trajectories") is None):
+        raise ValueError("resume_from não guarda as trajetórias: retome com chunk_size")
+    if sampling not in SAMPLING_MODES:
+        raise ValueError(f"sampling desconhecido: {sampling!r} (use {', '.join(SAMPLING_MODES)})")
+    quasi_random = sampling != "random" or antithetic
+    if quasi_random and (engine != "batched" or checkpoint is not None):
+        raise ValueError("sampling='sobol' e antithetic requerem engine='batched', sem checkpoint")
+    if time_budget_s is not None and time_budget_s <= 0:
+        raise ValueError("time_budget_s deve ser positivo")
+    if target_rel_error is not None and target_rel_error <= 0:
+        raise ValueError("target_rel_error deve ser positivo")
+    
+    # ===== PARADA ADAPTATIVA =====
+    # Checada a cada bloco como o cancelamento: blocos têm sementes próprias,
+    # então parar antes equivale a uma execução com menos simulações.
+    stopping = None
+    if time_budget_s is not None or target_rel_error is not None:
+        stopping = AdaptiveStop(time_budget_s, target_rel_error, target_scenarios, started, bounds=CAPACITY_BOUNDS)
+    
+    # ===== BLOCOS COM STREAMS ALEATÓRIOS INDEPENDENTES =====
+    # A partição em blocos não depende de n_workers: cada bloco recebe sempre o
+    # mesmo filho do SeedSequence, então o resultado é idêntico bit a bit com
+    # qualquer número de processos.
+    run_config = _run_config(config, engine, aggregation, detail, dtype, sampling, antithetic)
+    
+    # ===== RETOMADA: reaproveita os blocos completos de um resultado anterior =====
+    # O bloco i usa sempre o filho i do SeedSequence raiz, então os blocos novos
+    # continuam exatamente a sequência de uma execução única.
+    first_block = 0
+    if resume_from is not None:
+        random_state = resume_from.get("random_state")
+        if random_state is None or random_state["block_size"] != SIMULATION_BLOCK_SIZE:
+            raise ValueError("resume_from não contém um estado aleatório retomável")
+        if resume_from.get("run_config") != run_config:
+            raise ValueError("resume_from foi gerado com outra configuração de simulação")
+        if n_simulations < resume_from["n_simulations"]:
+            raise ValueError("resume_from já tem mais simulações que n_simulations")
+        root_sequence = np.random.SeedSequence(random_state["entropy"])
+        first_block = resume_from["n_simulations"] // SIMULATION_BLOCK_SIZE
+    elif checkpoint is not None and os.path.exists(os.path.join(checkpoint, CHECKPOINT_MANIFEST)):
+        manifest = _read_checkpoint_manifest(checkpoint)
+        if manifest["run_config"] != {**run_config, "n_months": None}:
+            raise ValueError("checkpoint foi gerado com outra configuração de simulação")
+        if manifest["n_simulations"] != n_simulations:
+            raise ValueError("checkpoint foi gerado com outro n_simulations")
+        root_sequence = np.random.SeedSequence(manifest["random_state"]["entropy"])
+    else:
+        if rng is not None:
+            seed = rng.integers(2**63)
+        root_sequence = np.random.SeedSequence(seed)
+    
+    block_starts = range(first_block * SIMULATION_BLOCK_SIZE, n_simulations, SIMULATION_BLOCK_SIZE)
+    block_sizes = [min(SIMULATION_BLOCK_SIZE, n_simulations - start) for start in block_starts]
+    seed_sequences = [
+        _block_seed_sequence(root_sequence, first_block + i) for i in range(len(block_sizes))
+    ]
+    random_state = {"entropy": _entropy_to_json(root_sequence.entropy), "block_size": SIMULATION_BLOCK_SIZE}
+    # Embaralhamento da sequência de Sobol: o mesmo em todos os blocos da execução
+    sampling_kwargs = {}
+    if quasi_random:
+        sampling_kwargs = {
+            "sampling": sampling,
+            "antithetic": antithetic,
+            "sobol_seed": int(root_sequence.generate_state(1, dtype=np.uint64)[0]),
         }
-        
-        # ===== MATRIX CUSTOMIZATION BY ORGANIZATION =====
-        customized_matrix = None
-        if transition_matrix is not None:
-            customized_matrix = np.array(transition_matrix, dtype=float)
-            
-            # DNA IMPACT: Cada dimensão afeta matriz diferentemente
-            dna_impact = (
-                org_dna["risk_culture"] * 0.20 +           # Risk → slower adoption
-                org_dna["tech_readiness"] * 0.25 +         # Tech → faster adoption
-                org_dna["resource_capacity"] * 0.20 +      # Resources → capability
-                org_dna["leadership_vision"] * 0.20 +      # Vision → strategic push
-                org_dna["network_position"] * 0.15         # Network → learning speed
+    tasks = [
+        (engine, seed_sequence, {
+            "n_simulations": size,
+            "n_gerentes": n_gerentes,
+            "n_months": n_months,
+            "transition_matrix": transition_matrix,
+            "learning_enabled": learning_enabled,
+            "regime_probs": regime_probs,
+            "detail": detail,
+            "dtype": dtype,
+            "config": config,
+            "timings": bool(timings),
+            **({**sampling_kwargs, "sobol_index": start} if quasi_random else {}),
+            "shock_calendar": None if shock_calendar is None else {
+                key: values[start:start + size] for key, values in shock_calendar.items()
+            },
+        })
+        for start, size, seed_sequence in zip(block_starts, block_sizes, seed_sequences)
+    ]
+    
+    if checkpoint is not None:
+        blocks = _run_checkpointed_blocks(
+            checkpoint, checkpoint_every, tasks, n_workers,
+            {"run_config": {**run_config, "n_months": None}, "random_state": random_state,
+             "n_simulations": n_simulations}
+        )
+    else:
+        window = None if chunk_size is None else -(-chunk_size // SIMULATION_BLOCK_SIZE)
+        blocks = _iter_blocks(tasks, n_workers, window)
+    phase_timings = PhaseTimings() if timings else None
+    if timings:
+        blocks = _timed_blocks(blocks, phase_timings)
+    
+    if aggregation == "streaming" or chunk_size is not None:
+        # Blocos completos acumulam em "accumulator" (retomável); um bloco final
+        # parcial fica à parte e é refeito se a execução for estendida.
+        n_keep = first_block * SIMULATION_BLOCK_SIZE
+        aggregator = _new_streaming_aggregator(n_months)
+        organizations = None if aggregation == "streaming" else []
+        trace = _new_convergence_trace(n_months)
+        if resume_from is not None:
+            accumulator = _accumulator_from_results(resume_from, n_keep)
+            aggregator.merge(accumulator)
+            trace = ConvergenceTrace.from_accumulator(resume_from.get("convergence"), accumulator)
+            if organizations is not None:
+                organizations.append(_organizations_from_results(resume_from, n_keep))
+        tail = None
+        for index, (size, block) in enumerate(zip(block_sizes, blocks)):
+            if size == SIMULATION_BLOCK_SIZE:
+                target = aggregator
+            else:
+                target = tail = _new_streaming_aggregator(n_months)
+            target.update(block["trajectories"], block["regimes"], block["dna"])
+            trace.update(block["trajectories"])
+            if organizations is not None:
+                # Só os escalares por organização sobrevivem ao lote
+                organizations.append((block["trajectories"][:, -1].copy(), block["regimes"], block["dna"]))
+            del block
+            if _stop_requested(cancel_event, stopping, aggregator):
+                break
+            if _snapshot_due(index, len(block_sizes), snapshot_every):
+                yield from _yield_snapshot(_progress_snapshot(aggregator, n_simulations), phase_timings)
+        cancelled = _close_blocks(blocks, cancel_event)
+        combined = aggregator if tail is None else _new_streaming_aggregator(n_months).merge(aggregator).merge(tail)
+        if organizations is None:
+            results = _summarize_streaming(combined)
+        else:
+            final_capacities, regimes, dna = (np.concatenate(parts) for parts in zip(*organizations))
+            results = _summarize_monte_carlo(
+                None, final_capacities, regimes.tolist(), _org_dna_log(dna), len(final_capacities),
+                monthly_percentiles=combined.monthly_percentiles(MONTE_CARLO_PERCENTILES)
             )
-            
-            # REGIME BIAS: Adiciona bias estrutural baseado no regime
-            regime_bias = regimes[current_regime]["adoption_bias"]
-            total_modifier = dna_impact + regime_bias
-            
-            # Aplica modificação heterogênea na matriz
-            for i in range(len(customized_matrix)):
-                for j in range(len(customized_matrix[i])):
-                    if i != j and customized_matrix[i][j] > 0:
-                        # Variação organizacional + regime bias
-                        org_variation = np.random.normal(total_modifier, 0.25)
-                        customized_matrix[i][j] *= np.clip(org_variation, 0.2, 3.0)
-                
-                # Renormaliza linha
-                row_sum = np.sum(customized_matrix[i])
-                if row_sum > 0:
-                    customized_matrix[i] = customized_matrix[i] / row_sum
-        
-        # ===== STOCHASTIC SIMULATION =====
-        result = run_stochastic_simulation(
-            n_gerentes=n_gerentes,
-            n_months=n_months,
-            transition_matrix=customized_matrix,
-            learning_enabled=learning_enabled
+            results["monthly_mean"] = combined.moments.mean
+            results["monthly_std"] = combined.moments.std
+        _attach_uncertainty(results, trace, combined.trajectories)
+        results["accumulator"] = aggregator
+        results["random_state"] = random_state
+        results["run_config"] = run_config
+        if stopping is not None:
+            results["adaptive"] = stopping.summary(results, cancelled)
+        if timings:
+            results["timings"] = _timings_summary(phase_timings, started)
+        yield _final_snapshot(results, cancelled=cancelled)
+        return
+    
+    # Modos exatos: agregados em streaming só para os snapshots parciais e a parada adaptativa
+    progress = _new_streaming_aggregator(n_months) if snapshot_every or stopping is not None else None
+    
+    if trajectory_store is not None:
+        store = _init_store_state(trajectory_store, n_simulations, n_months, dtype)
+        trace = _new_convergence_trace(n_months)
+        for index, block in enumerate(blocks):
+            trace.update(block["trajectories"])
+            _store_block(store, block)
+            if progress is not None:
+                progress.update(block["trajectories"], block["regimes"], block["dna"])
+            if _stop_requested(cancel_event, stopping, progress):
+                break
+            if _snapshot_due(index, len(block_sizes), snapshot_every):
+                yield from _yield_snapshot(_progress_snapshot(progress, n_simulations), phase_timings)
+        cancelled = _close_blocks(blocks, cancel_event)
+        results = _finish_store_state(store)
+        _attach_uncertainty(results, trace, store["sketch"])
+        results["random_state"] = random_state
+        results["run_config"] = run_config
+        if stopping is not None:
+            results["adaptive"] = stopping.summary(results, cancelled)
+        if timings:
+            results["timings"] = _timings_summary(phase_timings, started)
+        yield _final_snapshot(results, progress, cancelled)
+        return
+    
+    collected = []
+    trace = _new_convergence_trace(n_months)
+    if resume_from is not None:
+        collected.append(_blocks_from_results(resume_from, first_block * SIMULATION_BLOCK_SIZE))
+        trace = ConvergenceTrace.from_accumulator(
+            resume_from.get("convergence"),
+            _accumulator_from_results(resume_from, first_block * SIMULATION_BLOCK_SIZE)
         )
+    if progress is not None:
+        for block in collected:
+            progress.update(block["trajectories"], block["regimes"], block["dna"])
+    for index, block in enumerate(blocks):
+        collected.append(block)
+        trace.update(block["trajectories"])
+        if progress is not None:
+            progress.update(block["trajectories"], block["regimes"], block["dna"])
+        if _stop_requested(cancel_event, stopping, progress):
+            break
+        if _snapshot_due(index, len(block_sizes), snapshot_every):
+            yield from _yield_snapshot(_progress_snapshot(progress, n_simulations), phase_timings)
+    cancelled = _close_blocks(blocks, cancel_event)
+    blocks = collected
+    monthly_trajectories = np.concatenate([block["trajectories"] for block in blocks])
+    regime_trajectories = np.concatenate([block["regimes"] for block in blocks]).tolist()
+    org_dna_log = _org_dna_log(np.concatenate([block["dna"] for block in blocks]))
+    
+    results = _summarize_monte_carlo(
+        monthly_trajectories, monthly_trajectories[:, -1],
+        regime_trajectories, org_dna_log, len(monthly_trajectories)
+    )
+    for key in DETAIL_RECORD_KEYS:
+        if key in blocks[0]:
+            results[key] = np.concatenate([block[key] for block in blocks])
+    _attach_uncertainty(results, trace)
+    results["random_state"] = random_state
+    results["run_config"] = run_config
+    if stopping is not None:
+        results["adaptive"] = stopping.summary(results, cancelled)
+    if timings:
+        results["timings"] = _timings_summary(phase_timings, started)
+    yield _final_snapshot(results, progress, cancelled)
+
+
+def _is_cancelled(cancel_event):
+    return cancel_event is not None and cancel_event.is_set()
+
+
+def _new_convergence_trace(n_months):
+    return ConvergenceTrace(n_months, *CAPACITY_BOUNDS)
+
+
+def _attach_uncertainty(results, trace, sketch=None):
+    """
+    Acrescenta aos resultados os erros padrão e intervalos de 95% das
+    estatísticas reportadas ("uncertainty") e o traço de convergência
+    ("convergence"). Percentis mensais por estatísticas de ordem, do sketch
+    mensal quando houver (streaming, trajectory_store) ou das trajetórias
+    em memória.
+    """
+    n = results["n_simulations"]
+    levels = [level for p in MONTE_CARLO_PERCENTILES for level in order_statistic_levels(p, n)]
+    if sketch is not None:
+        values = [sketch.percentile(level) for level in levels]
+    else:
+        values = _monthly_percentile_values(results["all_trajectories"], levels)
+    by_level = dict(zip(levels, values))
+    final_values = results["final_capacities"]
+    if final_values is None:
+        final_values = results["final_capacity_sketch"]
+    mean_std_error = trace.mean_std_error()
+    results["uncertainty"] = {
+        "final_stats": final_stats_intervals(
+            final_values, results["final_stats"], float(mean_std_error[-1]), trace.std_std_error(),
+            MONTE_CARLO_PERCENTILES
+        ),
+        "monthly_percentiles": {
+            f"p{p}": percentile_interval(by_level.__getitem__, p, n) for p in MONTE_CARLO_PERCENTILES
+        },
+        "monthly_mean": {"std_error": mean_std_error},
+    }
+    results["convergence"] = trace.to_dict()
+
+
+def _stop_requested(cancel_event, stopping, aggregator):
+    """Cancelamento ou regra de parada adaptativa atingida após o último bloco?"""
+    if _is_cancelled(cancel_event):
+        return True
+    return stopping is not None and stopping.should_stop(aggregator.final_sketch(), time.perf_counter())
+
+
+def _close_blocks(blocks, cancel_event):
+    """
+    Encerra o iterador de blocos (cancela os blocos ainda não iniciados).
+    
+    Returns:
+        bool: True se a execução foi interrompida por cancel_event
+    """
+    if hasattr(blocks, "close"):
+        blocks.close()
+    return _is_cancelled(cancel_event)
+
+
+def _snapshot_due(index, n_blocks, snapshot_every):
+    """Snapshot parcial depois do bloco index? (o último bloco dá o item final)"""
+    return bool(snapshot_every) and (index + 1) % snapshot_every == 0 and index + 1 < n_blocks
+
+
+def _progress_snapshot(aggregator, n_simulations):
+    """Snapshot parcial de iter_monte_carlo a partir dos agregados em streaming."""
+    return {
+        "completed": aggregator.count,
+        "n_simulations": n_simulations,
+        "monthly_percentiles": aggregator.monthly_percentiles(MONTE_CARLO_PERCENTILES),
+        "monthly_mean": aggregator.moments.mean,
+        "monthly_std": aggregator.moments.std,
+        "done": False,
+        "cancelled": False,
+        "results": None,
+    }
+
+
+def _final_snapshot(results, aggregator=None, cancelled=False):
+    """Item final de iter_monte_carlo (percentis do resultado, exatos quando disponíveis)."""
+    moments = None if aggregator is None else aggregator.moments
+    return {
+        "completed": results["n_simulations"],
+        "n_simulations": results["n_simulations"],
+        "monthly_percentiles": results["monthly_percentiles"],
+        "monthly_mean": results.get("monthly_mean", None if moments is None else moments.mean),
+        "monthly_std": results.get("monthly_std", None if moments is None else moments.std),
+        "done": True,
+        "cancelled": cancelled,
+        "results": results,
+    }
+
+
+def _yield_snapshot(snapshot, timings=None):
+    """Entrega um snapshot sem contar o tempo do consumidor na fase de agregação."""
+    if timings is not None:
+        timings.lap("aggregation", calls=0)
+    yield snapshot
+    if timings is not None:
+        timings.mark()
+
+
+def _timed_blocks(blocks, timings):
+    """
+    Repassa os blocos juntando em timings os tempos por fase de cada um. O
+    tempo que o consumidor leva para incorporar cada bloco conta como agregação.
+    """
+    for block in blocks:
+        block_timings = block.pop("timings", None)
+        if block_timings is not None:
+            timings.merge(PhaseTimings.from_dict(block_timings))
+        timings.mark()
+        yield block
+        timings.lap("aggregation")
+
+
+def _timings_summary(timings, started):
+    """Fecha a fase de agregação (sumarização final) e resume os tempos da execução."""
+    timings.lap("aggregation")
+    return {**timings.to_dict(), "wall_s": time.perf_counter() - started}
+
+
+# ===== CHECKPOINT DO DRIVER MONTE CARLO =====
+CHECKPOINT_MANIFEST = "manifest.json"
+
+
+def _read_checkpoint_manifest(directory):
+    with open(os.path.join(directory, CHECKPOINT_MANIFEST), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _write_checkpoint_manifest(directory, manifest):
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, CHECKPOINT_MANIFEST)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+    os.replace(path + ".tmp", path)
+
+
+def _run_checkpointed_blocks(directory, checkpoint_every, tasks, n_workers, manifest):
+    """
+    Executa os blocos do engine vetorizado com checkpoint em disco e os devolve
+    em ordem (gerador).
+    
+    Os blocos são agrupados em partes fixas (blocks_per_part do manifesto); cada
+    parte é gravada atomicamente assim que todos os seus blocos terminam. Partes
+    já gravadas com o horizonte pedido são apenas lidas; partes com horizonte
+    menor continuam do estado salvo de cada bloco até o novo n_months.
+    """
+    from cache import load_results, save_results
+    
+    manifest_path = os.path.join(directory, CHECKPOINT_MANIFEST)
+    if os.path.exists(manifest_path):
+        manifest = _read_checkpoint_manifest(directory)
+    else:
+        manifest = {**manifest, "blocks_per_part": int(checkpoint_every)}
+        _write_checkpoint_manifest(directory, manifest)
+    blocks_per_part = manifest["blocks_per_part"]
+    
+    for part_start in range(0, len(tasks), blocks_per_part):
+        part_tasks = tasks[part_start:part_start + blocks_per_part]
+        n_months = part_tasks[0][2]["n_months"]
+        detail = part_tasks[0][2]["detail"]
+        path = os.path.join(directory, f"part_{part_start:06d}.npz")
+        part = load_results(path) if os.path.exists(path) else None
         
-        # ===== REGIME-SPECIFIC POST-PROCESSING =====
-        # Aplica multiplicador de regime (structural breaks)s
-        regime_modifier = regimes[current_regime]["shock_multiplier"]
-        modified_trajectory = result["df_monthly"]["Contas por Gerente (média)"].values * regime_modifier
-        
-        # REGIME NOISE: Adiciona ruído característico do regime
-        if current_regime == 0:  # Conservative: baixa volatilidade, downward bias
-            regime_noise = np.random.normal(-0.05, 0.08, len(modified_trajectory))
-        elif current_regime == 2:  # Aggressive: alta volatilidade, upward bias  
-            regime_noise = np.random.normal(0.10, 0.30, len(modified_trajectory))
-        else:  # Normal: volatilidade moderate
-            regime_noise = np.random.normal(0.0, 0.15, len(modified_trajectory))
-        
-        modified_trajectory = modified_trajectory * (1 + regime_noise)
-        modified_trajectory = np.clip(modified_trajectory, 0, 15000)  # Limites físicos
-        
-        # ===== LOGGING =====
-        all_results.append(result)
-        final_capacities.append(modified_trajectory[-1])
-        monthly_trajectories.append(modified_trajectory)
-        regime_trajectories.append(current_regime)
-        org_dna_log.append(org_dna)
+        if part is not None and part["n_months"] > n_months:
+            raise ValueError("checkpoint já avançou além de n_months")
+        if part is not None and part["n_months"] == n_months:
+            # Parte concluída: nada a simular
+            yield from (
+                _finish_batched_state(state, task[2]["n_gerentes"], detail)
+                for task, state in zip(part_tasks, _split_checkpoint_part(part))
+            )
+            continue
+        if part is not None:
+            # Extensão do horizonte: cada bloco continua do seu estado salvo
+            part_tasks = [
+                (engine, seed_sequence, {**kwargs, "engine_state": state})
+                for (engine, seed_sequence, kwargs), state in zip(part_tasks, _split_checkpoint_part(part))
+            ]
+        part_tasks = [
+            (engine, seed_sequence, {**kwargs, "return_state": True})
+            for engine, seed_sequence, kwargs in part_tasks
+        ]
+        part_results = list(_iter_blocks(part_tasks, n_workers))
+        save_results(path, _merge_checkpoint_part(
+            [block.pop("engine_state") for block in part_results], n_months
+        ))
+        yield from part_results
+
+
+def _merge_checkpoint_part(engine_states, n_months):
+    """Concatena os estados dos blocos de uma parte em um único registro."""
+    keys = [key for key, value in engine_states[0].items() if isinstance(value, np.ndarray)]
+    return {
+        "n_months": int(n_months),
+        "block_sizes": [len(state["regimes"]) for state in engine_states],
+        "rng_states": [state["rng_state"] for state in engine_states],
+        "state": {key: np.concatenate([state[key] for state in engine_states]) for key in keys},
+    }
+
+
+def _split_checkpoint_part(part):
+    """Separa uma parte do checkpoint nos estados (engine_state) de cada bloco."""
+    bounds = np.cumsum([0] + list(part["block_sizes"]))
+    return [
+        {
+            **{key: values[start:stop] for key, values in part["state"].items()},
+            "month": part["n_months"],
+            "rng_state": rng_state,
+        }
+        for start, stop, rng_state in zip(bounds[:-1], bounds[1:], part["rng_states"])
+    ]
+
+
+def _block_seed_sequence(root_sequence, index):
+    """Filho index do SeedSequence raiz (o mesmo que root_sequence.spawn produziria)."""
+    return np.random.SeedSequence(
+        root_sequence.entropy,
+        spawn_key=tuple(root_sequence.spawn_key) + (index,),
+        pool_size=root_sequence.pool_size
+    )
+
+
+def _entropy_to_json(entropy):
+    """Entropia do SeedSequence como int/lista de ints (serializável)."""
+    if np.ndim(entropy) == 0:
+        return int(entropy)
+    return [int(e) for e in entropy]
+
+
+def _run_config(config, engine, aggregation, detail, dtype="float64", sampling="random", antithetic=False):
+    """
+    Entradas que precisam coincidir para que um resultado possa ser estendido.
+    A amostragem só entra quando difere do padrão, então resultados anteriores
+    a ela continuam retomáveis.
+    """
+    run_config = {
+        **config.to_dict(),
+        "engine": engine,
+        "aggregation": aggregation,
+        "detail": detail,
+        "dtype": dtype,
+    }
+    if sampling != "random" or antithetic:
+        run_config.update(sampling=sampling, antithetic=antithetic)
+    return run_config
+
+
+def _new_streaming_aggregator(n_months):
+    return StreamingAggregator(
+        n_months,
+        [name for name, *_ in ORG_DNA_DIMENSIONS],
+        [REGIMES[r]["name"] for r in sorted(REGIMES)],
+        *CAPACITY_BOUNDS
+    )
+
+
+def _org_dna_log(dna):
+    """DNA (n, 6) como lista de dicts por organização (organizational_profiles)."""
+    return [
+        {name: float(value) for (name, *_), value in zip(ORG_DNA_DIMENSIONS, row)}
+        for row in dna
+    ]
+
+
+def _organizations_from_results(results, n_keep):
+    """Capacidade final, regime e DNA das primeiras n_keep organizações."""
+    dna_names = [name for name, *_ in ORG_DNA_DIMENSIONS]
+    return (
+        np.asarray(results["final_capacities"], dtype=float)[:n_keep],
+        np.asarray(results["regimes"][:n_keep], dtype=int),
+        np.array(
+            [[org[name] for name in dna_names] for org in results["organizational_profiles"][:n_keep]],
+            dtype=float
+        ).reshape(-1, len(dna_names)),
+    )
+
+
+def _accumulator_from_results(results, n_keep):
+    """Agregados em streaming das primeiras n_keep organizações de um resultado."""
+    if "accumulator" in results:
+        return results["accumulator"]
+    block = _blocks_from_results(results, n_keep)
+    return _new_streaming_aggregator(block["trajectories"].shape[1]).update(
+        block["trajectories"], block["regimes"], block["dna"]
+    )
+
+
+def _blocks_from_results(results, n_keep):
+    """
+    Reconstrói, a partir de um resultado exato, um "bloco" com as primeiras
+    n_keep organizações (trajetórias, regimes, DNA e registros de detalhe).
+    """
+    dna_names = [name for name, *_ in ORG_DNA_DIMENSIONS]
+    block = {
+        "trajectories": np.asarray(results["all_trajectories"])[:n_keep],
+        "regimes": np.asarray(results["regimes"][:n_keep], dtype=int),
+        "dna": np.array(
+            [[org[name] for name in dna_names] for org in results["organizational_profiles"][:n_keep]],
+            dtype=float
+        ).reshape(-1, len(dna_names)),
+    }
+    for key in DETAIL_RECORD_KEYS:
+        if key in results:
+            block[key] = np.asarray(results[key])[:n_keep]
+    return block
+
+
+def _final_stats(mean, std, minimum, maximum, percentile):
+    """
+    Estatísticas da distribuição final com análise de caudas.
+    
+    Args:
+        mean, std, minimum, maximum: Momentos e extremos da capacidade final
+        percentile: Função p (0-100) -> percentil da capacidade final
+    
+    Returns:
+        dict: final_stats no formato de run_monte_carlo_analysis
+    """
+    quantiles = {p: percentile(p) for p in MONTE_CARLO_PERCENTILES}
+    return {
+        "mean": mean,
+        "std": std,
+        "min": minimum,
+        "max": maximum,
+        "p1": quantiles[1],     # LEFT TAIL
+        "p5": quantiles[5],
+        "p10": quantiles[10],
+        "p25": quantiles[25],
+        "p50": quantiles[50],   # MEDIAN
+        "p75": quantiles[75],
+        "p90": quantiles[90],
+        "p95": quantiles[95],
+        "p99": quantiles[99],   # RIGHT TAIL
+        "iqr": quantiles[75] - quantiles[25],
+        "tail_ratio": (quantiles[95] - quantiles[5]) / mean
+    }
+
+def _row_blocks(n_rows, row_bytes, max_bytes=TRAJECTORY_BLOCK_BYTES):
+    """Fatias de linhas com no máximo max_bytes cada."""
+    step = max(1, int(max_bytes // max(row_bytes, 1)))
+    for start in range(0, n_rows, step):
+        yield slice(start, min(start + step, n_rows))
+
+def _monthly_percentiles(trajectories, percentiles, max_bytes=TRAJECTORY_BLOCK_BYTES):
+    """
+    Percentis de cada mês, lendo as trajetórias em fatias de meses que cabem
+    em max_bytes (uma fatia só quando a matriz inteira cabe). Funciona igual
+    para arrays em memória e memmaps.
+    
+    Returns:
+        dict: {"pX": array (n_months,)}
+    """
+    values = _monthly_percentile_values(trajectories, percentiles, max_bytes)
+    return {f"p{p}": values[i] for i, p in enumerate(percentiles)}
+
+def _monthly_percentile_values(trajectories, percentiles, max_bytes=TRAJECTORY_BLOCK_BYTES):
+    """Array (len(percentiles), n_months) de _monthly_percentiles."""
+    n_sims, n_months = trajectories.shape
+    values = np.empty((len(percentiles), n_months), dtype=trajectories.dtype)
+    for months in _row_blocks(n_months, n_sims * trajectories.itemsize, max_bytes):
+        values[:, months] = np.percentile(trajectories[:, months], percentiles, axis=0)
+    return values
+
+def _init_store_state(trajectory_store, n_simulations, n_months, dtype="float64"):
+    """
+    Estado da variante de _summarize_monte_carlo com as trajetórias em disco:
+    cada bloco é gravado no .npy assim que termina (_store_block) e só a
+    capacidade final, o regime e a soma do DNA de cada bloco ficam em memória,
+    junto de um sketch mensal (percentis sem reler o arquivo, que é gravado
+    por organização e exigiria uma passada completa por mês).
+    
+    Args:
+        trajectory_store: Caminho do arquivo .npy de trajetórias
+        n_simulations, n_months: Forma da matriz de trajetórias
+        dtype: Precisão das trajetórias gravadas
+    """
+    return {
+        "path": trajectory_store,
+        "trajectories": np.lib.format.open_memmap(
+            trajectory_store, mode="w+", dtype=dtype, shape=(n_simulations, n_months)
+        ),
+        "final_capacities": np.empty(n_simulations, dtype=dtype),
+        "regimes": np.empty(n_simulations, dtype=np.int8),
+        "dna_sum": np.zeros(len(ORG_DNA_DIMENSIONS)),
+        "sketch": QuantileSketch(n_months, *CAPACITY_BOUNDS),
+        "records": {},
+        "start": 0,
+    }
+
+
+def _store_block(state, block):
+    """Grava (in-place) o próximo bloco simulado no estado do trajectory_store."""
+    start = state["start"]
+    stop = start + len(block["regimes"])
+    state["trajectories"][start:stop] = block["trajectories"]
+    state["final_capacities"][start:stop] = block["trajectories"][:, -1]
+    state["regimes"][start:stop] = block["regimes"]
+    state["dna_sum"] += block["dna"].sum(axis=0)
+    state["sketch"].update(block["trajectories"])
+    for key in DETAIL_RECORD_KEYS:
+        if key in block:
+            state["records"].setdefault(key, []).append(block[key])
+    state["start"] = stop
+
+
+def _finish_store_state(state):
+    """
+    Resultados do trajectory_store depois de gravados todos os blocos.
+    
+    Returns:
+        dict: Mesmo formato de _summarize_monte_carlo, com "all_trajectories"
+              como memmap somente leitura
+    """
+    state["trajectories"].flush()
+    del state["trajectories"]
+    # Execução cancelada: só as primeiras linhas foram gravadas
+    n_simulations = state["start"]
+    trajectories = np.load(state["path"], mmap_mode="r")[:n_simulations]
+    final_capacities = state["final_capacities"][:n_simulations]
+    regimes = state["regimes"][:n_simulations]
+    dna_sum = state["dna_sum"]
+    
+    final_stats = _final_stats(
+        np.mean(final_capacities, dtype=np.float64), np.std(final_capacities, dtype=np.float64),
+        np.min(final_capacities), np.max(final_capacities),
+        lambda p: np.percentile(final_capacities, p)
+    )
+    results = {
+        "monthly_percentiles": {f"p{p}": state["sketch"].percentile(p) for p in MONTE_CARLO_PERCENTILES},
+        "final_stats": final_stats,
+        "all_trajectories": trajectories,
+        "final_capacities": final_capacities,
+        "regime_analysis": {
+            "regime_distribution": {
+                REGIMES[r]["name"]: np.sum(regimes == r) / n_simulations for r in sorted(REGIMES)
+            },
+            "avg_dna_profile": {
+                name: dna_sum[i] / n_simulations for i, (name, *_) in enumerate(ORG_DNA_DIMENSIONS)
+            }
+        },
+        "n_simulations": n_simulations,
+        "volatility_metrics": _volatility_metrics(final_stats),
+        "organizational_profiles": None,
+        "regimes": regimes,
+        "causal_data": None
+    }
+    for key, values in state["records"].items():
+        results[key] = np.concatenate(values)
+    return results
+
+def _volatility_metrics(final_stats):
+    return {
+        "coefficient_of_variation": final_stats["std"] / final_stats["mean"],
+        "tail_ratio": final_stats["tail_ratio"],
+        "extreme_range": final_stats["max"] - final_stats["min"],
+        "tail_thickness": (final_stats["p99"] - final_stats["p1"]) / (final_stats["p75"] - final_stats["p25"])
+    }
+
+def _summarize_streaming(aggregator):
+    """
+    Monta o dicionário de resultados a partir dos agregados em streaming.
+    As chaves por organização (trajetórias, DNA, regimes) ficam como None.
+    
+    Args:
+        aggregator: StreamingAggregator com todos os blocos incorporados
+    
+    Returns:
+        dict: Mesmo formato de run_monte_carlo_analysis, sem dados por organização
+    """
+    final_sketch = aggregator.final_sketch()
+    final_stats = _final_stats(
+        aggregator.moments.mean[-1], aggregator.moments.std[-1],
+        final_sketch.minimum[0], final_sketch.maximum[0],
+        lambda p: final_sketch.percentile(p)[0]
+    )
+    
+    return {
+        "monthly_percentiles": aggregator.monthly_percentiles(MONTE_CARLO_PERCENTILES),
+        "monthly_mean": aggregator.moments.mean,
+        "monthly_std": aggregator.moments.std,
+        "final_stats": final_stats,
+        "all_trajectories": None,
+        "final_capacities": None,
+        "final_capacity_sketch": final_sketch,
+        "regime_analysis": {
+            "regime_distribution": aggregator.regime_distribution(),
+            "avg_dna_profile": aggregator.avg_dna_profile()
+        },
+        "n_simulations": aggregator.count,
+        "volatility_metrics": _volatility_metrics(final_stats),
+        "organizational_profiles": None,
+        "regimes": None,
+        "causal_data": None
+    }
+
+def _summarize_monte_carlo(monthly_trajectories, final_capacities, regime_trajectories, org_dna_log, n_simulations,
+                           monthly_percentiles=None):
+    """
+    Agrega as trajetórias simuladas no dicionário de resultados Monte Carlo.
+    Compartilhado pelos engines "loop" e "batched".
+    
+    Args:
+        monthly_trajectories: Matriz (n_simulations, n_months) de capacidades
+        final_capacities: Capacidade final de cada organização
+        regime_trajectories: Regime sorteado para cada organização
+        org_dna_log: DNA organizacional de cada organização
+        n_simulations: Número de simulações Monte Carlo
+        monthly_percentiles: Percentis mensais já calculados (execução em lotes,
+            com monthly_trajectories=None)
     
+    Returns:
+        dict: Análise probabilística com fat tails e regime tracking
+    """
     # ===== ANÁLISE ESTATÍSTICA COM FAT TAILS =====
-    monthly_trajectories = np.array(monthly_trajectories)
     
     # PERCENTIS EXTREMOS para capturar tail risks
-    percentiles = [1, 5, 10, 25, 50, 75, 90, 95, 99]
-    monthly_percentiles = {}
-    
-    for p in percentiles:
-        monthly_percentiles[f"p{p}"] = np.percentile(monthly_trajectories, p, axis=0)
+    if monthly_percentiles is None:
+        monthly_percentiles = _monthly_percentiles(monthly_trajectories, MONTE_CARLO_PERCENTILES)
     
     # ===== FINAL DISTRIBUTION WITH TAIL ANALYSIS =====
-    final_capacities = np.array(final_capacities)
-    final_stats = {
-        "mean": np.mean(final_capacities),
-        "std": np.std(final_capacities),
-        "min": np.min(final_capacities),
-        "max": np.max(final_capacities),
-        "p1": np.percentile(final_capacities, 1),     # LEFT TAIL
-        "p5": np.percentile(final_capacities, 5),
-        "p10": np.percentile(final_capacities, 10),
-        "p25": np.percentile(final_capacities, 25),
-        "p50": np.percentile(final_capacities, 50),   # MEDIAN
-        "p75": np.percentile(final_capacities, 75),
-        "p90": np.percentile(final_capacities, 90),
-        "p95": np.percentile(final_capacities, 95),
-        "p99": np.percentile(final_capacities, 99),   # RIGHT TAIL
-        "iqr": np.percentile(final_capacities, 75) - np.percentile(final_capacities, 25),
-        "tail_ratio": (np.percentile(final_capacities, 95) - np.percentile(final_capacities, 5)) / np.mean(final_capacities)
-    }
+    final_capacities = np.asarray(final_capacities)
+    final_stats = _final_stats(
+        np.mean(final_capacities, dtype=np.float64), np.std(final_capacities, dtype=np.float64),
+        np.min(final_capacities), np.max(final_capacities),
+        lambda p: np.percentile(final_capacities, p)
+    )
     
     # ===== REGIME & DNA ANALYSIS =====
     regime_analysis = {
@@ -768,12 +2481,7 @@ def run_monte_carlo_analysis(n_gerentes=27000, n_months=36, transition_matrix=No
         "final_capacities": final_capacities,
         "regime_analysis": regime_analysis,
         "n_simulations": n_simulations,
-        "volatility_metrics": {
-            "coefficient_of_variation": final_stats["std"] / final_stats["mean"],
-            "tail_ratio": final_stats["tail_ratio"],
-            "extreme_range": final_stats["max"] - final_stats["min"],
-            "tail_thickness": (final_stats["p99"] - final_stats["p1"]) / (final_stats["p75"] - final_stats["p25"])
-        },
+        "volatility_metrics": _volatility_metrics(final_stats),
         # DADOS CAUSAIS PARA INFERÊNCIA
         "organizational_profiles": org_dna_log,
         "regimes": regime_trajectories,
@@ -799,6 +2507,9 @@ def calculate_scenario_probabilities(monte_carlo_results, target_scenarios):
         dict: Probabilidades de cada cenário
     """
     final_capacities = monte_carlo_results["final_capacities"]
+    if final_capacities is None:
+        return _scenario_probabilities_from_sketch(monte_carlo_results["final_capacity_sketch"], target_scenarios)
+    final_capacities = np.asarray(final_capacities)
     probabilities = {}
     
     for target in target_scenarios:
@@ -817,6 +2528,29 @@ def calculate_scenario_probabilities(monte_carlo_results, target_scenarios):
     
     return probabilities
 
+def scenario_probability_intervals(monte_carlo_results, target_scenarios):
+    """
+    Probabilidades de calculate_scenario_probabilities com erro padrão
+    binomial e intervalo de Wilson de 95%.
+    
+    Returns:
+        dict: {cenário: {value, std_error, ci_low, ci_high}}
+    """
+    n = monte_carlo_results["n_simulations"]
+    return {
+        name: {"value": p, **proportion_interval(p, n)}
+        for name, p in calculate_scenario_probabilities(monte_carlo_results, target_scenarios).items()
+    }
+
+def _scenario_probabilities_from_sketch(final_sketch, target_scenarios):
+    """Versão de calculate_scenario_probabilities para resultados em streaming."""
+    probabilities = {}
+    for target in target_scenarios:
+        margin = target * 0.05
+        probabilities[f"P(>= {target})"] = final_sketch.fraction_between(lower=target)[0]
+        probabilities[f"P(±5% de {target})"] = final_sketch.fraction_between(target - margin, target + margin)[0]
+    return probabilities
+
 def analyze_risk_metrics(monte_carlo_results, baseline=2000):
     """
     Calcula métricas de risco para as projeções.
@@ -826,9 +2560,15 @@ def analyze_risk_metrics(monte_carlo_results, baseline=2000):
         baseline: Capacidade baseline (sem IA)
     
     Returns:
-        dict: Métricas de risco e incerteza
+        dict: Métricas de risco e incerteza, com erro padrão e intervalo de 95%
+            de cada uma em "intervals" (ver diagnostics.risk_metric_intervals)
     """
     final_capacities = monte_carlo_results["final_capacities"]
+    if final_capacities is None:
+        metrics = _risk_metrics_from_sketch(monte_carlo_results, baseline)
+        return _with_risk_intervals(metrics, monte_carlo_results["final_capacity_sketch"], monte_carlo_results)
+    
+    final_capacities = np.asarray(final_capacities)
     
     # Value at Risk (VaR) - Pior cenário em 95% dos casos
     var_95 = np.percentile(final_capacities, 5)
@@ -836,17 +2576,17 @@ def analyze_risk_metrics(monte_carlo_results, baseline=2000):
     
     # Expected Shortfall - Média dos 5% piores casos
     worst_5_pct = final_capacities[final_capacities <= var_95]
-    expected_shortfall = np.mean(worst_5_pct) if len(worst_5_pct) > 0 else var_95
+    expected_shortfall = np.mean(worst_5_pct, dtype=np.float64) if len(worst_5_pct) > 0 else var_95
     
     # Probabilidade de não ter ganho
     prob_no_gain = np.mean(final_capacities <= baseline)
     
     # Coeficiente de variação
-    mean_capacity = np.mean(final_capacities)
-    std_capacity = np.std(final_capacities)
+    mean_capacity = np.mean(final_capacities, dtype=np.float64)
+    std_capacity = np.std(final_capacities, dtype=np.float64)
     cv = std_capacity / mean_capacity
     
-    return {
+    metrics = {
         "var_95": var_95,
         "var_90": var_90,
         "expected_shortfall": expected_shortfall,
@@ -856,3 +2596,30 @@ def analyze_risk_metrics(monte_carlo_results, baseline=2000):
         "std": std_capacity,
         "baseline": baseline
     }
+    return _with_risk_intervals(metrics, final_capacities, monte_carlo_results)
+
+def _with_risk_intervals(metrics, final_values, monte_carlo_results):
+    """Acrescenta "intervals" às métricas (média e desvio de results["uncertainty"], se disponíveis)."""
+    uncertainty = monte_carlo_results.get("uncertainty")
+    metrics["intervals"] = risk_metric_intervals(
+        final_values, metrics, None if uncertainty is None else uncertainty["final_stats"]
+    )
+    return metrics
+
+def _risk_metrics_from_sketch(monte_carlo_results, baseline):
+    """Versão de analyze_risk_metrics para resultados em streaming."""
+    final_sketch = monte_carlo_results["final_capacity_sketch"]
+    final_stats = monte_carlo_results["final_stats"]
+    var_95 = final_stats["p5"]
+    expected_shortfall = final_sketch.tail_mean(var_95)[0]
+    
+    return {
+        "var_95": var_95,
+        "var_90": final_stats["p10"],
+        "expected_shortfall": var_95 if np.isnan(expected_shortfall) else expected_shortfall,
+        "prob_no_gain": final_sketch.fraction_between(upper=baseline)[0],
+        "coefficient_variation": final_stats["std"] / final_stats["mean"],
+        "mean": final_stats["mean"],
+        "std": final_stats["std"],
+        "baseline": baseline
+    }
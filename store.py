@@ -0,0 +1,213 @@
+import json
+import os
+import uuid
+from datetime import datetime
+
+import numpy as np
+
+# Arquivo colunar (Parquet) das execuções Monte Carlo.
+#
+# Layout do dataset (particionado por execução, no formato Hive):
+#   <root>/organizations/run_id=<id>/part-0.parquet
+#       org, regime, final_capacity, uma coluna por dimensão do DNA (quando
+#       guardado) e trajectory (lista de tamanho fixo n_months; ausente nas
+#       execuções em lotes, que não guardam trajetórias)
+#   <root>/percentiles/run_id=<id>/part-0.parquet
+#       month, p1 ... p99
+# Os metadados da execução (n_simulations, random_state, run_config) ficam
+# no schema de cada arquivo, na chave "monte_carlo".
+
+DEFAULT_ARCHIVE_DIR = os.environ.get("MC_ARCHIVE_DIR", "archive")
+DEFAULT_COMPRESSION = "zstd"
+
+ORGANIZATIONS_TABLE = "organizations"
+PERCENTILES_TABLE = "percentiles"
+METADATA_KEY = b"monte_carlo"
+
+
+def _pyarrow():
+    """Importa pyarrow sob demanda (só o arquivo Parquet depende dele)."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as exc:
+        raise ImportError("O arquivo Parquet requer pyarrow (ver requirements.txt)") from exc
+    return pa, pq
+
+
+def _partition_path(root, table, run_id):
+    return os.path.join(root, table, f"run_id={run_id}", "part-0.parquet")
+
+
+def _write_table(pq, table, path, compression):
+    """Grava a tabela atomicamente (um único row group, para leitura sem cópia)."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Prefixo "_" para que o dataset ignore um arquivo temporário interrompido
+    tmp_path = os.path.join(os.path.dirname(path), "_" + os.path.basename(path) + ".tmp")
+    pq.write_table(
+        table, tmp_path, compression=compression,
+        row_group_size=max(table.num_rows, 1)
+    )
+    os.replace(tmp_path, path)
+
+
+def _column_to_numpy(column):
+    """Coluna Arrow (sem nulos) como array NumPy, sem cópia quando possível."""
+    if column.num_chunks != 1:
+        column = column.combine_chunks()
+    else:
+        column = column.chunk(0)
+    return column.to_numpy(zero_copy_only=True)
+
+
+def new_run_id():
+    """Identificador de execução: data/hora com microssegundos + sufixo aleatório (único e ordenável)."""
+    return f"{datetime.now():%Y%m%dT%H%M%S%f}-{uuid.uuid4().hex[:8]}"
+
+
+def export_run(results, root=DEFAULT_ARCHIVE_DIR, run_id=None, compression=DEFAULT_COMPRESSION, overwrite=False):
+    """
+    Arquiva os resultados de run_monte_carlo_analysis como dataset Parquet.
+
+    Resultados agregados em streaming (sem dados por organização) gravam
+    apenas a tabela de percentis; execuções em lotes (chunk_size) gravam as
+    colunas por organização sem a coluna trajectory.
+
+    Args:
+        results: Dicionário retornado por run_monte_carlo_analysis
+        root: Diretório raiz do dataset
+        run_id: Identificador da partição (padrão: new_run_id())
+        compression: Codec Parquet (padrão: zstd)
+        overwrite: Substitui uma execução já arquivada com o mesmo run_id
+
+    Returns:
+        str: run_id gravado
+
+    Raises:
+        FileExistsError: Se run_id já existe no arquivo e overwrite=False
+    """
+    pa, pq = _pyarrow()
+    if run_id is None:
+        run_id = new_run_id()
+    existing = [
+        path for path in (_partition_path(root, table, run_id) for table in (PERCENTILES_TABLE, ORGANIZATIONS_TABLE))
+        if os.path.exists(path)
+    ]
+    if existing and not overwrite:
+        raise FileExistsError(f"Execução já arquivada: run_id={run_id} (use overwrite=True para substituir)")
+
+    percentiles = results["monthly_percentiles"]
+    n_months = len(next(iter(percentiles.values())))
+    metadata = {METADATA_KEY: json.dumps({
+        "n_simulations": int(results["n_simulations"]),
+        "n_months": n_months,
+        "random_state": results.get("random_state"),
+        "run_config": results.get("run_config"),
+    }).encode("utf-8")}
+
+    # ===== PERCENTIS MENSAIS =====
+    columns = {"month": pa.array(np.arange(1, n_months + 1, dtype=np.int16))}
+    for name, values in percentiles.items():
+        columns[name] = pa.array(np.asarray(values))
+    _write_table(
+        pq, pa.table(columns).replace_schema_metadata(metadata),
+        _partition_path(root, PERCENTILES_TABLE, run_id), compression
+    )
+
+    # ===== ORGANIZAÇÕES (regime, capacidade final, DNA e trajetórias) =====
+    if results.get("final_capacities") is not None:
+        # Capacidades mantêm a precisão da execução (float64 ou float32)
+        final_capacities = np.asarray(results["final_capacities"])
+        n_orgs = len(final_capacities)
+        columns = {
+            "org": pa.array(np.arange(n_orgs, dtype=np.int32)),
+            "regime": pa.array(np.asarray(results["regimes"], dtype=np.int8)),
+            "final_capacity": pa.array(final_capacities),
+        }
+        profiles = results.get("organizational_profiles")
+        for name in (profiles[0] if profiles else {}):
+            columns[name] = pa.array(np.fromiter((org[name] for org in profiles), dtype=np.float64, count=n_orgs))
+        # Execuções em lotes (chunk_size) não guardam as trajetórias
+        if results.get("all_trajectories") is not None:
+            trajectories = np.ascontiguousarray(results["all_trajectories"], dtype=final_capacities.dtype)
+            columns["trajectory"] = pa.FixedSizeListArray.from_arrays(pa.array(trajectories.ravel()), n_months)
+        _write_table(
+            pq, pa.table(columns).replace_schema_metadata(metadata),
+            _partition_path(root, ORGANIZATIONS_TABLE, run_id), compression
+        )
+    elif _partition_path(root, ORGANIZATIONS_TABLE, run_id) in existing:
+        # Substituída por uma execução em streaming: a tabela antiga não vale mais
+        os.remove(_partition_path(root, ORGANIZATIONS_TABLE, run_id))
+    return run_id
+
+
+def list_runs(root=DEFAULT_ARCHIVE_DIR):
+    """Execuções arquivadas (run_id), em ordem."""
+    directory = os.path.join(root, PERCENTILES_TABLE)
+    if not os.path.isdir(directory):
+        return []
+    return sorted(
+        name.split("=", 1)[1] for name in os.listdir(directory)
+        if name.startswith("run_id=")
+    )
+
+
+def load_run(run_id, root=DEFAULT_ARCHIVE_DIR):
+    """
+    Lê uma execução arquivada, em forma colunar.
+
+    Os arquivos são abertos com memory map e as colunas numéricas passam de
+    Arrow para NumPy sem cópia (os arrays retornados são somente leitura).
+
+    Args:
+        run_id: Identificador da execução
+        root: Diretório raiz do dataset
+
+    Returns:
+        dict: "monthly_percentiles" {pX: array}, "all_trajectories" (n, n_months),
+              "final_capacities", "regimes", "dna" {dimensão: array},
+              "n_simulations", "random_state" e "run_config". As chaves por
+              organização valem None para execuções em streaming, e
+              "all_trajectories" também para execuções em lotes.
+    """
+    _, pq = _pyarrow()
+    table = pq.read_table(_partition_path(root, PERCENTILES_TABLE, run_id), memory_map=True)
+    metadata = json.loads(table.schema.metadata[METADATA_KEY])
+    run = {
+        "monthly_percentiles": {
+            name: _column_to_numpy(table.column(name))
+            for name in table.column_names if name != "month"
+        },
+        "all_trajectories": None,
+        "final_capacities": None,
+        "regimes": None,
+        "dna": None,
+        "n_simulations": metadata["n_simulations"],
+        "random_state": metadata["random_state"],
+        "run_config": metadata["run_config"],
+    }
+
+    path = _partition_path(root, ORGANIZATIONS_TABLE, run_id)
+    if os.path.exists(path):
+        table = pq.read_table(path, memory_map=True)
+        if "trajectory" in table.column_names:
+            trajectory = table.column("trajectory").combine_chunks()
+            run["all_trajectories"] = trajectory.flatten().to_numpy(zero_copy_only=True).reshape(-1, metadata["n_months"])
+        run["final_capacities"] = _column_to_numpy(table.column("final_capacity"))
+        run["regimes"] = _column_to_numpy(table.column("regime"))
+        run["dna"] = {
+            name: _column_to_numpy(table.column(name))
+            for name in table.column_names
+            if name not in ("org", "regime", "final_capacity", "trajectory")
+        }
+    return run
+
+
+def open_dataset(table=ORGANIZATIONS_TABLE, root=DEFAULT_ARCHIVE_DIR):
+    """
+    Dataset Arrow de todas as execuções arquivadas (coluna run_id vinda da
+    partição), para consultas entre execuções sem carregar tudo em memória.
+    """
+    _pyarrow()
+    import pyarrow.dataset as ds
+    return ds.dataset(os.path.join(root, table), format="parquet", partitioning="hive")
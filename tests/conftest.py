@@ -0,0 +1,23 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# Os módulos do projeto ficam na raiz do repositório (sem pacote instalável)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def assert_same_results():
+    """Compara dois resultados de run_monte_carlo_analysis bit a bit."""
+    def check(a, b):
+        for key in ("all_trajectories", "final_capacities"):
+            if a[key] is None:
+                assert b[key] is None
+            else:
+                np.testing.assert_array_equal(a[key], b[key])
+        assert a["final_stats"] == b["final_stats"]
+        for key in a["monthly_percentiles"]:
+            np.testing.assert_array_equal(a["monthly_percentiles"][key], b["monthly_percentiles"][key])
+    return check
@@ -0,0 +1,25 @@
+import numpy as np
+
+from diagnostics import monte_carlo_errors
+from simulation import run_monte_carlo_analysis
+
+
+def test_probability_error_is_absolute_half_width():
+    values = np.r_[np.full(9990, 5000.0), np.full(10, 100.0)]
+    errors = monte_carlo_errors(values, target_scenarios=[1000], percentiles=())
+    estimate = errors["estimates"]["P(>= 1000)"]
+    assert estimate["value"] == 0.999
+    assert estimate["ci_low"] < 0.999 < estimate["ci_high"]
+    assert errors["max_error"] == estimate["error"] < 0.001
+
+
+def test_near_certain_target_does_not_block_the_stop():
+    results = run_monte_carlo_analysis(
+        n_gerentes=2000, n_months=12, seed=3, engine="batched", chunk_size=500,
+        n_simulations=20000, target_rel_error=0.02, target_scenarios=[1000, 2500]
+    )
+    adaptive = results["adaptive"]
+    assert adaptive["errors"]["estimates"]["P(>= 1000)"]["value"] > 0.99
+    assert adaptive["stop_reason"] == "target"
+    assert results["n_simulations"] < 20000
+    assert adaptive["errors"]["max_error"] <= 0.02
@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from aggregation import QuantileSketch, RunningMoments
+from simulation import run_monte_carlo_analysis
+
+SMALL = dict(n_gerentes=2000, n_months=12, n_simulations=600, seed=42)
+
+
+@pytest.fixture(scope="module")
+def values():
+    rng = np.random.default_rng(0)
+    # Cauda pesada e clip nos limites, como as capacidades simuladas
+    return np.clip(rng.lognormal(8.0, 0.6, size=(3000, 4)), 0, 15000)
+
+
+def test_sketch_merge_equals_single_pass(values):
+    single = QuantileSketch(4).update(values)
+    merged = QuantileSketch(4)
+    for part in np.array_split(values, 7):
+        merged.merge(QuantileSketch(4).update(part))
+    np.testing.assert_array_equal(merged.counts, single.counts)
+    np.testing.assert_array_equal(merged.minimum, single.minimum)
+    np.testing.assert_array_equal(merged.maximum, single.maximum)
+
+
+@pytest.mark.parametrize("q", [0, 1, 5, 25, 50, 75, 95, 99, 100])
+def test_sketch_percentiles_within_one_bin(values, q):
+    sketch = QuantileSketch(4, bin_width=1.0).update(values)
+    np.testing.assert_allclose(sketch.percentile(q), np.percentile(values, q, axis=0), rtol=0, atol=1.0)
+
+
+def test_chan_merge_matches_numpy(values):
+    moments = RunningMoments(4)
+    for part in np.array_split(values, 5):
+        moments.merge(RunningMoments(4).update(part))
+    assert moments.count == len(values)
+    np.testing.assert_allclose(moments.mean, np.mean(values, axis=0), rtol=1e-12)
+    np.testing.assert_allclose(moments.std, np.std(values, axis=0), rtol=1e-12)
+
+
+@pytest.mark.parametrize("engine", ["loop", "batched"])
+def test_streaming_matches_exact(engine):
+    exact = run_monte_carlo_analysis(engine=engine, **SMALL)
+    streaming = run_monte_carlo_analysis(engine=engine, aggregation="streaming", **SMALL)
+    assert streaming["all_trajectories"] is None
+    for key, values in exact["monthly_percentiles"].items():
+        np.testing.assert_allclose(streaming["monthly_percentiles"][key], values, rtol=0, atol=1.0)
+    np.testing.assert_allclose(streaming["monthly_mean"], exact["all_trajectories"].mean(axis=0), rtol=1e-12)
+    np.testing.assert_allclose(streaming["monthly_std"], exact["all_trajectories"].std(axis=0), rtol=1e-12)
+    assert streaming["final_stats"]["mean"] == pytest.approx(exact["final_stats"]["mean"], rel=1e-12)
+    assert streaming["final_stats"]["std"] == pytest.approx(exact["final_stats"]["std"], rel=1e-12)
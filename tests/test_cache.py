@@ -0,0 +1,39 @@
+import numpy as np
+
+from aggregation import QuantileSketch
+from cache import ResultCache, load_results, save_results
+from simulation import run_monte_carlo_analysis
+
+SMALL = dict(n_gerentes=2000, n_months=12, n_simulations=500, seed=11)
+
+
+def test_sketch_round_trip(tmp_path):
+    sketch = QuantileSketch(3).update(np.random.default_rng(0).uniform(0, 15000, size=(1000, 3)))
+    path = tmp_path / "sketch.npz"
+    save_results(path, {"sketch": sketch})
+    loaded = load_results(path)["sketch"]
+    assert isinstance(loaded, QuantileSketch)
+    np.testing.assert_array_equal(loaded.counts, sketch.counts)
+    np.testing.assert_array_equal(loaded.minimum, sketch.minimum)
+    np.testing.assert_array_equal(loaded.maximum, sketch.maximum)
+    np.testing.assert_array_equal(loaded.percentile(50), sketch.percentile(50))
+
+
+def test_streaming_results_round_trip(tmp_path):
+    results = run_monte_carlo_analysis(aggregation="streaming", **SMALL)
+    cache = ResultCache(tmp_path)
+    cache.put("streaming", results)
+    loaded = cache.get("streaming")
+    assert loaded["final_stats"] == results["final_stats"]
+    np.testing.assert_array_equal(
+        loaded["final_capacity_sketch"].counts, results["final_capacity_sketch"].counts
+    )
+
+
+def test_corrupt_entries_are_discarded(tmp_path):
+    cache = ResultCache(tmp_path)
+    for key, payload in {"truncated": b"PK\x03\x04", "garbage": b"not a zip file", "empty": b""}.items():
+        with open(tmp_path / f"{key}.npz", "wb") as f:
+            f.write(payload)
+        assert cache.get(key) is None
+        assert key not in cache
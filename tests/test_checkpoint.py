@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from parameters import parameters
+from simulation import build_shock_calendar, run_monte_carlo_analysis, run_stochastic_simulation
+
+SMALL = dict(n_gerentes=2000, seed=42)
+
+
+@pytest.mark.parametrize("detail", ["none", "summary"])
+def test_stochastic_horizon_extension_equals_direct_run(tmp_path, detail):
+    checkpoint = str(tmp_path / "checkpoint.npz")
+    run_stochastic_simulation(n_months=12, detail=detail, checkpoint=checkpoint, **SMALL)
+    extended = run_stochastic_simulation(n_months=24, detail=detail, checkpoint=checkpoint, **SMALL)
+    direct = run_stochastic_simulation(n_months=24, detail=detail, **SMALL)
+    np.testing.assert_array_equal(extended["monthly_capacities"], direct["monthly_capacities"])
+    np.testing.assert_array_equal(extended["state_distribution"], direct["state_distribution"])
+    assert extended["total_capacity"] == direct["total_capacity"]
+
+
+def test_monte_carlo_horizon_extension_equals_direct_run(tmp_path, assert_same_results):
+    options = dict(SMALL, engine="batched", n_simulations=500, checkpoint=str(tmp_path / "checkpoint"))
+    run_monte_carlo_analysis(**{**options, "n_months": 12})
+    extended = run_monte_carlo_analysis(**{**options, "n_months": 24})
+    direct = run_monte_carlo_analysis(**{**SMALL, "engine": "batched", "n_simulations": 500, "n_months": 24})
+    assert_same_results(extended, direct)
+
+
+def _shock_row(seed, n_months):
+    calendar = build_shock_calendar(1, n_months, shock_probability=0.5, start_month=1, seed=seed)
+    return calendar["shock_type"][0], calendar["intensity"][0]
+
+
+FIRST_PRIOR = next(iter(parameters))
+
+
+@pytest.mark.parametrize("changed, message", [
+    ({"priors": {**parameters, FIRST_PRIOR: {**parameters[FIRST_PRIOR], "alpha": 9.0}}}, "configuração"),
+    ({"learning_enabled": False}, "configuração"),
+    ({"shocks": None}, "configuração"),
+    ({"shocks": _shock_row(2, 24)}, "calendário de choques"),
+], ids=["priors", "learning", "random-shocks", "shock-calendar"])
+def test_resume_with_different_configuration_raises(tmp_path, changed, message):
+    checkpoint = str(tmp_path / "checkpoint.npz")
+    calendar = _shock_row(1, 24)
+    base = dict(SMALL, detail="none", checkpoint=checkpoint, shocks=calendar)
+    run_stochastic_simulation(n_months=12, **{**base, "shocks": tuple(values[:12] for values in calendar)})
+    with pytest.raises(ValueError, match=message):
+        run_stochastic_simulation(n_months=24, **{**base, **changed})
+
+
+def test_resume_with_extended_shock_calendar(tmp_path):
+    checkpoint = str(tmp_path / "checkpoint.npz")
+    calendar = _shock_row(1, 24)
+    run_stochastic_simulation(n_months=12, detail="none", checkpoint=checkpoint,
+                              shocks=tuple(values[:12] for values in calendar), **SMALL)
+    extended = run_stochastic_simulation(n_months=24, detail="none", checkpoint=checkpoint, shocks=calendar, **SMALL)
+    direct = run_stochastic_simulation(n_months=24, detail="none", shocks=calendar, **SMALL)
+    np.testing.assert_array_equal(extended["monthly_capacities"], direct["monthly_capacities"])
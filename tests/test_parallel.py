@@ -0,0 +1,16 @@
+import pytest
+
+from simulation import run_monte_carlo_analysis
+
+SMALL = dict(n_gerentes=2000, n_months=12, n_simulations=600, seed=42)
+
+
+@pytest.mark.parametrize("options", [
+    {},  # caminho padrão (engine="loop", aggregation="exact")
+    {"engine": "batched"},
+    {"engine": "batched", "aggregation": "streaming"},
+], ids=["default", "batched", "batched-streaming"])
+def test_results_identical_across_workers(options, assert_same_results):
+    serial = run_monte_carlo_analysis(n_workers=1, **SMALL, **options)
+    parallel = run_monte_carlo_analysis(n_workers=2, **SMALL, **options)
+    assert_same_results(serial, parallel)
@@ -0,0 +1,18 @@
+import pytest
+
+from simulation import run_monte_carlo_analysis
+
+SMALL = dict(n_gerentes=2000, n_months=12, seed=42)
+
+
+@pytest.mark.parametrize("options", [
+    {},  # caminho padrão (engine="loop", aggregation="exact")
+    {"engine": "batched"},
+    {"engine": "batched", "aggregation": "streaming"},
+    {"engine": "batched", "chunk_size": 250},
+], ids=["default", "batched", "batched-streaming", "batched-chunked"])
+def test_resume_equals_direct_run(options, assert_same_results):
+    partial = run_monte_carlo_analysis(n_simulations=300, **SMALL, **options)
+    resumed = run_monte_carlo_analysis(n_simulations=600, resume_from=partial, **SMALL, **options)
+    direct = run_monte_carlo_analysis(n_simulations=600, **SMALL, **options)
+    assert_same_results(resumed, direct)
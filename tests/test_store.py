@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+from simulation import run_monte_carlo_analysis
+from store import export_run, list_runs, load_run
+
+pytest.importorskip("pyarrow")
+
+SMALL = dict(n_gerentes=2000, n_months=12, n_simulations=300, seed=5)
+
+
+def test_default_run_ids_are_unique(tmp_path):
+    results = run_monte_carlo_analysis(**SMALL)
+    run_ids = [export_run(results, root=tmp_path) for _ in range(3)]
+    assert len(set(run_ids)) == 3
+    assert list_runs(tmp_path) == sorted(run_ids)
+
+
+def test_existing_run_id_requires_overwrite(tmp_path):
+    exact = run_monte_carlo_analysis(**SMALL)
+    export_run(exact, root=tmp_path, run_id="base")
+    with pytest.raises(FileExistsError):
+        export_run(exact, root=tmp_path, run_id="base")
+
+    streaming = run_monte_carlo_analysis(aggregation="streaming", **SMALL)
+    export_run(streaming, root=tmp_path, run_id="base", overwrite=True)
+    run = load_run("base", root=tmp_path)
+    assert run["all_trajectories"] is None
+    np.testing.assert_array_equal(run["monthly_percentiles"]["p50"], streaming["monthly_percentiles"]["p50"])
+
+
+def test_chunked_run_keeps_organization_columns(tmp_path):
+    chunked = run_monte_carlo_analysis(chunk_size=250, **SMALL)
+    assert chunked["all_trajectories"] is None
+    run_id = export_run(chunked, root=tmp_path)
+    run = load_run(run_id, root=tmp_path)
+    assert run["all_trajectories"] is None
+    np.testing.assert_array_equal(run["final_capacities"], chunked["final_capacities"])
+    np.testing.assert_array_equal(run["regimes"], chunked["regimes"])
+    for name, values in run["dna"].items():
+        np.testing.assert_array_equal(values, [org[name] for org in chunked["organizational_profiles"]])
+    assert set(run["dna"]) == set(chunked["organizational_profiles"][0])
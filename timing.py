@@ -0,0 +1,132 @@
+import bisect
+import time
+
+# Fases instrumentadas do pipeline de simulação, na ordem em que acontecem
+PHASES = (
+    "dna_sampling",
+    "matrix_customization",
+    "beta_sampling",
+    "bayesian_factors",
+    "market_shocks",
+    "transitions",
+    "posterior_update",
+    "post_processing",
+    "aggregation",
+)
+
+PHASE_LABELS = {
+    "dna_sampling": "🧬 Amostragem de regime e DNA",
+    "matrix_customization": "🧩 Customização das matrizes",
+    "beta_sampling": "🎲 Amostragem Beta (parâmetros bayesianos)",
+    "bayesian_factors": "⚙️ Fatores bayesianos na matriz",
+    "market_shocks": "⚡ Choques de mercado",
+    "transitions": "🔄 Transições individuais",
+    "posterior_update": "📚 Evidências e atualização posterior",
+    "post_processing": "📈 Pós-processamento (capacidade e regime)",
+    "aggregation": "📊 Agregação final",
+}
+
+# Histograma por chamada: 4 bins por década, de 100 ns a 100 s
+HISTOGRAM_EDGES = tuple(10.0 ** (exponent / 4) for exponent in range(-28, 9))
+
+
+class PhaseTimings:
+    """
+    Tempo acumulado por fase do pipeline, com número de chamadas e histograma
+    (escala log) da duração de cada chamada. Instâncias de blocos diferentes
+    (inclusive de outros processos, via to_dict) são combinadas com merge.
+
+    Uso por "voltas": mark() marca o início e lap(fase) atribui à fase o tempo
+    desde a última marca, então fases consecutivas não precisam de blocos with.
+    """
+
+    def __init__(self):
+        self.totals = {}
+        self.calls = {}
+        self.histograms = {}
+        self._last = time.perf_counter()
+
+    def _ensure(self, phase):
+        if phase not in self.totals:
+            self.totals[phase] = 0.0
+            self.calls[phase] = 0
+            self.histograms[phase] = [0] * (len(HISTOGRAM_EDGES) + 1)
+
+    def mark(self):
+        """Reinicia a contagem da próxima volta (o tempo até aqui não é atribuído)."""
+        self._last = time.perf_counter()
+
+    def lap(self, phase, calls=1):
+        """
+        Atribui a phase o tempo desde a última marca/volta. Com calls=0 o tempo
+        entra no total sem contar uma nova chamada (trecho extra da mesma fase).
+        """
+        now = time.perf_counter()
+        self.add(phase, now - self._last, calls)
+        self._last = now
+
+    def add(self, phase, seconds, calls=1):
+        """Registra seconds (uma ou mais chamadas somadas) em phase."""
+        self._ensure(phase)
+        self.totals[phase] += seconds
+        if calls:
+            self.calls[phase] += calls
+            self.histograms[phase][bisect.bisect_right(HISTOGRAM_EDGES, seconds / calls)] += calls
+
+    def merge(self, other):
+        """Incorpora (in-place) outro PhaseTimings."""
+        for phase, total in other.totals.items():
+            self._ensure(phase)
+            self.totals[phase] += total
+            self.calls[phase] += other.calls[phase]
+            self.histograms[phase] = [a + b for a, b in zip(self.histograms[phase], other.histograms[phase])]
+        return self
+
+    def to_dict(self):
+        """
+        Resumo serializável (JSON/cache).
+
+        Returns:
+            dict: "phases" {fase: total_s, calls, mean_s, histogram} na ordem de
+                PHASES, e "histogram_edges_s" (limites dos bins; o primeiro bin
+                conta chamadas abaixo do primeiro limite e o último, acima do último)
+        """
+        ordered = [p for p in PHASES if p in self.totals] + [p for p in self.totals if p not in PHASES]
+        return {
+            "phases": {
+                phase: {
+                    "total_s": self.totals[phase],
+                    "calls": self.calls[phase],
+                    "mean_s": self.totals[phase] / self.calls[phase] if self.calls[phase] else 0.0,
+                    "histogram": list(self.histograms[phase]),
+                }
+                for phase in ordered
+            },
+            "histogram_edges_s": list(HISTOGRAM_EDGES),
+        }
+
+    @classmethod
+    def from_dict(cls, summary):
+        """Reconstrói um PhaseTimings a partir de to_dict."""
+        timings = cls()
+        for phase, values in summary["phases"].items():
+            timings.totals[phase] = values["total_s"]
+            timings.calls[phase] = values["calls"]
+            timings.histograms[phase] = list(values["histogram"])
+        return timings
+
+
+class _NullTimings:
+    """Instrumentação desligada: mesma interface, sem custo além da chamada."""
+
+    def mark(self):
+        pass
+
+    def lap(self, phase, calls=1):
+        pass
+
+    def add(self, phase, seconds, calls=1):
+        pass
+
+
+NULL_TIMINGS = _NullTimings()
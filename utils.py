@@ -1,9 +1,10 @@
 import streamlit as st
+from notes import PARAMETER_NOTES, STATE_NOTES
 
 def show_parameter_note(name, param):
     with st.expander(f"{name} — Beta({param['alpha']}, {param['beta']})"):
-        st.markdown(param["nota"])
+        st.markdown(PARAMETER_NOTES[name])
 
 def show_state_note(state):
     with st.expander(f"{state['nome']} — Multiplicador: {state['multiplicador']}"):
-        st.markdown(state["nota"])
+        st.markdown(STATE_NOTES[state["nome"]])